@@ -0,0 +1,5 @@
+"""
+Performance benchmarks of bumpsemver, run as `python -m benchmarks.<name>` from the root of the repository.
+
+They are not collected by pytest, since their timings only make sense on a quiet machine.
+"""
@@ -0,0 +1,49 @@
+"""
+Helpers shared by the benchmarks: running git and timing the command line interface.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# the package under test is imported from the working tree, not from an installed distribution
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+GIT_ENV = {
+    "GIT_AUTHOR_NAME": "bumpsemver benchmark",
+    "GIT_AUTHOR_EMAIL": "benchmark@bumpsemver.invalid",
+    "GIT_COMMITTER_NAME": "bumpsemver benchmark",
+    "GIT_COMMITTER_EMAIL": "benchmark@bumpsemver.invalid",
+}
+
+
+def benchmark_env() -> Dict[str, str]:
+    env = dict(os.environ, **GIT_ENV)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")]))
+    return env
+
+
+def git(cwd: Path, *args: str) -> None:
+    subprocess.run(["git", *args], cwd=cwd, env=benchmark_env(), check=True, capture_output=True)
+
+
+def time_command(args: List[str], cwd: Optional[Path] = None, repeat: int = 5) -> float:
+    """
+    Run a command `repeat` times and return the median of its wall clock time in seconds.
+
+    The command must succeed, otherwise the timing would measure an error path.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(args, cwd=cwd, env=benchmark_env(), check=True, capture_output=True)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def bumpsemver_command(*args: str) -> List[str]:
+    return [sys.executable, "-m", "bumpsemver", *args]
@@ -0,0 +1,154 @@
+"""
+Generator of synthetic monorepos with a real git history, to benchmark bumpsemver at scale.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from benchmarks.common import git
+
+SECTION_TYPES = ("json", "toml", "yaml", "plaintext")
+
+
+class MonorepoSpec:
+    """
+    Shape of a generated monorepo.
+
+    `files` counts the `sections` managed packages, one config section each, and the filler files. Of the filler files,
+    `yaml_ratio` are YAML files which discovery has to look into. The README, the config file, the changelog of the
+    earlier releases if `tags` is above one, and the lockfile are tracked on top of them. A non-zero `lockfile_mb` adds
+    a root `package-lock.json` of about that size, managed by two sections. `tags` release tags are created, one commit
+    apart, the latest of them on the commit of the current version.
+    """
+
+    def __init__(
+        self,
+        files: int = 100,
+        sections: int = 10,
+        yaml_ratio: float = 0.2,
+        lockfile_mb: float = 0.0,
+        tags: int = 1,
+        section_types: Iterable[str] = SECTION_TYPES,
+    ):
+        self.files = max(files, sections)
+        self.sections = sections
+        self.yaml_ratio = yaml_ratio
+        self.lockfile_mb = lockfile_mb
+        self.tags = max(tags, 1)
+        self.section_types = tuple(section_types)
+
+    def as_dict(self) -> Dict:
+        return {
+            "files": self.files,
+            "sections": self.sections,
+            "yaml_ratio": self.yaml_ratio,
+            "lockfile_mb": self.lockfile_mb,
+            "tags": self.tags,
+            "section_types": list(self.section_types),
+        }
+
+
+# the scales compared release over release, keep them stable so that the results stay comparable
+SCALES = {
+    "small": MonorepoSpec(files=100, sections=10, yaml_ratio=0.2, lockfile_mb=0.1, tags=5),
+    "medium": MonorepoSpec(files=1_000, sections=50, yaml_ratio=0.2, lockfile_mb=5, tags=20),
+    "large": MonorepoSpec(files=10_000, sections=500, yaml_ratio=0.2, lockfile_mb=50, tags=100),
+}
+
+
+def _write(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def _write_package(root: Path, index: int, section_type: str, version: str) -> List[str]:
+    """
+    Write a managed package file and return its config section.
+    """
+    directory = f"packages/pkg{index:04d}"
+    if section_type == "json":
+        name = f"{directory}/package.json"
+        _write(root / name, json.dumps({"name": f"pkg{index:04d}", "version": version}, indent=2) + "\n")
+        return [f"[bumpsemver:json:{name}]", "jsonpath = version"]
+    if section_type == "toml":
+        name = f"{directory}/pyproject.toml"
+        _write(root / name, f'[tool.poetry]\nname = "pkg{index:04d}"\nversion = "{version}"\n')
+        return [f"[bumpsemver:toml:{name}]", "tomlpath = tool.poetry.version"]
+    if section_type == "yaml":
+        name = f"{directory}/chart.yaml"
+        _write(root / name, f"name: pkg{index:04d}\nversion: {version}\n")
+        return [f"[bumpsemver:yaml:{name}]", "yamlpath = version"]
+    name = f"{directory}/VERSION"
+    _write(root / name, f"{version}\n")
+    return [f"[bumpsemver:plaintext:{name}]"]
+
+
+def _write_filler(root: Path, index: int, yaml: bool) -> None:
+    directory = f"src/d{index // 100:03d}"
+    if not yaml:
+        _write(root / f"{directory}/module{index:05d}.py", f'"""\nModule {index}.\n"""\n\nVALUE = {index}\n')
+    elif index % 2:
+        # carries the tokens of the dbt-sources rule, so it passes the prefilter and gets parsed
+        content = f"version: 2\nsources: {{}}\nschema: s{index}\ntables: []\n"
+        _write(root / f"{directory}/models{index:05d}.yml", content)
+    else:
+        _write(root / f"{directory}/settings{index:05d}.yaml", f"name: settings{index}\nenabled: true\n")
+
+
+def _write_lockfile(root: Path, megabytes: float, version: str) -> List[str]:
+    packages = {"": {"name": "monorepo", "version": version}}
+    size, index = 0, 0
+    while size < megabytes * 1024 * 1024:
+        entry = {
+            "version": f"1.{index % 100}.{index % 7}",
+            "resolved": f"https://registry.npmjs.org/dep-{index:06d}/-/dep-{index:06d}-1.0.0.tgz",
+            "integrity": f"sha512-{index:0128x}",
+            "dev": bool(index % 2),
+        }
+        packages[f"node_modules/dep-{index:06d}"] = entry
+        size += 220
+        index += 1
+    content = {"name": "monorepo", "version": version, "lockfileVersion": 3, "requires": True, "packages": packages}
+    _write(root / "package-lock.json", json.dumps(content, indent=2) + "\n")
+    return [
+        "[bumpsemver:json:package-lock.json]",
+        "jsonpath = version",
+        "",
+        "[bumpsemver:json(packages):package-lock.json]",
+        'jsonpath = packages."".version',
+    ]
+
+
+def generate_monorepo(root: Path, spec: MonorepoSpec) -> Path:
+    """
+    Write a monorepo of the given shape into the empty or missing directory `root`, and commit and tag its history.
+    """
+    version = f"1.{spec.tags - 1}.0"
+    root.mkdir(parents=True, exist_ok=True)
+    git(root, "init", "--quiet")
+    # earlier releases are recorded in the changelog only, each on its own tagged commit
+    for release in range(spec.tags - 1):
+        with open(root / "CHANGELOG.md", "a", encoding="utf-8") as changelog:
+            changelog.write(f"## 1.{release}.0\n\n")
+        git(root, "add", "CHANGELOG.md")
+        git(root, "commit", "--quiet", "--message", f"release 1.{release}.0")
+        git(root, "tag", f"v1.{release}.0")
+
+    sections = [["[bumpsemver:plaintext:README.md]"]]
+    _write(root / "README.md", f"# monorepo\n\nversion {version}\n")
+    for index in range(spec.sections):
+        sections.append(_write_package(root, index, spec.section_types[index % len(spec.section_types)], version))
+    fillers = spec.files - spec.sections
+    yaml_files = int(fillers * spec.yaml_ratio)
+    for index in range(fillers):
+        _write_filler(root, index, index < yaml_files)
+    if spec.lockfile_mb > 0:
+        sections.append(_write_lockfile(root, spec.lockfile_mb, version))
+    config = [f"[bumpsemver]\ncurrent_version = {version}\ncommit = True\ntag = True\ntag_name = v{{new_version}}"]
+    _write(root / ".bumpsemver.cfg", "\n\n".join(config + ["\n".join(section) for section in sections]) + "\n")
+
+    git(root, "add", ".")
+    git(root, "commit", "--quiet", "--message", f"release {version}")
+    git(root, "tag", f"v{version}")
+    return root
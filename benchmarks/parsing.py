@@ -0,0 +1,103 @@
+"""
+Parsing throughput of the SemVer 2.0 parser against the former regex, which only matched the X.Y.Z core.
+
+Usage: python -m benchmarks.parsing [--count 100000] [--repeat 5] [--json]
+
+Every version string is parsed into a Version and serialized back, as a bump does with the current version.
+"""
+
+import argparse
+import json
+import logging
+import re
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from bumpsemver.version_part import Version, VersionConfig, VersionPart
+
+# the regex VersionConfig.parse() used to search the version string with
+LEGACY_REGEX = re.compile(r"(?P<major>\d+)\.(?P<minor>\d+)\.(?P<patch>\d+)")
+
+# version strings of each shape, the shapes a nightly pipeline bumps through
+SHAPES = {
+    "plain": "{i}.{j}.{k}",
+    "prerelease": "{i}.{j}.{k}-rc.{k}",
+    "prerelease+build": "{i}.{j}.{k}-beta.{j}.x+build.{k}.sha.5114f85",
+}
+
+
+def legacy_parse(version_string: str) -> Optional[Version]:
+    match = LEGACY_REGEX.search(version_string)
+    if not match:
+        return None
+    return Version({key: VersionPart(value) for key, value in match.groupdict().items()}, version_string)
+
+
+def version_strings(shape: str, count: int) -> List[str]:
+    return [SHAPES[shape].format(i=index % 7, j=index % 13, k=index) for index in range(count)]
+
+
+def time_parser(parse: Callable[[str], Optional[Version]], strings: List[str], repeat: int) -> float:
+    """
+    Return the best time of parsing and serializing all the strings, in seconds.
+    """
+    version_config = VersionConfig()
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for version_string in strings:
+            version_config.serialize(parse(version_string))
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run_benchmarks(count: int, repeat: int) -> List[Dict]:
+    # the parser logs every version at INFO level, which is not what is measured
+    logging.disable(logging.INFO)
+    try:
+        results = []
+        for shape in SHAPES:
+            strings = version_strings(shape, count)
+            legacy = time_parser(legacy_parse, strings, repeat)
+            semver = time_parser(VersionConfig().parse, strings, repeat)
+            results.append(
+                {
+                    "shape": shape,
+                    "count": count,
+                    "legacy_us": round(legacy / count * 1e6, 3),
+                    "semver_us": round(semver / count * 1e6, 3),
+                    "ratio": round(semver / legacy, 3),
+                }
+            )
+        return results
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def print_table(results: List[Dict]) -> None:
+    print(f"{'shape':<20}{'count':>10}{'legacy µs':>12}{'semver µs':>12}{'ratio':>8}")
+    for result in results:
+        print(
+            f"{result['shape']:<20}{result['count']:>10}{result['legacy_us']:>12.3f}{result['semver_us']:>12.3f}"
+            f"{result['ratio']:>8.2f}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.parsing", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000, help="Version strings of each shape")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement, the best is reported")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.count, args.repeat)
+    if args.json:
+        print(json.dumps({"results": results}, indent=2))
+    else:
+        print_table(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
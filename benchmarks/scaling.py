@@ -0,0 +1,161 @@
+"""
+Time every phase of a bump on generated monorepos of increasing scale.
+
+Usage: python -m benchmarks.scaling [--scales small medium large] [--dry-run] [--output results.json]
+
+Custom shapes can be given with --files, --sections, --yaml-ratio, --lockfile-mb and --tags, which replace the
+scales. The JSON result carries the versions of bumpsemver, Python and git, so results of different releases can be
+compared to track the scaling curves.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from benchmarks.common import GIT_ENV
+from benchmarks.generator import SCALES, MonorepoSpec, generate_monorepo
+
+# the functions of bumpsemver.cli and bumpsemver.api making up the phases of a bump, in the order they run
+PHASES = {
+    "vcs_info": ("cli", "probe_vcs"),
+    "load_config": ("cli", "_load_configuration"),
+    "dirty_check": ("api", "_determine_vcs"),
+    "discovery": ("api", "discover_unmanaged_files"),
+    "verify": ("api", "_verify_files"),
+    "render": ("api", "_render_edits"),
+    "replace": ("api", "_write_edits"),
+    "update_config": ("api", "_update_config_file"),
+    "commit": ("cli", "commit"),
+    "tag": ("cli", "tag"),
+}
+
+
+@contextmanager
+def _timed_phases(timings: Dict[str, float]) -> Iterator[None]:
+    """
+    Wrap the phase functions of bumpsemver.cli and bumpsemver.api to accumulate the seconds spent in each of them.
+    """
+    from bumpsemver import api, cli
+
+    modules = {"api": api, "cli": cli}
+    originals = {phase: getattr(modules[module], name) for phase, (module, name) in PHASES.items()}
+
+    def timed(phase, func):
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - started
+
+        return wrapper
+
+    for phase, func in originals.items():
+        module, name = PHASES[phase]
+        setattr(modules[module], name, timed(phase, func))
+    try:
+        yield
+    finally:
+        for phase, func in originals.items():
+            module, name = PHASES[phase]
+            setattr(modules[module], name, func)
+
+
+def time_bump(repo: Path, dry_run: bool) -> Dict:
+    """
+    Bump the patch version of a repository in this process, and return the seconds of every phase and in total.
+    """
+    from bumpsemver.cli import main
+
+    timings: Dict[str, float] = {}
+    cwd = os.getcwd()
+    os.chdir(repo)
+    started = time.perf_counter()
+    try:
+        with _timed_phases(timings):
+            main(["--dry-run", "patch"] if dry_run else ["patch"])
+    except SystemExit as exc:
+        if exc.code:
+            raise RuntimeError(f"bumpsemver exited with {exc.code} in {repo}") from exc
+    finally:
+        os.chdir(cwd)
+    total = time.perf_counter() - started
+    return {"phases": {phase: timings[phase] for phase in PHASES if phase in timings}, "seconds": total}
+
+
+def run_scales(specs: Dict[str, MonorepoSpec], dry_run: bool) -> List[Dict]:
+    results = []
+    workdir = Path(tempfile.mkdtemp(prefix="bumpsemver-scaling-"))
+    try:
+        for name, spec in specs.items():
+            started = time.perf_counter()
+            repo = generate_monorepo(workdir / name, spec)
+            generated = time.perf_counter() - started
+            result = {"scale": name, "spec": spec.as_dict(), "generate_seconds": generated}
+            result.update(time_bump(repo, dry_run))
+            results.append(result)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def environment() -> Dict[str, str]:
+    from bumpsemver import __version__
+
+    git_version = subprocess.run(["git", "--version"], check=True, capture_output=True, text=True).stdout.strip()
+    return {
+        "bumpsemver": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "git": git_version,
+        "cpus": os.cpu_count(),
+    }
+
+
+def print_table(results: List[Dict]) -> None:
+    print(f"{'scale':<12}{'phase':<16}{'seconds':>10}")
+    for result in results:
+        for phase, seconds in result["phases"].items():
+            print(f"{result['scale']:<12}{phase:<16}{seconds:>10.3f}")
+        print(f"{result['scale']:<12}{'total':<16}{result['seconds']:>10.3f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.scaling", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["small", "medium"], help="Preset scales")
+    parser.add_argument("--files", type=int, help="Tracked files of a custom scale")
+    parser.add_argument("--sections", type=int, default=10, help="Config sections of a custom scale")
+    parser.add_argument("--yaml-ratio", type=float, default=0.2, help="Share of YAML files of a custom scale")
+    parser.add_argument("--lockfile-mb", type=float, default=0.0, help="Size of package-lock.json of a custom scale")
+    parser.add_argument("--tags", type=int, default=1, help="Release tags of a custom scale")
+    parser.add_argument("--dry-run", action="store_true", help="Time a dry run instead of a commit and tag")
+    parser.add_argument("--output", metavar="FILE", help="Write the JSON results to a file instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.files is not None:
+        specs = {"custom": MonorepoSpec(args.files, args.sections, args.yaml_ratio, args.lockfile_mb, args.tags)}
+    else:
+        specs = {name: SCALES[name] for name in args.scales}
+    # the bumps run in this process, so git needs an identity without relying on the global config
+    os.environ.update(GIT_ENV)
+    results = run_scales(specs, args.dry_run)
+    report = json.dumps({"environment": environment(), "dry_run": args.dry_run, "results": results}, indent=2)
+    if args.output:
+        Path(args.output).write_text(report + "\n")
+        print_table(results)
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
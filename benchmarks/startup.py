@@ -0,0 +1,145 @@
+"""
+Import time and startup latency of bumpsemver, checked against budgets.
+
+Usage: python -m benchmarks.startup [--sizes 10 100 1000] [--repeat 5] [--scale 1.0] [--json]
+
+The process exits with 1 if any measurement exceeds its budget, so it can run as a CI step. On a slow runner, raise
+`--scale` to multiply every budget instead of editing them.
+"""
+
+import argparse
+import json
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.common import benchmark_env, bumpsemver_command, time_command
+from benchmarks.generator import MonorepoSpec, generate_monorepo
+
+# budgets in seconds as a fixed part plus a part per managed file, generous enough for a shared CI runner but tight
+# enough to catch a heavy new import. Committing stages every managed file with its own `git add`, hence its slope.
+BUDGETS = {
+    "import bumpsemver.cli": (0.25, 0.0),
+    "--version": (0.5, 0.0),
+    "dry-run": (1.0, 0.001),
+    "commit": (1.0, 0.005),
+}
+
+# libraries which must not be imported before a config section needs them
+LAZY_MODULES = ["ruamel", "yamlpath", "tomlkit", "jsonpath_ng"]
+
+RE_IMPORTTIME = re.compile(r"^import time:\s+(?P<self>\d+) \|\s+(?P<cumulative>\d+) \| (?P<indent>\s*)(?P<module>\S+)$")
+
+
+def parse_importtime(output: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Parse the stderr of `python -X importtime` into the self and cumulative import time of each module, in µs.
+    """
+    modules = {}
+    for line in output.splitlines():
+        match = RE_IMPORTTIME.match(line)
+        if match:
+            modules[match.group("module")] = (int(match.group("self")), int(match.group("cumulative")))
+    return modules
+
+
+def measure_imports(module: str = "bumpsemver.cli", repeat: int = 5) -> Dict[str, Tuple[int, int]]:
+    """
+    Import a module in fresh interpreters and keep the fastest timings of each module imported along the way.
+    """
+    best: Dict[str, Tuple[int, int]] = {}
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            env=benchmark_env(),
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        for name, timing in parse_importtime(result.stderr).items():
+            if name not in best or timing[1] < best[name][1]:
+                best[name] = timing
+    return best
+
+
+def run_benchmarks(sizes: List[int], repeat: int) -> List[Dict]:
+    results = []
+    imports = measure_imports(repeat=repeat)
+    results.append(
+        {
+            "benchmark": "import bumpsemver.cli",
+            "size": None,
+            "seconds": imports["bumpsemver.cli"][1] / 1_000_000,
+            "eager_lazy_modules": sorted({name.split(".")[0] for name in imports} & set(LAZY_MODULES)),
+            "slowest_imports": [
+                {"module": name, "self_us": timing[0], "cumulative_us": timing[1]}
+                for name, timing in sorted(imports.items(), key=lambda item: -item[1][0])[:10]
+            ],
+        }
+    )
+    results.append(
+        {"benchmark": "--version", "size": None, "seconds": time_command(bumpsemver_command("--version"), None, repeat)}
+    )
+    workdir = Path(tempfile.mkdtemp(prefix="bumpsemver-bench-"))
+    try:
+        for size in sizes:
+            spec = MonorepoSpec(files=size, sections=size, section_types=["plaintext"])
+            repo = generate_monorepo(workdir / f"repo-{size}", spec)
+            seconds = time_command(bumpsemver_command("--dry-run", "patch"), repo, repeat)
+            results.append({"benchmark": "dry-run", "size": size, "seconds": seconds})
+            seconds = time_command(bumpsemver_command("patch"), repo, repeat)
+            results.append({"benchmark": "commit", "size": size, "seconds": seconds})
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def check_budgets(results: List[Dict], scale: float) -> List[str]:
+    """
+    Return a description of every measurement over its budget, and of every parsing library imported eagerly.
+    """
+    failures = []
+    for result in results:
+        fixed, per_file = BUDGETS[result["benchmark"]]
+        budget = (fixed + per_file * (result["size"] or 0)) * scale
+        result["budget"] = budget
+        label = result["benchmark"] if result["size"] is None else f"{result['benchmark']} ({result['size']} files)"
+        if result["seconds"] > budget:
+            failures.append(f"{label} took {result['seconds']:.3f}s, over the budget of {budget:.3f}s")
+        for module in result.get("eager_lazy_modules", []):
+            failures.append(f"{label} imports '{module}' eagerly")
+    return failures
+
+
+def print_table(results: List[Dict]) -> None:
+    print(f"{'benchmark':<24}{'files':>8}{'seconds':>12}{'budget':>12}")
+    for result in results:
+        size = "" if result["size"] is None else result["size"]
+        print(f"{result['benchmark']:<24}{size:>8}{result['seconds']:>12.3f}{result['budget']:>12.3f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="Managed files per repository")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement, the median is reported")
+    parser.add_argument("--scale", type=float, default=1.0, help="Factor applied to every budget")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.repeat)
+    failures = check_budgets(results, args.scale)
+    if args.json:
+        print(json.dumps({"results": results, "failures": failures}, indent=2))
+    else:
+        print_table(results)
+        for failure in failures:
+            print(f"BUDGET EXCEEDED: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
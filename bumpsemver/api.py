@@ -0,0 +1,569 @@
+"""
+Library API to bump versions in-process, from computing new versions to committing and tagging them.
+
+Unlike `bumpsemver.cli.main()`, nothing here exits the process, parses the command line or configures the logging, so
+the calls can be repeated in a long-lived process. The errors are raised as the exceptions of `bumpsemver.exceptions`.
+"""
+
+import argparse
+import logging
+import os
+import re
+import subprocess
+from configparser import RawConfigParser
+from datetime import datetime
+from difflib import unified_diff
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Type, Union
+
+from bumpsemver import events, profiling
+from bumpsemver.config import DiscoveryConfig, _determine_config_file, _load_configuration, _update_config_file
+from bumpsemver.discovery import discover_unmanaged_files
+from bumpsemver.exceptions import (
+    CannotParseVersionError,
+    DiscoveryError,
+    FileTypeMismatchError,
+    InvalidArgumentsError,
+    InvalidConfigSectionError,
+    InvalidFileError,
+    MixedNewLineError,
+    MultiValuesMismatchError,
+    PathNotFoundError,
+    SingleValueMismatchError,
+    VersionNotFoundError,
+    WorkingDirectoryIsDirtyError,
+)
+from bumpsemver.files.base import FileTypeBase
+from bumpsemver.git import Git
+from bumpsemver.version_part import Version, VersionConfig, split_plain_version
+
+logger = logging.getLogger(__name__)
+
+PARTS = ("major", "minor", "patch", "prerelease")
+DEFAULT_TAG_NAME = "v{new_version}"
+DEFAULT_MESSAGE = "build(repo): bumped version {current_version} → {new_version}"
+NO_CONFIG_FILE_MESSAGE = "No valid config file is specified and the default .bumpsemver.cfg is not found"
+# the exit code of each kind of error, the first entry the error is an instance of wins, any other error exits with 128
+EXIT_CODES: List[Tuple[Tuple[Type[BaseException], ...], int]] = [
+    ((argparse.ArgumentTypeError, InvalidArgumentsError), 1),
+    ((FileNotFoundError,), 2),
+    ((MixedNewLineError,), 3),
+    (
+        (
+            CannotParseVersionError,
+            FileTypeMismatchError,
+            InvalidConfigSectionError,
+            InvalidFileError,
+            MultiValuesMismatchError,
+            PathNotFoundError,
+            SingleValueMismatchError,
+            VersionNotFoundError,
+        ),
+        4,
+    ),
+    ((WorkingDirectoryIsDirtyError,), 5),
+    ((subprocess.CalledProcessError,), 10),
+    ((DiscoveryError,), 32),
+]
+
+
+def exit_code(exc: BaseException) -> int:
+    """
+    Return the exit code `bumpsemver.cli.main()` exits with on the error.
+    """
+    for types, code in EXIT_CODES:
+        if isinstance(exc, types):
+            return code
+    return 128
+
+
+def _bump_plain(major: str, minor: str, patch: str, part: str) -> str:
+    """
+    Bump the part of a plain X.Y.Z version, as `Version.bump()` does, without building the version objects.
+    """
+    if part == "major":
+        return f"{int(major) + 1}.0.0"
+    if part == "minor":
+        return f"{major}.{int(minor) + 1}.0"
+    if part == "patch":
+        return f"{major}.{minor}.{int(patch) + 1}"
+    return f"{major}.{minor}.{int(patch) + 1}-rc.1"
+
+
+def bump_versions(versions: Sequence[str], parts: Union[str, Sequence[str]]) -> List[str]:
+    """
+    Bump every version by its part, or all of them by the same part, and return the new versions in the same order.
+
+    The plain X.Y.Z versions, by far the most common ones, are bumped on their strings, the others are parsed into
+    versions. Each distinct pair of version and part is only bumped once. Raise CannotParseVersionError on the first
+    version string which is not a valid SemVer 2.0 version.
+    """
+    if isinstance(parts, str):
+        parts = [parts] * len(versions)
+    elif len(parts) != len(versions):
+        raise InvalidArgumentsError(f"Got {len(parts)} parts to bump for {len(versions)} versions")
+    unknown_parts = sorted({part for part in parts if part not in PARTS})
+    if unknown_parts:
+        raise InvalidArgumentsError(f"Unknown parts {unknown_parts}, the valid parts are {list(PARTS)}")
+
+    version_config = VersionConfig()
+    bumped: Dict[tuple, str] = {}
+    new_versions = []
+    for version_string, part in zip(versions, parts):
+        new_version = bumped.get((version_string, part))
+        if new_version is None:
+            plain = split_plain_version(version_string)
+            if plain is not None:
+                new_version = _bump_plain(*plain, part)
+            else:
+                version = version_config.parse(version_string)
+                if version is None:
+                    raise CannotParseVersionError(version_string)
+                new_version = version_config.serialize(version.bump(part, version_config.order()))
+            bumped[(version_string, part)] = new_version
+        new_versions.append(new_version)
+    return new_versions
+
+
+def bump_version(version: str, part: str) -> str:
+    return bump_versions([version], part)[0]
+
+
+class FileEdit:
+    """
+    The content of a managed file before and after updating its version.
+    """
+
+    def __init__(self, filename: str, file_type: Optional[str], before: str, after: str):
+        self.filename = filename
+        self.file_type = file_type
+        self.before = before
+        self.after = after
+
+    @property
+    def changed(self) -> bool:
+        return self.before != self.after
+
+    def diff(self) -> str:
+        return "\n".join(
+            unified_diff(
+                self.before.splitlines(),
+                self.after.splitlines(),
+                lineterm="",
+                fromfile=f"a/{self.filename}",
+                tofile=f"b/{self.filename}",
+            )
+        )
+
+    def __repr__(self):
+        return f"<bumpsemver.FileEdit:{self.filename}:{'changed' if self.changed else 'unchanged'}>"
+
+
+def plan_file_edits(
+    files: Iterable[FileTypeBase],
+    current_version: str,
+    new_version: str,
+    context: Optional[Dict[str, Union[str, datetime]]] = None,
+) -> List[FileEdit]:
+    """
+    Render the edits updating the version in the files, which are left untouched.
+
+    The files are the handlers created from the sections of a config file. The context fills the search and replace
+    templates, in addition to the versions and the current time.
+    """
+    version_config = VersionConfig()
+    current = version_config.parse(current_version)
+    if current is None:
+        raise CannotParseVersionError(current_version)
+    new = version_config.parse(new_version)
+    if new is None:
+        raise CannotParseVersionError(new_version)
+
+    return _render_edits(files, current, new, {**time_context(), **(context or {})})
+
+
+def _render_edits(
+    files: Iterable[FileTypeBase],
+    current: Version,
+    new: Version,
+    context: Dict[str, Union[str, datetime]],
+    pending: Optional[Dict[str, str]] = None,
+) -> List[FileEdit]:
+    edits = []
+    # a file managed by several sections gets the edits of all of them, one after the other
+    pending = {} if pending is None else pending
+    for file in files:
+        with profiling.phase(f"render {file.file_type}:{file.filename}", "file"):
+            before, after = file.render(current, new, dict(context), pending.get(file.filename))
+        pending[file.filename] = after
+        edits.append(FileEdit(file.filename, file.file_type, before, after))
+    return edits
+
+
+def time_context() -> Dict[str, datetime]:
+    """
+    Return the time placeholders of the templates, taken anew for every bump.
+    """
+    return {"now": datetime.now(), "utcnow": datetime.utcnow()}
+
+
+def probe_vcs() -> Dict[str, Any]:
+    """
+    Return the information about the latest release tag if the working directory is a usable Git working tree.
+    """
+    vcs_info = {}
+    if Git.is_usable():
+        vcs_info.update(Git.latest_tag_info())
+    return vcs_info
+
+
+def _is_enabled(value: Any) -> bool:
+    if isinstance(value, str):
+        return RawConfigParser.BOOLEAN_STATES.get(value.lower(), False)
+    return bool(value)
+
+
+class LoadedConfig:
+    """
+    The handlers of the managed files and the options of a config file, with the Git information they were loaded with.
+    """
+
+    def __init__(
+        self,
+        config_file: str,
+        files: List[FileTypeBase],
+        discovery_config: DiscoveryConfig,
+        options: Dict[str, Any],
+        vcs_info: Dict[str, Any],
+    ):
+        self.config_file = config_file
+        self.files = files
+        self.discovery_config = discovery_config
+        self.options = options
+        self.vcs_info = vcs_info
+
+    @property
+    def current_version(self) -> Optional[str]:
+        return self.options.get("current_version")
+
+    def __repr__(self):
+        return f"<bumpsemver.LoadedConfig:{self.config_file}>"
+
+
+def load_config(config_file: Optional[str] = None) -> LoadedConfig:
+    """
+    Read the config file, .bumpsemver.cfg in the working directory by default, and create its file handlers.
+
+    The current version is the one of the latest release tag if the config file does not set it.
+    """
+    path = _determine_config_file(config_file)
+    if not os.path.exists(path):
+        raise InvalidArgumentsError(f"Could not read config file at {path}" if config_file else NO_CONFIG_FILE_MESSAGE)
+    vcs_info = probe_vcs()
+    options = {"current_version": vcs_info["current_version"]} if "current_version" in vcs_info else {}
+    _, files, discovery_config = _load_configuration(path, bool(config_file), options)
+    return LoadedConfig(path, files, discovery_config, options, vcs_info)
+
+
+class BumpPlan:
+    """
+    A bump checked against the working tree, with the edits it makes to the managed files, which are not written yet.
+
+    `vcs` is the Git class if the bump can be committed, or None if Git is not usable or the working tree is dirty.
+    """
+
+    def __init__(
+        self,
+        config: LoadedConfig,
+        current_version: str,
+        new_version: str,
+        current: Version,
+        new: Version,
+        context: Dict[str, Union[str, datetime]],
+        edits: List[FileEdit],
+        vcs: Optional[Type[Git]],
+    ):
+        self.config = config
+        self.current_version = current_version
+        self.new_version = new_version
+        self.current = current
+        self.new = new
+        self.context = context
+        self.edits = edits
+        self.vcs = vcs
+
+    @property
+    def release_context(self) -> Dict[str, Union[str, datetime]]:
+        """
+        The placeholders of the commit message, the tag name and the tag message.
+        """
+        context: Dict[str, Union[str, datetime]] = {
+            "current_version": self.current_version,
+            "new_version": self.new_version,
+            "now": self.context["now"],
+            "utcnow": self.context["utcnow"],
+        }
+        context.update({f"current_{part}": self.current[part].value for part in self.current})
+        context.update({f"new_{part}": self.new[part].value for part in self.new})
+        return context
+
+    def __repr__(self):
+        return f"<bumpsemver.BumpPlan:{self.current_version}->{self.new_version}>"
+
+
+def _determine_vcs(allow_dirty: bool) -> Optional[Type[Git]]:
+    if not Git.is_usable():
+        return None
+
+    try:
+        Git.assert_non_dirty()
+    except WorkingDirectoryIsDirtyError:
+        if allow_dirty:
+            return None
+        raise
+
+    return Git
+
+
+def _determine_discovery_baseline(discovery_config: DiscoveryConfig, tag_name: str) -> Optional[str]:
+    if not discovery_config.incremental or not Git.is_usable():
+        return None
+    # any tag created by this tool matches the tag name template with its placeholders as wildcards
+    latest_tag = Git.latest_tag(re.sub(r"{[^}]*}", "*", tag_name))
+    if latest_tag is None:
+        logger.info("No release tag found, discovering unmanaged files in the whole tree")
+    else:
+        logger.info("Discovering unmanaged files added since release tag '%s'", latest_tag)
+    return latest_tag
+
+
+def _verify_files(files: List[FileTypeBase], current: Version, context: Dict[str, Union[str, datetime]]) -> None:
+    # make sure files exist and contain version string
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Asserting files %s contain the version string...", ", ".join([str(f) for f in files]))
+    for file_item in files:
+        with profiling.phase(f"verify {file_item.file_type}:{file_item.filename}", "file"):
+            file_item.should_contain_version(current, context)
+        events.emit("file_verified", file=file_item.filename, file_type=file_item.file_type)
+
+
+def _plan_files(
+    config: LoadedConfig,
+    current_version: str,
+    new_version: str,
+    current: Version,
+    new: Version,
+    context: Dict[str, Union[str, datetime]],
+    vcs: Optional[Type[Git]],
+    pending: Optional[Dict[str, str]] = None,
+) -> BumpPlan:
+    """
+    Verify that the managed files contain the current version, and render their edits on top of the `pending` ones.
+    """
+    with profiling.phase("verify"):
+        _verify_files(config.files, current, context)
+    with profiling.phase("render"):
+        edits = _render_edits(config.files, current, new, context, pending)
+    return BumpPlan(config, current_version, new_version, current, new, context, edits, vcs)
+
+
+def _build_plan(
+    config: LoadedConfig,
+    current_version: str,
+    new_version: str,
+    current: Version,
+    new: Version,
+    context: Dict[str, Union[str, datetime]],
+    allow_dirty: bool,
+    tag_name: str,
+) -> BumpPlan:
+    with profiling.phase("git_probe"):
+        vcs = _determine_vcs(allow_dirty)
+
+    with profiling.phase("discovery"):
+        discover_unmanaged_files(
+            [file.filename for file in config.files],
+            config.discovery_config.ignore,
+            _determine_discovery_baseline(config.discovery_config, tag_name),
+            config.discovery_config.tracked_files,
+        )
+
+    return _plan_files(config, current_version, new_version, current, new, context, vcs)
+
+
+def _resolve_versions(
+    config: LoadedConfig, part: Optional[str], new_version: Optional[str], current_version: Optional[str]
+) -> Tuple[str, str, Version, Version]:
+    """
+    Return the current and the new version, both as strings and parsed.
+    """
+    if (part is None) == (new_version is None):
+        raise InvalidArgumentsError("Either the part to bump or the new version must be given")
+    current_version = current_version or config.current_version
+    if not current_version:
+        raise InvalidArgumentsError("The current version is neither given nor set in the config file")
+    version_config = VersionConfig()
+    current = version_config.parse(current_version)
+    if current is None:
+        raise CannotParseVersionError(current_version)
+    if part is not None:
+        if part not in PARTS:
+            raise InvalidArgumentsError(f"Unknown part '{part}', the valid parts are {list(PARTS)}")
+        new = current.bump(part, version_config.order())
+        new_version = version_config.serialize(new)
+    else:
+        new = version_config.parse(new_version)
+        if new is None:
+            raise CannotParseVersionError(new_version)
+    return current_version, new_version, current, new
+
+
+def plan(
+    config: LoadedConfig,
+    part: Optional[str] = None,
+    new_version: Optional[str] = None,
+    current_version: Optional[str] = None,
+    allow_dirty: bool = False,
+    context: Optional[Dict[str, Union[str, datetime]]] = None,
+) -> BumpPlan:
+    """
+    Check the bump of the current version by its part, or to the new version, and render the edits of the files.
+
+    The current version is the one of the config file unless it is given. Raise WorkingDirectoryIsDirtyError unless
+    `allow_dirty`, DiscoveryError if files which should be managed are not, and VersionNotFoundError if a managed file
+    does not contain the current version.
+    """
+    current_version, new_version, current, new = _resolve_versions(config, part, new_version, current_version)
+    return _build_plan(
+        config,
+        current_version,
+        new_version,
+        current,
+        new,
+        {**time_context(), **config.vcs_info, **(context or {})},
+        allow_dirty,
+        config.options.get("tag_name", DEFAULT_TAG_NAME),
+    )
+
+
+class ApplyResult:
+    def __init__(self, changed_files: List[str], config_file: str, dry_run: bool):
+        self.changed_files = changed_files
+        self.config_file = config_file
+        self.dry_run = dry_run
+
+    def __repr__(self):
+        return f"<bumpsemver.ApplyResult:{len(self.changed_files)} changed{' (dry run)' if self.dry_run else ''}>"
+
+
+def _write_edits(files: List[FileTypeBase], edits: List[FileEdit], dry_run: bool) -> None:
+    for file_item, edit in zip(files, edits):
+        with profiling.phase(f"replace {file_item.file_type}:{file_item.filename}", "file"):
+            file_item.update_file(edit.before, edit.after, dry_run)
+
+
+def apply(bump_plan: BumpPlan, dry_run: bool = False) -> ApplyResult:
+    """
+    Write the planned edits to the managed files, and the new version to the config file, unless it is a dry run.
+    """
+    config = bump_plan.config
+    with profiling.phase("replace"):
+        _write_edits(config.files, bump_plan.edits, dry_run)
+    with profiling.phase("config_rewrite"):
+        _update_config_file(config.config_file, bump_plan.new_version, dry_run)
+    events.emit("config_updated", config_file=config.config_file, dry_run=dry_run)
+    return ApplyResult([edit.filename for edit in bump_plan.edits if edit.changed], config.config_file, dry_run)
+
+
+class CommitResult:
+    def __init__(self, message: str, files: List[str], sha: Optional[str]):
+        self.message = message
+        self.files = files
+        # None if the commit was only logged
+        self.sha = sha
+
+    @property
+    def committed(self) -> bool:
+        return self.sha is not None
+
+    def __repr__(self):
+        return f"<bumpsemver.CommitResult:{self.sha or 'not committed'}>"
+
+
+def _require_vcs(vcs: Optional[Type[Git]]) -> Type[Git]:
+    if vcs is None:
+        raise InvalidArgumentsError("Git was not usable or the working tree was dirty when planning the bump")
+    return vcs
+
+
+def _commit_files(
+    vcs: Type[Git], commit_files: List[str], commit_message: str, context: Dict[str, Any], dry_run: bool
+) -> CommitResult:
+    do_commit = not dry_run
+    logger.info("%s %s commit", "Would prepare" if not do_commit else "Preparing", vcs.__name__)
+    for path in commit_files:
+        logger.info("%s changes in file '%s' to %s", "Would add" if not do_commit else "Adding", path, vcs.__name__)
+
+        if do_commit:
+            vcs.add_path(path)
+
+    logger.info(
+        "%s to %s with message '%s'", "Would commit" if not do_commit else "Committing", vcs.__name__, commit_message
+    )
+    sha = None
+    if do_commit:
+        vcs.commit(message=commit_message, context=context)
+        sha = vcs.head_sha()
+        events.emit("commit", sha=sha, message=commit_message, files=commit_files)
+    return CommitResult(commit_message, commit_files, sha)
+
+
+def commit(bump_plan: BumpPlan, message: Optional[str] = None, dry_run: bool = False) -> CommitResult:
+    """
+    Commit the managed files and the config file, with the message template of the config file unless it is given.
+    """
+    vcs = _require_vcs(bump_plan.vcs)
+    commit_files = [file.filename for file in bump_plan.config.files]
+    commit_files.append(bump_plan.config.config_file)
+    context = bump_plan.release_context
+    commit_message = (message or bump_plan.config.options.get("message", DEFAULT_MESSAGE)).format(**context)
+    return _commit_files(vcs, commit_files, commit_message, context, dry_run)
+
+
+class TagResult:
+    def __init__(self, name: str, message: str, signed: bool, tagged: bool):
+        self.name = name
+        self.message = message
+        self.signed = signed
+        self.tagged = tagged
+
+    def __repr__(self):
+        return f"<bumpsemver.TagResult:{self.name}:{'tagged' if self.tagged else 'not tagged'}>"
+
+
+def tag(
+    bump_plan: BumpPlan,
+    name: Optional[str] = None,
+    message: Optional[str] = None,
+    sign: Optional[bool] = None,
+    dry_run: bool = False,
+) -> TagResult:
+    """
+    Tag the new version, with the tag templates and the signing of the config file unless they are given.
+    """
+    vcs = _require_vcs(bump_plan.vcs)
+    options = bump_plan.config.options
+    context = bump_plan.release_context
+    sign_tags = _is_enabled(options.get("sign_tags", False)) if sign is None else sign
+    tag_name = (name or options.get("tag_name", DEFAULT_TAG_NAME)).format(**context)
+    tag_message = (options.get("tag_message", DEFAULT_MESSAGE) if message is None else message).format(**context)
+    do_tag = not dry_run
+    action = "Would tag" if not do_tag else "Tagging"
+    signing = "signing" if sign_tags else "not signing"
+    if tag_message:
+        logger.info("%s `%s` with message `%s` in %s and %s", action, tag_name, tag_message, vcs.__name__, signing)
+    else:
+        logger.info("%s `%s` without message in %s and %s", action, tag_name, vcs.__name__, signing)
+    if do_tag:
+        vcs.tag(tag_name, sign_tags, tag_message)
+        events.emit("tag", name=tag_name, message=tag_message, signed=sign_tags)
+    return TagResult(tag_name, tag_message, sign_tags, do_tag)
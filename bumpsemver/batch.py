@@ -0,0 +1,159 @@
+"""
+Bump many repositories in one run, each of them in a pool of worker processes, for `bumpsemver batch`.
+"""
+
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+from bumpsemver import api, profiling
+from bumpsemver.exceptions import InvalidArgumentsError
+
+logger = logging.getLogger(__name__)
+
+
+class ManifestEntry:
+    """
+    A repository of the manifest, with the part to bump or the new version.
+    """
+
+    def __init__(self, path: str, part: Optional[str] = None, new_version: Optional[str] = None):
+        self.path = path
+        self.part = part
+        self.new_version = new_version
+
+    def __repr__(self):
+        return f"<bumpsemver.ManifestEntry:{self.path}:{self.part or self.new_version}>"
+
+
+def parse_manifest(content: str, base_dir: str) -> List[ManifestEntry]:
+    """
+    Parse the lines of a manifest, each of them the path of a repository and the part to bump or the new version.
+
+    Blank lines and lines starting with # are skipped, relative paths are relative to `base_dir`.
+    """
+    entries = []
+    seen: Dict[str, int] = {}
+    for lineno, line in enumerate(content.splitlines(), start=1):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        tokens = stripped.split()
+        if len(tokens) != 2:
+            raise InvalidArgumentsError(
+                f"Invalid manifest line {lineno}: '{stripped}', expected a repository path and a part or a new version"
+            )
+        path = os.path.normpath(os.path.join(base_dir, tokens[0]))
+        if path in seen:
+            raise InvalidArgumentsError(f"Repository '{tokens[0]}' is listed on both line {seen[path]} and {lineno}")
+        seen[path] = lineno
+        if tokens[1] in api.PARTS:
+            entries.append(ManifestEntry(path, part=tokens[1]))
+        else:
+            entries.append(ManifestEntry(path, new_version=tokens[1]))
+    return entries
+
+
+class RepoResult:
+    def __init__(self, entry: ManifestEntry):
+        self.path = entry.path
+        self.part = entry.part
+        self.exit_code = 0
+        self.error: Optional[str] = None
+        self.current_version: Optional[str] = None
+        self.new_version = entry.new_version
+        self.commit_sha: Optional[str] = None
+        self.tag: Optional[str] = None
+        self.seconds = 0.0
+        self.phases: Dict[str, float] = {}
+
+    def as_dict(self) -> Dict:
+        return {
+            "path": self.path,
+            "part": self.part,
+            "exit_code": self.exit_code,
+            "error": self.error,
+            "current_version": self.current_version,
+            "new_version": self.new_version,
+            "commit_sha": self.commit_sha,
+            "tag": self.tag,
+            "seconds": round(self.seconds, 6),
+            "phases": self.phases,
+        }
+
+
+def bump_repository(entry: ManifestEntry, dry_run: bool = False, allow_dirty: bool = False) -> RepoResult:
+    """
+    Bump a repository as `bumpsemver` run in it would, committing and tagging as its config file tells.
+
+    The errors are not raised but reported in the result, with the exit code of the command line.
+    """
+    result = RepoResult(entry)
+    started = time.perf_counter()
+    cwd = os.getcwd()
+    profiling.start(None)
+    try:
+        os.chdir(entry.path)
+        config = api.load_config()
+        bump_plan = api.plan(config, entry.part, entry.new_version, allow_dirty=allow_dirty)
+        result.current_version = bump_plan.current_version
+        result.new_version = bump_plan.new_version
+        api.apply(bump_plan, dry_run)
+        if bump_plan.vcs:
+            with profiling.phase("commit"):
+                commit_result = api.commit(bump_plan, dry_run=dry_run or not config.options.get("commit", False))
+            result.commit_sha = commit_result.sha
+            with profiling.phase("tag"):
+                tag_result = api.tag(bump_plan, dry_run=dry_run or not config.options.get("tag", False))
+            if tag_result.tagged:
+                result.tag = tag_result.name
+    except Exception as exc:
+        result.exit_code = api.exit_code(exc)
+        result.error = getattr(exc, "message", None) or str(exc) or type(exc).__name__
+        logger.error("Failed to bump '%s': %s", entry.path, result.error)
+    finally:
+        os.chdir(cwd)
+        profiler = profiling.stop()
+        result.seconds = time.perf_counter() - started
+        result.phases = {stats.name: round(stats.wall, 6) for stats in profiler.stats.values() if stats.kind == "phase"}
+    return result
+
+
+def _failed(entry: ManifestEntry, error: str) -> RepoResult:
+    result = RepoResult(entry)
+    result.exit_code = 128
+    result.error = error
+    return result
+
+
+def run_batch(
+    entries: List[ManifestEntry], jobs: Optional[int] = None, dry_run: bool = False, allow_dirty: bool = False
+) -> List[RepoResult]:
+    """
+    Bump the repositories with at most `jobs` worker processes, and return their results in the order of `entries`.
+
+    Every repository is bumped in a worker process of its own, which changes its working directory to it, so that the
+    interpreter startup and the imports are paid once per worker instead of once per repository.
+    """
+    workers = min(jobs or os.cpu_count() or 1, len(entries))
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+
+        try:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        except OSError as exc:
+            logger.debug("Failed to start the worker processes, falling back to sequential: %s", exc)
+        else:
+            with executor:
+                futures = [executor.submit(bump_repository, entry, dry_run, allow_dirty) for entry in entries]
+                results = []
+                for entry, future in zip(entries, futures):
+                    try:
+                        results.append(future.result())
+                    except BrokenProcessPool as exc:
+                        # whether the repository was bumped or not is unknown, so it is not bumped again
+                        results.append(_failed(entry, f"The worker process bumping the repository died: {exc}"))
+                return results
+    return [bump_repository(entry, dry_run, allow_dirty) for entry in entries]
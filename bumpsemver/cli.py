@@ -1,28 +1,31 @@
 import argparse
+import json
 import logging
-import subprocess
+import os
 import sys
-from datetime import datetime
-from typing import Dict, Tuple
-
-from bumpsemver import __title__, __version__
-from bumpsemver.config import _determine_config_file, _load_configuration, _update_config_file
-from bumpsemver.discovery import discover_unmanaged_files
+import time
+from typing import Dict, Optional
+
+from bumpsemver import __title__, __version__, events, profiling
+from bumpsemver.api import (
+    DEFAULT_MESSAGE,
+    DEFAULT_TAG_NAME,
+    NO_CONFIG_FILE_MESSAGE,
+    LoadedConfig,
+    _build_plan,
+    _determine_discovery_baseline,
+    apply,
+    commit,
+    exit_code,
+    probe_vcs,
+    tag,
+    time_context,
+)
+from bumpsemver.config import _determine_config_file, _load_configuration
+from bumpsemver.discovery import run_discovery
 from bumpsemver.exceptions import (
-    CannotParseVersionError,
-    DiscoveryError,
-    FileTypeMismatchError,
     InvalidArgumentsError,
-    InvalidConfigSectionError,
-    InvalidFileError,
-    MixedNewLineError,
-    MultiValuesMismatchError,
-    PathNotFoundError,
-    SingleValueMismatchError,
-    VersionNotFoundError,
-    WorkingDirectoryIsDirtyError,
 )
-from bumpsemver.git import Git
 from bumpsemver.utils import key_value_string
 from bumpsemver.version_part import VersionConfig
 
@@ -30,103 +33,381 @@ python_version = sys.version.split("\n")[0].split(" ")[0]
 DESCRIPTION = f"{__title__}: v{__version__} (using Python v{python_version})"
 
 logger = logging.getLogger(__name__)
-time_context = {"now": datetime.now(), "utcnow": datetime.utcnow()}
 
 OPTIONAL_ARGUMENTS_THAT_TAKE_VALUES = [
     "--config-file",
     "--current-version",
     "--message",
     "--new-version",
+    "--output",
+    "--profile-dump",
+    "--profile-format",
     "--tag-name",
     "--tag-message",
 ]
 
 
+def _start_observers(known_args) -> Optional[events.EventEmitter]:
+    """
+    Start profiling the run and streaming its events, as the arguments tell, and return the event emitter.
+    """
+    if known_args.profile or known_args.profile_dump:
+        profiling.start(known_args.profile_format, known_args.profile_dump)
+    if known_args.output != "json-lines":
+        return None
+    if profiling.active() is None:
+        # the phases are timed for the final event, without printing a profile report
+        profiling.start(None)
+    return events.start()
+
+
+def _stop_observers(emitter: Optional[events.EventEmitter], exit_code: Optional[int]) -> None:
+    if emitter is not None:
+        emitter.close(exit_code, profiling.active())
+    profiling.stop()
+
+
+def _log_error(exc: Exception, code: int) -> None:
+    """
+    Log the error the run exits with, by the exit code of its kind.
+    """
+    if code == 1:
+        logger.error("%s", exc.message if hasattr(exc, "message") else "".join(exc.args))
+    elif code == 2:
+        logger.error("FileNotFound. %s", exc)
+    elif code == 3:
+        logger.warning("%s", exc.message)
+    elif code == 5:
+        logger.error("%s\n\nUse --allow-dirty to override this if you know what you're doing.", exc.message)
+    elif code in (4, 32):
+        logger.error("%s", exc.message)
+    elif code == 128:
+        logger.error("Unexpected error occurred: %s", exc)
+
+
 def main(original_args=None) -> None:
+    emitter = None
     try:
+        command_args = sys.argv[1:] if original_args is None else original_args
+        if command_args and command_args[0] in SUBCOMMANDS:
+            sys.exit(SUBCOMMANDS[command_args[0]](command_args[1:]))
         #
         # determine configuration based on command-line arguments and on-disk configuration files
         args, known_args, root_parser, positionals = _parse_arguments_phase_1(original_args)
         _setup_logging(known_args.verbose)
-        vcs_info = _determine_vcs_usability()
+        emitter = _start_observers(known_args)
+        with profiling.phase("git_probe"):
+            vcs_info = probe_vcs()
         defaults = _determine_current_version(vcs_info)
         explicit_config = None
         if hasattr(known_args, "config_file"):
             explicit_config = known_args.config_file
         config_file = _determine_config_file(explicit_config)
-        config, config_file_exists, config_newlines, files, ignored_for_discovery = _load_configuration(
-            config_file, explicit_config, defaults
-        )
-        known_args, parser2, remaining_argv = _parse_arguments_phase_2(args, defaults, root_parser)
-        version_config = VersionConfig()
-        current_version = version_config.parse(known_args.current_version)
-        context = {**time_context, **vcs_info}
-        #
-        # calculate the desired new version
-        new_version = _assemble_new_version(
-            current_version, defaults, known_args.current_version, positionals, version_config
+        with profiling.phase("config_load"):
+            config_file_exists, files, discovery_config = _load_configuration(config_file, explicit_config, defaults)
+        events.emit(
+            "config_loaded",
+            config_file=config_file,
+            exists=config_file_exists,
+            files=[{"file": file.filename, "file_type": file.file_type} for file in files],
         )
-        args_parsed = _parse_arguments_phase_3(remaining_argv, positionals, defaults, parser2)
-        if (
-            not config_file_exists
-            and "-h" not in args
-            and "--help" not in args
-            and "-v" not in args
-            and "--version" not in args
-        ):
-            raise InvalidArgumentsError(
-                "No valid config file is specified and the default .bumpsemver.cfg is not found"
+        with profiling.phase("version_parse"):
+            known_args, parser2, remaining_argv = _parse_arguments_phase_2(args, defaults, root_parser)
+            version_config = VersionConfig()
+            current_version = version_config.parse(known_args.current_version)
+            context = {**time_context(), **vcs_info}
+            #
+            # calculate the desired new version
+            new_version = _assemble_new_version(
+                current_version, defaults, known_args.current_version, positionals, version_config
             )
+            args_parsed = _parse_arguments_phase_3(remaining_argv, positionals, defaults, parser2)
+            if (
+                not config_file_exists
+                and "-h" not in args
+                and "--help" not in args
+                and "-v" not in args
+                and "--version" not in args
+            ):
+                raise InvalidArgumentsError(NO_CONFIG_FILE_MESSAGE)
+
+            new_version = _parse_new_version(args_parsed, new_version, version_config)
+        events.emit(
+            "version_resolved",
+            current_version=args_parsed.current_version,
+            new_version=args_parsed.new_version,
+            dry_run=args_parsed.dry_run,
+        )
 
-        new_version = _parse_new_version(args_parsed, new_version, version_config)
-
-        # replace the version in target files
-        vcs = _determine_vcs_dirty(defaults)
-
-        # discover unmanaged files
-        discover_unmanaged_files([file.filename for file in files], ignored_for_discovery)
-
-        _replace_version_in_files(files, current_version, new_version, args_parsed.dry_run, context)
-        _update_config_file(config, config_file, config_newlines, args_parsed.new_version, args_parsed.dry_run)
+        config = LoadedConfig(config_file, files, discovery_config, defaults, vcs_info)
+        bump_plan = _build_plan(
+            config,
+            args_parsed.current_version,
+            args_parsed.new_version,
+            current_version,
+            new_version,
+            context,
+            defaults["allow_dirty"],
+            args_parsed.tag_name,
+        )
+        apply(bump_plan, args_parsed.dry_run)
 
         # commit and tag
-        if vcs:
-            context = _commit_to_vcs(files, config_file, vcs, args_parsed, current_version, new_version)
-            _tag_in_vcs(vcs, context, args_parsed)
+        if bump_plan.vcs:
+            with profiling.phase("commit"):
+                commit(bump_plan, args_parsed.message, dry_run=args_parsed.dry_run or not args_parsed.commit)
+            with profiling.phase("tag"):
+                tag(
+                    bump_plan,
+                    args_parsed.tag_name,
+                    args_parsed.tag_message,
+                    args_parsed.sign_tags,
+                    dry_run=args_parsed.dry_run or not args_parsed.tag,
+                )
 
         sys.exit(0)
-    except (argparse.ArgumentTypeError, InvalidArgumentsError) as exc:
-        logger.error(f"{exc.message if hasattr(exc, 'message') else ''.join(exc.args)}")
-        sys.exit(1)
-    except FileNotFoundError as exc:
-        logger.error(f"FileNotFound. {exc!s}")
-        sys.exit(2)
-    except MixedNewLineError as exc:
-        logger.warning(f"{exc.message}")
-        sys.exit(3)
-    except (
-        CannotParseVersionError,
-        FileTypeMismatchError,
-        InvalidConfigSectionError,
-        InvalidFileError,
-        MultiValuesMismatchError,
-        PathNotFoundError,
-        SingleValueMismatchError,
-        VersionNotFoundError,
-    ) as exc:
-        logger.error(f"{exc.message}")
-        sys.exit(4)
-    except WorkingDirectoryIsDirtyError as exc:
-        logger.error(f"{exc.message}\n\nUse --allow-dirty to override this if you know what you're doing.")
-        sys.exit(5)
-    except subprocess.CalledProcessError:
-        sys.exit(10)
-    except DiscoveryError as exc:
-        logger.error(exc.message)
-        sys.exit(32)
     except Exception as exc:
-        logger.error(f"Unexpected error occurred: {exc!s}")
-        sys.exit(128)
+        code = exit_code(exc)
+        _log_error(exc, code)
+        sys.exit(code)
+    finally:
+        exc_value = sys.exc_info()[1]
+        _stop_observers(emitter, exc_value.code if isinstance(exc_value, SystemExit) else None)
+
+
+def _discover(args) -> int:
+    """
+    Run discovery only, without resolving any version, and print the verdicts and timings as JSON.
+    """
+    parser = argparse.ArgumentParser(
+        prog="bumpsemver discover",
+        description="Discover the files that should be managed by the config file, and report them as JSON",
+    )
+    parser.add_argument(
+        "--config-file",
+        metavar="FILE",
+        default=None,
+        help="Config file to read the managed files and the discovery settings from (default: .bumpsemver.cfg)",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="count",
+        default=0,
+        help="Print verbose logging, use it twice for debug level",
+    )
+    known_args = parser.parse_args(args)
+    _setup_logging(known_args.verbose)
+
+    config_file = _determine_config_file(known_args.config_file)
+    defaults: Dict[str, str] = {}
+    config_file_exists, files, discovery_config = _load_configuration(config_file, known_args.config_file, defaults)
+    if not config_file_exists:
+        raise InvalidArgumentsError(NO_CONFIG_FILE_MESSAGE)
+
+    report = run_discovery(
+        [file.filename for file in files],
+        discovery_config.ignore,
+        _determine_discovery_baseline(discovery_config, defaults.get("tag_name", DEFAULT_TAG_NAME)),
+        discovery_config.tracked_files,
+    )
+    sys.stdout.write(json.dumps(report.as_dict(), indent=2) + "\n")
+    return 32 if report.issues else 0
+
+
+def _batch(args) -> int:
+    """
+    Bump the repositories listed in a manifest with a pool of worker processes, and print their results as JSON.
+    """
+    from bumpsemver.batch import parse_manifest, run_batch
+
+    parser = argparse.ArgumentParser(
+        prog="bumpsemver batch",
+        description=(
+            "Bump the repositories listed in a manifest, one per line with the part to bump or the new version, "
+            "and report the results as JSON"
+        ),
+    )
+    parser.add_argument("manifest", metavar="MANIFEST", help="Manifest file, or - to read it from stdin")
+    parser.add_argument(
+        "--jobs",
+        metavar="N",
+        type=int,
+        default=None,
+        help="Number of repositories bumped in parallel (default: the number of CPUs)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        default=False,
+        help="Don't write any files, just pretend.",
+    )
+    parser.add_argument(
+        "--allow-dirty",
+        action="store_true",
+        default=False,
+        help="Don't abort if the working directory of a repository is dirty",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="count",
+        default=0,
+        help="Print verbose logging, use it twice for debug level",
+    )
+    known_args = parser.parse_args(args)
+    _setup_logging(known_args.verbose)
+    if known_args.jobs is not None and known_args.jobs < 1:
+        raise InvalidArgumentsError("--jobs must be at least 1")
+
+    if known_args.manifest == "-":
+        entries = parse_manifest(sys.stdin.read(), os.getcwd())
+    else:
+        with open(known_args.manifest, "rt", encoding="utf-8") as manifest_fp:
+            entries = parse_manifest(manifest_fp.read(), os.path.dirname(os.path.abspath(known_args.manifest)))
+
+    started = time.perf_counter()
+    results = run_batch(entries, known_args.jobs, known_args.dry_run, known_args.allow_dirty)
+    report = {
+        "results": [result.as_dict() for result in results],
+        "failed": sum(1 for result in results if result.exit_code),
+        "seconds": round(time.perf_counter() - started, 6),
+    }
+    sys.stdout.write(json.dumps(report, indent=2) + "\n")
+    return next((result.exit_code for result in results if result.exit_code), 0)
+
+
+def _workspace(args) -> int:
+    """
+    Bump the projects of every config file in the repository with one commit, and a tag for each of them.
+    """
+    from bumpsemver.workspace import apply_workspace, commit_workspace, load_workspace, plan_workspace, tag_workspace
+
+    parser = argparse.ArgumentParser(
+        prog="bumpsemver workspace",
+        description=(
+            "Bump the projects of every .bumpsemver.cfg in the repository, with the paths of each of them relative to "
+            "the directory of its config file"
+        ),
+    )
+    parser.add_argument(
+        "--project",
+        metavar="DIR",
+        action="append",
+        dest="projects",
+        default=None,
+        help="Directory of a project to bump, relative to the root of the repository (default: all the projects)",
+    )
+    parser.add_argument(
+        "--new-version",
+        metavar="VERSION",
+        default=None,
+        help="New version of the bumped projects, instead of bumping their part",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        default=False,
+        help="Don't write any files, just pretend.",
+    )
+    parser.add_argument(
+        "--allow-dirty",
+        action="store_true",
+        default=False,
+        help="Don't abort if working directory is dirty",
+    )
+    commit_group = parser.add_mutually_exclusive_group()
+    commit_group.add_argument(
+        "--commit",
+        action="store_true",
+        dest="commit",
+        default=None,
+        help="Commit to version control (default: if the config file of a bumped project tells so)",
+    )
+    commit_group.add_argument(
+        "--no-commit",
+        action="store_false",
+        dest="commit",
+        help="Do not commit to version control",
+    )
+    tag_group = parser.add_mutually_exclusive_group()
+    tag_group.add_argument(
+        "--tag",
+        action="store_true",
+        dest="tag",
+        default=None,
+        help="Tag every bumped project in version control (default: as the config file of each project tells)",
+    )
+    tag_group.add_argument(
+        "--no-tag",
+        action="store_false",
+        dest="tag",
+        help="Do not create any tag in version control",
+    )
+    parser.add_argument("--message", metavar="COMMIT_MSG", default=None, help="Commit message, with {changes}")
+    parser.add_argument(
+        "--propagate",
+        action="store_true",
+        default=False,
+        help="Update the dependency ranges on the bumped packages in the package.json and pyproject.toml files",
+    )
+    parser.add_argument(
+        "--dependents-part",
+        default="patch",
+        choices=["major", "minor", "patch", "prerelease", "none"],
+        help=(
+            "Part to bump of the projects with updated dependency ranges, 'none' to only update the ranges "
+            "(default: patch)"
+        ),
+    )
+    parser.add_argument(
+        "--verbose",
+        action="count",
+        default=0,
+        help="Print verbose logging, use it twice for debug level",
+    )
+    parser.add_argument(
+        "part", nargs="?", help="Part of the version to be bumped", choices=["major", "minor", "patch", "prerelease"]
+    )
+    known_args = parser.parse_args(args)
+    _setup_logging(known_args.verbose)
+
+    workspace = load_workspace()
+    if known_args.propagate:
+        from bumpsemver.propagation import plan_propagation
+
+        workspace_plan = plan_propagation(
+            workspace,
+            known_args.part,
+            known_args.new_version,
+            known_args.projects,
+            None if known_args.dependents_part == "none" else known_args.dependents_part,
+            known_args.allow_dirty,
+        )
+    else:
+        workspace_plan = plan_workspace(
+            workspace, known_args.part, known_args.new_version, known_args.projects, known_args.allow_dirty
+        )
+    apply_workspace(workspace_plan, known_args.dry_run)
+    if workspace_plan.vcs:
+        plans = workspace_plan.plans
+        do_commit = known_args.commit
+        if do_commit is None:
+            do_commit = any(bump_plan.config.options.get("commit", False) for bump_plan in plans.values())
+        commit_workspace(workspace_plan, known_args.message, dry_run=known_args.dry_run or not do_commit)
+        tagged = [
+            project
+            for project, bump_plan in plans.items()
+            if (bump_plan.config.options.get("tag", False) if known_args.tag is None else known_args.tag)
+        ]
+        tag_workspace(workspace_plan, tagged, dry_run=known_args.dry_run)
+    return 0
+
+
+# the commands run instead of a bump when given as the first argument, each returns the exit code
+SUBCOMMANDS = {
+    "discover": _discover,
+    "batch": _batch,
+    "workspace": _workspace,
+}
 
 
 def split_args_in_optional_and_positional(args):
@@ -178,6 +459,36 @@ def _parse_arguments_phase_1(original_args):
         version=f"%(prog)s {__version__}",
         help="Print version and exit",
     )
+    root_parser.add_argument(
+        "--output",
+        metavar="FORMAT",
+        choices=["text", "json-lines"],
+        default="text",
+        help="Use json-lines to report the progress as typed events on stdout, the logs always go to stderr",
+        required=False,
+    )
+    root_parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=False,
+        help="Print the time spent in each phase and file handler to stderr at exit",
+        required=False,
+    )
+    root_parser.add_argument(
+        "--profile-format",
+        metavar="FORMAT",
+        choices=["table", "json"],
+        default="table",
+        help="Format of the profile report, table or json",
+        required=False,
+    )
+    root_parser.add_argument(
+        "--profile-dump",
+        metavar="FILE",
+        default=None,
+        help="Profile the run with cProfile and dump the pstats into FILE, implies --profile",
+        required=False,
+    )
     known_args, _ = root_parser.parse_known_args(args)
 
     return args, known_args, root_parser, positionals
@@ -191,14 +502,7 @@ def _setup_logging(verbose: int) -> None:
     logging.basicConfig(format="%(levelname)s:%(message)s")
     root_logger = logging.getLogger("")
     root_logger.setLevel(log_level)
-    logger.debug(f"Starting {DESCRIPTION}")
-
-
-def _determine_vcs_usability():
-    vcs_info = {}
-    if Git.is_usable():
-        vcs_info.update(Git.latest_tag_info())
-    return vcs_info
+    logger.debug("Starting %s", DESCRIPTION)
 
 
 def _determine_current_version(vcs_info):
@@ -229,9 +533,10 @@ def _assemble_new_version(current_version, defaults, arg_current_version, positi
     if "new_version" not in defaults and arg_current_version:
         try:
             if current_version and positionals:
-                logger.info(f"Attempting to increment part '{positionals[0]}'")
+                logger.info("Attempting to increment part '%s'", positionals[0])
                 new_version = current_version.bump(positionals[0], version_config.order())
-                logger.info(f"Values are now: {key_value_string(new_version.values)}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Values are now: %s", key_value_string(new_version.values))
                 defaults["new_version"] = version_config.serialize(new_version)
         except KeyError:
             logger.info("Opportunistic finding of new_version failed")
@@ -314,22 +619,24 @@ def _parse_arguments_phase_3(remaining_argv, positionals, defaults, parser2):
         "--tag-name",
         metavar="TAG_NAME",
         help="Tag name (only works with --tag)",
-        default=defaults.get("tag_name", "v{new_version}"),
+        default=defaults.get("tag_name", DEFAULT_TAG_NAME),
     )
     parser3.add_argument(
         "--tag-message",
         metavar="TAG_MESSAGE",
         dest="tag_message",
         help="Tag message",
-        default=defaults.get("tag_message", "build(repo): bumped version {current_version} → {new_version}"),
+        default=defaults.get("tag_message", DEFAULT_MESSAGE),
     )
     parser3.add_argument(
         "--message",
         metavar="COMMIT_MSG",
         help="Commit message",
-        default=defaults.get("message", "build(repo): bumped version {current_version} → {new_version}"),
+        default=defaults.get("message", DEFAULT_MESSAGE),
+    )
+    parser3.add_argument(
+        "part", help="Part of the version to be bumped", choices=["major", "minor", "patch", "prerelease"]
     )
-    parser3.add_argument("part", help="Part of the version to be bumped", choices=["major", "minor", "patch"])
 
     args = parser3.parse_args(remaining_argv + positionals)
 
@@ -342,75 +649,5 @@ def _parse_arguments_phase_3(remaining_argv, positionals, defaults, parser2):
 def _parse_new_version(args, new_version, version_config):
     if args.new_version:
         new_version = version_config.parse(args.new_version)
-    logger.info(f"New version will be '{args.new_version}'")
+    logger.info("New version will be '%s'", args.new_version)
     return new_version
-
-
-def _determine_vcs_dirty(defaults):
-    if not Git.is_usable():
-        return None
-
-    try:
-        Git.assert_non_dirty()
-    except WorkingDirectoryIsDirtyError:
-        if defaults["allow_dirty"]:
-            return None
-        raise
-
-    return Git
-
-
-def _replace_version_in_files(files, current_version, new_version, dry_run, context: Dict[str, Tuple[str, datetime]]):
-    #
-    # make sure files exist and contain version string
-    logger.info(f"Asserting files {', '.join([str(f) for f in files])} contain the version string...")
-    for file_item in files:
-        file_item.should_contain_version(current_version, context)
-    #
-    # change version string in files
-    for file_item in files:
-        file_item.replace(current_version, new_version, context, dry_run)
-
-
-def _commit_to_vcs(files, config_file, vcs, args, current_version, new_version):
-    commit_files = [f.filename for f in files]
-    commit_files.append(config_file)
-    assert vcs.is_usable(), f"Did find '{vcs.__name__}' unusable, unable to commit."
-    do_commit = args.commit and not args.dry_run
-    logger.info(f"{'Would prepare' if not do_commit else 'Preparing'} {vcs.__name__} commit")
-    for path in commit_files:
-        logger.info(f"{'Would add' if not do_commit else 'Adding'} changes in file '{path}' to {vcs.__name__}")
-
-        if do_commit:
-            vcs.add_path(path)
-
-    context = {
-        "current_version": args.current_version,
-        "new_version": args.new_version,
-    }
-    context.update(time_context)
-    context.update({f"current_{part}": current_version[part].value for part in current_version})
-    context.update({f"new_{part}": new_version[part].value for part in new_version})
-
-    commit_message = args.message.format(**context)
-
-    logger.info(
-        f"{'Would commit' if not do_commit else 'Committing'} to {vcs.__name__} with message '{commit_message}'"
-    )
-    if do_commit:
-        vcs.commit(message=commit_message, context=context)
-    return context
-
-
-def _tag_in_vcs(vcs, context, args):
-    sign_tags = args.sign_tags
-    tag_name = args.tag_name.format(**context)
-    tag_message = args.tag_message.format(**context)
-    do_tag = args.tag and not args.dry_run
-    logger.info(
-        f"{'Would tag' if not do_tag else 'Tagging'} `{tag_name}` "
-        f"{f'with message `{tag_message}`' if tag_message else 'without message'} "
-        f"in {vcs.__name__} and {'signing' if sign_tags else 'not signing'}"
-    )
-    if do_tag:
-        vcs.tag(tag_name, sign_tags, tag_message)
@@ -1,21 +1,37 @@
 import argparse
-import io
+import hashlib
+import json
 import logging
 import os
+import posixpath
 import re
+import shutil
 from configparser import NoOptionError, RawConfigParser
-from typing import Dict, List, Tuple, Type
+from functools import partial
+from importlib import import_module
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Callable, Dict, List, Optional, Tuple, Type
 
+from bumpsemver import __version__
 from bumpsemver.exceptions import FileTypeMismatchError, InvalidConfigSectionError
 from bumpsemver.files.base import FileTypeBase
-from bumpsemver.files.json import ConfiguredJSONFile
-from bumpsemver.files.text import ConfiguredPlainTextFile
-from bumpsemver.files.toml import ConfiguredTOMLFile
-from bumpsemver.files.yaml import ConfiguredYAMLFile
+from bumpsemver.git import Git
+from bumpsemver.utils import RE_GLOB_CHARS, GlobSet
 from bumpsemver.version_part import VersionConfig
 
 logger = logging.getLogger(__name__)
 
+# below this size, parsing the config file costs less than finding the git directory to look up the cache
+CONFIG_CACHE_MIN_SIZE = 16 * 1024
+
+# bump it whenever the format of the compiled configuration changes
+CONFIG_CACHE_VERSION = 1
+
+# the section headers and the option lines of an ini file, as configparser reads them
+RE_INI_SECTION = re.compile(r"^\s*\[(?P<header>.+)\]")
+RE_INI_OPTION = re.compile(r"^(?P<option>[^\s#;\[=:][^=:]*?)\s*[=:]\s*(?P<value>.*?)\s*$")
+
 # detect either:
 # bumpsemver:toml:value
 # bumpsemver:toml(suffix):value
@@ -26,26 +42,47 @@ RE_CONFIG_SECTION = re.compile(
 
 
 class SectionConfig:
-    def __init__(self, handler: Type[FileTypeBase], xpath_supported: bool, props: Dict[str, str]):
-        self.handler = handler
+    """
+    The handler is given as "module:class" and imported on first use only, so that the parsing libraries of the file
+    types not mentioned in the config file are never loaded.
+    """
+
+    def __init__(self, handler: str, xpath_supported: bool, props: Dict[str, str]):
+        self.handler_path = handler
         self.xpath_supported = xpath_supported
         self.props = props
+        self._handler: Optional[Type[FileTypeBase]] = None
+
+    @property
+    def handler(self) -> Type[FileTypeBase]:
+        if self._handler is None:
+            module_name, _, class_name = self.handler_path.partition(":")
+            self._handler = getattr(import_module(module_name), class_name)
+        return self._handler
+
+
+class DiscoveryConfig:
+    def __init__(self, ignore: List[str] = None, incremental: bool = False):
+        self.ignore = ignore or []
+        self.incremental = incremental
+        # the files tracked by git, if they have already been listed to expand glob sections
+        self.tracked_files: Optional[List[Tuple[str, Optional[str]]]] = None
 
 
 file_types_config = {
     "plaintext": SectionConfig(
-        ConfiguredPlainTextFile,
+        "bumpsemver.files.text:ConfiguredPlainTextFile",
         False,
         {"search": "{current_version}", "replace": "{new_version}"},
     ),
     "file": SectionConfig(
-        ConfiguredPlainTextFile,
+        "bumpsemver.files.text:ConfiguredPlainTextFile",
         False,
         {"search": "{current_version}", "replace": "{new_version}"},
     ),
-    "json": SectionConfig(ConfiguredJSONFile, True, {"jsonpath": "version"}),
-    "yaml": SectionConfig(ConfiguredYAMLFile, True, {"yamlpath": "version"}),
-    "toml": SectionConfig(ConfiguredTOMLFile, True, {"tomlpath": "version"}),
+    "json": SectionConfig("bumpsemver.files.json:ConfiguredJSONFile", True, {"jsonpath": "version"}),
+    "yaml": SectionConfig("bumpsemver.files.yaml:ConfiguredYAMLFile", True, {"yamlpath": "version"}),
+    "toml": SectionConfig("bumpsemver.files.toml:ConfiguredTOMLFile", True, {"tomlpath": "version"}),
 }
 
 
@@ -72,19 +109,71 @@ def _check_section_config(section: str, acceptable_keys: List[str], actual_confi
         raise InvalidConfigSectionError(f"Invalid config file. Unknown keys {unknown_keys} in section '{section}'")
 
 
-def _parse_sections(config: RawConfigParser, defaults, sections) -> Tuple[List[FileTypeBase], List[str]]:
+def _parse_discovery_section(config: RawConfigParser, section_name: str) -> DiscoveryConfig:
+    discovery_props = dict(config.items(section_name))
+    _check_section_config(section_name, ["ignore", "incremental"], [*config[section_name]])
+    if "ignore" not in discovery_props:
+        discovery_props["ignore"] = ""
+    try:
+        incremental = config.getboolean(section_name, "incremental", fallback=False)
+    except ValueError as exc:
+        raise InvalidConfigSectionError(
+            f"Invalid config file. Value of 'incremental' in section '{section_name}' is not a boolean"
+        ) from exc
+    return DiscoveryConfig(
+        [item for item in (line.strip() for line in discovery_props["ignore"].split("\n")) if item],
+        incremental,
+    )
+
+
+def _expand_glob_sections(
+    sections: List[Tuple[str, str, Callable[[str], FileTypeBase]]], discovery_config: DiscoveryConfig
+) -> List[FileTypeBase]:
+    """
+    Create a handler for every file matched by the glob pattern of a section, or for the one file it names.
+
+    The files tracked by git are listed only once for all the glob patterns, and kept for discovery.
+    """
+    patterns = [filename for _, filename, _ in sections if RE_GLOB_CHARS.search(filename)]
+    matches: Dict[str, List[str]] = {pattern: [] for pattern in patterns}
+    if patterns:
+        globs = GlobSet(patterns)
+        if discovery_config.tracked_files is None:
+            discovery_config.tracked_files = Git.list_tracked_files()
+        for path, _ in discovery_config.tracked_files:
+            for index in globs.match(path):
+                matches[globs.patterns[index]].append(path)
+
     files: List[FileTypeBase] = []
-    ignored_for_discovery: List[str] = []
+    for section_name, filename, create_handler in sections:
+        if filename not in matches:
+            files.append(create_handler(filename))
+            continue
+        if not matches[filename]:
+            raise InvalidConfigSectionError(
+                f"Invalid config file. Pattern '{filename}' in section '{section_name}' matches no files"
+            )
+        logger.info("Section [%s] matches %d files", section_name, len(matches[filename]))
+        files.extend(create_handler(path) for path in sorted(matches[filename]))
+    return files
+
+
+def _warn(warnings: List[str], message: str) -> None:
+    # the warnings are kept with the compiled configuration, to be repeated whenever it is loaded from the cache
+    logger.warning("%s", message)
+    warnings.append(message)
+
+
+def _compile_sections(config: RawConfigParser, defaults, sections, warnings: List[str]) -> Tuple[List[Dict], Dict]:
+    """
+    Validate the file-specific and the discovery sections, and normalize them into plain data.
+    """
+    file_sections: List[Dict] = []
+    discovery_config = DiscoveryConfig()
 
     for section_name in sections:
         if section_name == "bumpsemver:discovery":
-            discovery_props = dict(config.items(section_name))
-            _check_section_config(section_name, ["ignore"], [*config[section_name]])
-            if "ignore" not in discovery_props:
-                discovery_props["ignore"] = ""
-            ignored_for_discovery = [
-                item for item in (line.strip() for line in discovery_props["ignore"].split("\n")) if item
-            ]
+            discovery_config = _parse_discovery_section(config, section_name)
             continue
 
         parsed_section_header = RE_CONFIG_SECTION.match(section_name)
@@ -99,7 +188,7 @@ def _parse_sections(config: RawConfigParser, defaults, sections) -> Tuple[List[F
 
         file_type_override = False
         if file_type.endswith("!"):
-            logger.warning(f"Section [{section_name}] bypasses file type detection")
+            _warn(warnings, f"Section [{section_name}] bypasses file type detection")
             file_type = file_type.rstrip("!")
             file_type_override = True
 
@@ -118,75 +207,238 @@ def _parse_sections(config: RawConfigParser, defaults, sections) -> Tuple[List[F
                 raise FileTypeMismatchError(file_type, ext if ext != "yml" else "yaml", filename)
 
         if file_type == "file":
-            logger.warning("File type 'file' is deprecated, please use 'plaintext' instead.")
+            _warn(warnings, "File type 'file' is deprecated, please use 'plaintext' instead.")
 
         for k, v in type_info.props.items():
             if k not in section_props:
                 section_props[k] = defaults.get(k, v)
 
+        file_sections.append(
+            {"name": section_name, "file_type": file_type, "filename": filename, "props": section_props}
+        )
+
+    discovery = {"ignore": discovery_config.ignore, "incremental": discovery_config.incremental}
+    return file_sections, discovery
+
+
+def _create_files(file_sections: List[Dict], discovery_config: DiscoveryConfig) -> List[FileTypeBase]:
+    handlers: List[Tuple[str, str, Callable[[str], FileTypeBase]]] = []
+    for section in file_sections:
+        file_type = section["file_type"]
+        type_info = file_types_config[file_type]
+        section_props = dict(section["props"])
+        # all the sections with the same search and replace, and the files matched by them, share one version config
         if type_info.xpath_supported:
             path_key = next(iter(type_info.props.keys()))
             path = section_props.pop(path_key, None)
-            files.append(type_info.handler(filename, VersionConfig(**section_props), file_type, path))
+            create_handler = partial(
+                type_info.handler,
+                version_config=VersionConfig.interned(**section_props),
+                file_type=file_type,
+                **{path_key: path},
+            )
         else:
-            files.append(type_info.handler(filename, VersionConfig(**section_props)))
-
-    return files, ignored_for_discovery
+            create_handler = partial(type_info.handler, version_config=VersionConfig.interned(**section_props))
+        handlers.append((section["name"], section["filename"], create_handler))
+    return _expand_glob_sections(handlers, discovery_config)
 
 
-def _load_configuration(config_file, explicit_config, defaults):
+def _compile_configuration(config_content: str) -> Dict:
+    """
+    Parse the content of a config file into its validated and normalized form, which can be cached as JSON.
+    """
     # noinspection PyTypeChecker
     config = RawConfigParser("")
     # don't transform keys to lowercase (which would be the default)
     config.optionxform = lambda option: option
     config.add_section("bumpsemver")
-
-    if not _config_file_exists(config_file, explicit_config):
-        return config, False, None, [], []
-
-    logger.info(f"Reading config file {config_file}:")
-
-    with open(config_file, "rt", encoding="utf-8") as config_fp:
-        config_content = config_fp.read()
-        config_newlines = config_fp.newlines
-
-    logger.info(config_content)
     config.read_string(config_content)
-    log_config = io.StringIO()
-    config.write(log_config)
+    warnings: List[str] = []
 
     if config.has_option("bumpsemver", "files"):
-        logger.warning("'files =' configuration will be deprecated, please use [bumpsemver:file:...]")
-
-    defaults.update(dict(config.items("bumpsemver")))
+        _warn(warnings, "'files =' configuration will be deprecated, please use [bumpsemver:file:...]")
 
+    options = dict(config.items("bumpsemver"))
+    booleans = {}
     for bool_value_name in ("commit", "tag", "dry_run"):
         try:
-            defaults[bool_value_name] = config.getboolean("bumpsemver", bool_value_name)
+            booleans[bool_value_name] = config.getboolean("bumpsemver", bool_value_name)
         except NoOptionError:
             pass  # no default value then
 
-    files, ignored_for_discovery = _parse_sections(config, defaults, config.sections())
+    file_sections, discovery = _compile_sections(config, {**options, **booleans}, config.sections(), warnings)
+    return {
+        "options": options,
+        "booleans": booleans,
+        "warnings": warnings,
+        "sections": file_sections,
+        "discovery": discovery,
+    }
 
-    return config, True, config_newlines, files, ignored_for_discovery
 
+class ConfigCache:
+    """
+    Compiled config files, keyed by the path and the hash of the content of each, for one version of bumpsemver.
 
-def _update_config_file(config, config_file, config_newlines, new_version, dry_run):
-    config.set("bumpsemver", "current_version", new_version)
-    config.remove_option("bumpsemver", "new_version")
-    new_config = io.StringIO()
-    try:
-        logger.info(f"{'Would write' if dry_run else 'Writing'} to config file {config_file}:")
+    The cache lives in the git directory next to the discovery cache. It is only worth its lookup for large config
+    files, the small ones are parsed faster than the git directory is found.
+    """
+
+    def __init__(self, path: Path, entries: Dict[str, Dict]):
+        self.path = path
+        self._entries = entries
 
-        config.write(new_config)
-        logger.info(new_config.getvalue())
+    @classmethod
+    def load(cls, git_dir: Path) -> "ConfigCache":
+        path = git_dir / "bumpsemver" / "config-cache.json"
+        entries = {}
+        try:
+            with open(path, "rt", encoding="utf-8") as cache_fp:
+                content = json.load(cache_fp)
+            if content.get("version") == CONFIG_CACHE_VERSION and content.get("bumpsemver") == __version__:
+                entries = content["configs"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            logger.debug("Config cache %s is not available", path)
+        return cls(path, entries)
+
+    def get(self, config_file: str, digest: str) -> Optional[Dict]:
+        entry = self._entries.get(os.path.abspath(config_file))
+        if entry is None or entry.get("sha256") != digest:
+            return None
+        return entry["compiled"]
+
+    def put(self, config_file: str, digest: str, compiled: Dict) -> None:
+        self._entries[os.path.abspath(config_file)] = {"sha256": digest, "compiled": compiled}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with NamedTemporaryFile("wt", encoding="utf-8", dir=self.path.parent, delete=False) as cache_fp:
+                json.dump(
+                    {"version": CONFIG_CACHE_VERSION, "bumpsemver": __version__, "configs": self._entries}, cache_fp
+                )
+            os.replace(cache_fp.name, self.path)
+        except OSError as exc:
+            logger.debug("Failed to write config cache %s: %s", self.path, exc)
+
+
+def _load_compiled_configuration(config_file: str, config_content: str) -> Dict:
+    git_dir = Git.git_dir() if len(config_content) >= CONFIG_CACHE_MIN_SIZE else None
+    if git_dir is None:
+        return _compile_configuration(config_content)
+    digest = hashlib.sha256(config_content.encode("utf-8")).hexdigest()
+    cache = ConfigCache.load(git_dir)
+    compiled = cache.get(config_file, digest)
+    if compiled is not None:
+        logger.debug("Loaded the compiled config file %s from the cache", config_file)
+        for message in compiled["warnings"]:
+            logger.warning("%s", message)
+        return compiled
+    compiled = _compile_configuration(config_content)
+    cache.put(config_file, digest, compiled)
+    return compiled
+
+
+def _load_configuration(
+    config_file,
+    explicit_config,
+    defaults,
+    base_dir: str = "",
+    tracked_files: Optional[List[Tuple[str, Optional[str]]]] = None,
+):
+    """
+    Read the config file, and create the handlers of its managed files.
+
+    The paths of the managed and the ignored files are relative to `base_dir`, the working directory by default. The
+    `tracked_files` already listed with `Git.list_tracked_files()` are matched against the glob sections.
+    """
+    if not _config_file_exists(config_file, explicit_config):
+        return False, [], DiscoveryConfig()
 
-        if not dry_run:
-            with open(config_file, "wt", encoding="utf-8", newline=config_newlines) as config_fp:
-                config_fp.write(new_config.getvalue().strip() + "\n")
+    logger.info("Reading config file %s:", config_file)
 
-    except UnicodeEncodeError:
-        logger.warning(
-            "Unable to write UTF-8 to config file, because of an old configparser version. "
-            "Update with `pip install --upgrade configparser`."
-        )
+    with open(config_file, "rt", encoding="utf-8") as config_fp:
+        config_content = config_fp.read()
+
+    logger.info(config_content)
+    compiled = _load_compiled_configuration(config_file, config_content)
+
+    defaults.update(compiled["options"])
+    defaults.update(compiled["booleans"])
+
+    sections = compiled["sections"]
+    discovery_config = DiscoveryConfig(**compiled["discovery"])
+    if base_dir:
+        sections = [{**section, "filename": posixpath.join(base_dir, section["filename"])} for section in sections]
+        # a pattern anchored with "/" is anchored at the project directory, not at the root of the workspace
+        discovery_config.ignore = [posixpath.join(base_dir, pattern.lstrip("/")) for pattern in discovery_config.ignore]
+    discovery_config.tracked_files = tracked_files
+    files = _create_files(sections, discovery_config)
+
+    return True, files, discovery_config
+
+
+def _splice_current_version(content: str, new_version: str) -> str:
+    """
+    Set the current_version in the [bumpsemver] section of the config file content, and drop its new_version.
+
+    Only the lines of these options change, so the comments, the layout and the other sections are kept as they are.
+    """
+    lines = content.splitlines(keepends=True)
+    newline = next((line[len(line.rstrip("\r\n")) :] for line in lines if line.endswith("\n")), "\n")
+    header_index = None
+    for index, line in enumerate(lines):
+        match = RE_INI_SECTION.match(line)
+        if match and header_index is not None:
+            break
+        if match and match.group("header") == "bumpsemver":
+            header_index = index
+    if header_index is None:
+        return f"[bumpsemver]{newline}current_version = {new_version}{newline}{newline}{content}"
+
+    spliced = lines[: header_index + 1]
+    found = False
+    dropping = False
+    for index in range(header_index + 1, len(lines)):
+        line = lines[index]
+        if RE_INI_SECTION.match(line):
+            spliced.extend(lines[index:])
+            break
+        if dropping and line[:1] in (" ", "\t") and line.strip():
+            # a continuation line of the dropped option
+            continue
+        dropping = False
+        match = RE_INI_OPTION.match(line)
+        if match and match.group("option") == "current_version":
+            ending = line[len(line.rstrip("\r\n")) :]
+            spliced.append(f"{line[: match.start('value')]}{new_version}{ending}")
+            found = True
+        elif match and match.group("option") == "new_version":
+            dropping = True
+        else:
+            spliced.append(line)
+    if not found:
+        if not spliced[header_index].endswith("\n"):
+            spliced[header_index] += newline
+        spliced.insert(header_index + 1, f"current_version = {new_version}{newline}")
+    return "".join(spliced)
+
+
+def _update_config_file(config_file: str, new_version: str, dry_run: bool) -> None:
+    with open(config_file, "rt", encoding="utf-8", newline="") as config_fp:
+        content = config_fp.read()
+    new_content = _splice_current_version(content, new_version)
+
+    logger.info("%s to config file %s:", "Would write" if dry_run else "Writing", config_file)
+    logger.info(new_content)
+
+    if dry_run or new_content == content:
+        return
+    # write to a temporary file next to the config file and rename it, so the config file is never left half-written
+    directory = os.path.dirname(os.path.abspath(config_file))
+    with NamedTemporaryFile("wt", encoding="utf-8", newline="", dir=directory, delete=False) as temp_fp:
+        temp_fp.write(new_content)
+    try:
+        shutil.copymode(config_file, temp_fp.name)
+        os.replace(temp_fp.name, config_file)
+    except OSError:
+        os.unlink(temp_fp.name)
+        raise
@@ -1,15 +1,89 @@
+import json
+import logging
+import mmap
+import os
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List
-
-from ruamel.yaml import YAML
-from ruamel.yaml.error import YAMLError
+from tempfile import NamedTemporaryFile
+from typing import Dict, Iterator, List, Optional, Tuple
 
+from bumpsemver.discovery_rules import DiscoveryRule, get_rule_matcher
 from bumpsemver.exceptions import DiscoveryError
-from bumpsemver.git import Git
+from bumpsemver.git import Git, _GitListingUnavailableError
+from bumpsemver.utils import PathMatcher
+
+logger = logging.getLogger(__name__)
+
+# below this number of YAML files to parse, starting the worker processes costs more than it saves
+PARALLEL_THRESHOLD = 32
+
+# bump it whenever the format of the cached verdicts changes
+DISCOVERY_CACHE_VERSION = 2
+
 
-TO_BE_MANAGED = ["package.json", "package-lock.json", "pyproject.toml", "dbt_project.yml"]
+@lru_cache(maxsize=None)
+def _yaml_loader():
+    # ruamel.yaml takes long to import, and most runs never parse a YAML file for discovery
+    from ruamel.yaml import YAML
 
-yaml = YAML(typ="safe")
+    return YAML(typ="safe")
+
+
+class DiscoveryCache:
+    """
+    Verdicts of the content checks of the discovery rules, keyed by the git blob id of the file content.
+
+    The cache lives in the git directory, so unchanged files are never parsed twice, no matter how often the tool runs.
+    """
+
+    def __init__(self, path: Path, fingerprint: str, verdicts: Dict[str, Dict[str, bool]]):
+        self.path = path
+        self.fingerprint = fingerprint
+        self._cached = verdicts
+        self._verdicts: Dict[str, Dict[str, bool]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, git_dir: Path, fingerprint: str) -> "DiscoveryCache":
+        path = git_dir / "bumpsemver" / "discovery-cache.json"
+        verdicts = {}
+        try:
+            with open(path, "rt", encoding="utf-8") as cache_fp:
+                content = json.load(cache_fp)
+            if content.get("version") == DISCOVERY_CACHE_VERSION and content.get("rules") == fingerprint:
+                verdicts = content["verdicts"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            logger.debug("Discovery cache %s is not available", path)
+        return cls(path, fingerprint, verdicts)
+
+    def get(self, blob_id: str, rule_names: List[str]) -> Optional[Dict[str, bool]]:
+        verdict = self._cached.get(blob_id)
+        if verdict is None or any(name not in verdict for name in rule_names):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._verdicts.setdefault(blob_id, {}).update(verdict)
+        return {name: verdict[name] for name in rule_names}
+
+    def put(self, blob_id: str, verdict: Dict[str, bool]) -> None:
+        self._verdicts.setdefault(blob_id, {}).update(verdict)
+
+    def save(self) -> None:
+        # only the verdicts of the files seen in this run are kept, so the cache does not grow with the history
+        if self._verdicts == self._cached:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with NamedTemporaryFile("wt", encoding="utf-8", dir=self.path.parent, delete=False) as cache_fp:
+                json.dump(
+                    {"version": DISCOVERY_CACHE_VERSION, "rules": self.fingerprint, "verdicts": self._verdicts},
+                    cache_fp,
+                )
+            os.replace(cache_fp.name, self.path)
+        except OSError as exc:
+            logger.debug("Failed to write discovery cache %s: %s", self.path, exc)
 
 
 def check_package_lock_json(issues: List[str], managed_file: List[str]):
@@ -35,69 +109,244 @@ def mark_an_issue(issues: List[str], file: str):
     issues.append(f"File {file} is not managed. Please add it to the config file")
 
 
-def discover_unmanaged_files(managed_files: List[str], ignore_files: List[str]):
-    issues: List[str] = []
+def _contains_all(content, tokens) -> bool:
+    return all(content.find(token) >= 0 for token in tokens)
+
+
+def prefilter_yaml(file: str, rules: List[DiscoveryRule]) -> List[DiscoveryRule]:
+    """
+    Tell cheaply which of the rules with content checks might match a YAML file.
+
+    The file is memory-mapped and searched for the tokens of each rule, so most YAML files are rejected without being
+    parsed. A rule left out definitely does not match, a rule returned still needs its content check.
+    """
+    try:
+        with open(file, "rb") as yaml_fp, mmap.mmap(yaml_fp.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            # UTF-16 and UTF-32 encoded files cannot be searched for ASCII tokens
+            if b"\x00" in content[:4] or content[:2] in (b"\xff\xfe", b"\xfe\xff"):
+                return rules
+            return [rule for rule in rules if _contains_all(content, rule.tokens)]
+    except ValueError:
+        # an empty file cannot be memory-mapped, and it matches no content check anyway
+        return []
+
+
+def classify_yaml(file: str, rule_names: List[str]) -> Tuple[Dict[str, bool], float]:
+    """
+    Parse a YAML file at most once and evaluate the content checks of the named rules on it.
+
+    Return the verdict of each rule and the seconds it took.
+    """
+    started = time.perf_counter()
+    rules = [get_rule_matcher().rules[name] for name in rule_names]
+    verdict = {name: False for name in rule_names}
+    rules = prefilter_yaml(file, rules)
+    if rules:
+        from ruamel.yaml.error import YAMLError
+
+        try:
+            data = _yaml_loader().load(Path(file))
+        except YAMLError:
+            rules = []
+        for rule in rules:
+            verdict[rule.name] = bool(rule.content_check(data))
+    return verdict, time.perf_counter() - started
+
+
+def classify_yaml_files(files: List[str], rule_names: List[List[str]]) -> List[Tuple[Dict[str, bool], float]]:
+    """
+    Classify YAML files with a pool of worker processes, one result per file in the order of `files`.
+
+    Parsing YAML is CPU-bound and holds the GIL, so only processes let it scale with the available cores.
+    """
+    workers = min(os.cpu_count() or 1, len(files))
+    if len(files) >= PARALLEL_THRESHOLD and workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                chunksize = max(1, len(files) // (workers * 4))
+                return list(executor.map(classify_yaml, files, rule_names, chunksize=chunksize))
+        except (OSError, BrokenProcessPool) as exc:
+            logger.debug("Failed to classify YAML files in parallel, falling back to sequential: %s", exc)
+    return [classify_yaml(file, names) for file, names in zip(files, rule_names)]
+
 
-    check_package_lock_json(issues, managed_files)
+class FileVerdict:
+    def __init__(self, path: str, verdict: str, rules: List[str], reason: str):
+        self.path = path
+        self.verdict = verdict
+        self.rules = rules
+        self.reason = reason
 
-    all_files = set(Git.list_files())
+    def as_dict(self) -> dict:
+        return {"path": self.path, "verdict": self.verdict, "rules": self.rules, "reason": self.reason}
 
-    # remove ignored_files and managed_files from all_files
-    for file in ignore_files + managed_files:
-        if file in all_files:
-            all_files.remove(file)
 
-    for file in all_files:
-        if file == "README.md":
-            # only README.md at the root is mandatory to be managed
-            mark_an_issue(issues, file)
+class RuleStats:
+    def __init__(self):
+        self.files = 0
+        self.unmanaged = 0
+        self.seconds = 0.0
+
+
+class DiscoveryReport:
+    """
+    Outcome of a discovery run: a verdict for every file matched by a rule, and how much each rule cost.
+    """
+
+    def __init__(self):
+        self.issues: List[str] = []
+        self.verdicts: List[FileVerdict] = []
+        self.rules: Dict[str, RuleStats] = {}
+        self.files_scanned = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.seconds = 0.0
+
+    def add(self, path: str, verdict: str, rules: List[str], reason: str, seconds: float = 0.0) -> None:
+        self.verdicts.append(FileVerdict(path, verdict, rules, reason))
+        for rule in rules:
+            stats = self.rules.setdefault(rule, RuleStats())
+            stats.files += 1
+            # the time spent on the file is shared by all the rules it was checked for
+            stats.seconds += seconds / len(rules)
+            if verdict == "unmanaged":
+                stats.unmanaged += 1
+        if verdict == "unmanaged":
+            mark_an_issue(self.issues, path)
+
+    def as_dict(self) -> dict:
+        return {
+            "issues": sorted(self.issues),
+            "files": [verdict.as_dict() for verdict in sorted(self.verdicts, key=lambda verdict: verdict.path)],
+            "rules": [
+                {"rule": name, "files": stats.files, "unmanaged": stats.unmanaged, "seconds": round(stats.seconds, 6)}
+                for name, stats in sorted(self.rules.items())
+            ],
+            "files_scanned": self.files_scanned,
+            "cache": {"hits": self.cache_hits, "misses": self.cache_misses},
+            "seconds": round(self.seconds, 6),
+        }
+
+
+def _iter_tracked_files(git_dir: Optional[Path], pathspec: List[str]) -> Iterator[Tuple[str, Optional[str]]]:
+    if git_dir is None:
+        for file in Git.iter_files(pathspec):
+            yield file, None
+    else:
+        yield from Git.iter_blobs(pathspec)
+
+
+def _iter_added_files(since: str, pathspec: List[str]) -> Iterator[Tuple[str, Optional[str]]]:
+    try:
+        for file in Git.iter_added_files(since, pathspec):
+            yield file, None
+    except _GitListingUnavailableError:
+        # nothing has been yielded yet, the whole tree can still be evaluated instead
+        logger.warning("Cannot list the files added since '%s', discovering unmanaged files in the whole tree", since)
+        for file in Git.iter_files(pathspec):
+            yield file, None
+
+
+def _add_content_verdict(report: DiscoveryReport, file: str, verdict: Dict[str, bool], seconds: float) -> None:
+    matched = [name for name, matches in verdict.items() if matches]
+    if matched:
+        report.add(file, "unmanaged", matched, f"content matches rule '{matched[0]}'", seconds)
+    else:
+        rules = list(verdict)
+        report.add(file, "clean", rules, f"content matches none of the rules {', '.join(rules)}", seconds)
+
+
+def run_discovery(
+    managed_files: List[str],
+    ignore_files: List[str],
+    since: Optional[str] = None,
+    tracked_files: Optional[List[Tuple[str, Optional[str]]]] = None,
+) -> DiscoveryReport:
+    """
+    Find the files that should be managed but are neither managed nor ignored.
+
+    If `since` is given, only the files added or renamed since that commit are evaluated, because all the other files
+    have already been evaluated when that commit was released. Otherwise, the `tracked_files` already listed with
+    `Git.list_tracked_files()` are evaluated, or the files tracked by git are listed anew.
+    """
+    started = time.perf_counter()
+    report = DiscoveryReport()
+
+    check_package_lock_json(report.issues, managed_files)
+
+    managed = set(managed_files)
+    ignored = PathMatcher(ignore_files)
+    # git skips the ignored directories as a whole, so their files are not even listed
+    pathspec = [f":(exclude,literal){directory}/" for directory in ignored.directories]
+    matcher = get_rule_matcher()
+
+    # the few files added since the latest release are not worth a cache
+    git_dir = Git.git_dir() if since is None else None
+    cache = DiscoveryCache.load(git_dir, matcher.fingerprint) if git_dir is not None else None
+    # the blob id in the index does not describe the content of a file modified in the working tree
+    modified_files = set(Git.iter_modified_files()) if cache is not None else set()
+    if since is not None:
+        files = _iter_added_files(since, pathspec)
+    elif tracked_files is not None:
+        files = iter(tracked_files)
+    else:
+        files = _iter_tracked_files(git_dir, pathspec)
+
+    # files whose verdict is not cached are collected and checked on their content in one go afterwards
+    pending: List[Tuple[str, Optional[str], List[str]]] = []
+
+    # the file list is streamed from git, so the filtering starts while git is still listing
+    for file, blob_id in files:
+        report.files_scanned += 1
+        rule, candidates = matcher.match(file)
+        if rule is None and not candidates:
+            continue
+        rule_names = [rule.name] if rule is not None else [candidate.name for candidate in candidates]
+        if file in managed:
+            report.add(file, "managed", rule_names, "managed by the config file")
             continue
-        detected = False
-        for to_be_managed in TO_BE_MANAGED:
-            # files in TO_BE_MANAGED should be managed no matter where they are
-            if file == to_be_managed or file.endswith(f"/{to_be_managed}"):
-                mark_an_issue(issues, file)
-                detected = True
-                break
-        if detected:
+        if ignored.match(file):
+            report.add(file, "ignored", rule_names, "ignored by the config file")
             continue
-        path = Path(file)
-        if path.suffix == ".yml" or path.suffix == ".yaml":
-            if "play" in path.name.lower():
-                # might be an Ansible playbook. dig deeper to find out
-                try:
-                    data = yaml.load(path)
-                except YAMLError:
-                    continue
-                if (
-                    isinstance(data, list)
-                    and len(data) > 0
-                    and "roles" in data[0]
-                    and "vars" in data[0]
-                    and [prop for prop in data[0]["vars"] if "version" in prop]
-                ):
-                    # bingo!
-                    mark_an_issue(issues, file)
-                    continue
-            # try to find out if it is a dbt source file
-            try:
-                data = yaml.load(path)
-            except YAMLError:
-                continue
-            if (
-                isinstance(data, dict)
-                and "sources" in data
-                and isinstance(data["sources"], list)
-                and len(data["sources"]) > 0
-                and "schema" in data["sources"][0]
-                and "tables" in data["sources"][0]
-                and isinstance(data["sources"][0]["tables"], list)
-                and len(data["sources"][0]["tables"]) > 0
-            ):
-                # bingo!
-                mark_an_issue(issues, file)
-                continue
-
-    if issues:
-        issues.sort()
-        raise DiscoveryError(issues)
+        if rule is not None:
+            report.add(file, "unmanaged", rule_names, f"matches rule '{rule.name}'")
+            continue
+        cacheable = cache is not None and blob_id is not None and file not in modified_files
+        verdict = cache.get(blob_id, rule_names) if cacheable else None
+        if verdict is None:
+            pending.append((file, blob_id if cacheable else None, rule_names))
+        else:
+            _add_content_verdict(report, file, verdict, 0.0)
+
+    results = classify_yaml_files([file for file, _, _ in pending], [names for _, _, names in pending])
+    for (file, blob_id, _), (verdict, seconds) in zip(pending, results):
+        if blob_id is not None:
+            cache.put(blob_id, verdict)
+        _add_content_verdict(report, file, verdict, seconds)
+
+    if cache is not None:
+        report.cache_hits, report.cache_misses = cache.hits, cache.misses
+        if cache.hits or cache.misses:
+            logger.info("Discovery cache: %d hits, %d misses", cache.hits, cache.misses)
+        cache.save()
+
+    report.issues.sort()
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def discover_unmanaged_files(
+    managed_files: List[str],
+    ignore_files: List[str],
+    since: Optional[str] = None,
+    tracked_files: Optional[List[Tuple[str, Optional[str]]]] = None,
+):
+    """
+    Raise DiscoveryError if files that should be managed are neither managed nor ignored.
+    """
+    report = run_discovery(managed_files, ignore_files, since, tracked_files)
+    if report.issues:
+        raise DiscoveryError(report.issues)
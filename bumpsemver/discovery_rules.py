@@ -0,0 +1,169 @@
+"""
+Declarative rules telling which files discovery expects to be managed by the config file.
+"""
+
+import logging
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from bumpsemver.utils import GlobSet
+
+logger = logging.getLogger(__name__)
+
+# entry point group for the packages contributing shop-specific rules
+ENTRY_POINT_GROUP = "bumpsemver.discovery_rules"
+
+
+class DiscoveryRule:
+    """
+    A rule matches a file by its exact path, its basename, or a glob pattern on its path.
+
+    A rule with a content check only matches if the check returns True on the parsed YAML document of the file.
+    All the `tokens` must be present in the raw content of such a file, so files without them are rejected unparsed.
+    Bump `version` whenever the content check changes, so that the verdicts cached for the former check are dropped.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        paths: Iterable[str] = (),
+        basenames: Iterable[str] = (),
+        globs: Iterable[str] = (),
+        content_check: Optional[Callable[[Any], bool]] = None,
+        tokens: Iterable[bytes] = (),
+        version: int = 1,
+    ):
+        self.name = name
+        self.paths = list(paths)
+        self.basenames = list(basenames)
+        self.globs = list(globs)
+        self.content_check = content_check
+        self.tokens = tuple(tokens)
+        self.version = version
+
+    def __repr__(self):
+        return f"<bumpsemver.DiscoveryRule:{self.name}>"
+
+
+def is_ansible_playbook(data) -> bool:
+    return (
+        isinstance(data, list)
+        and len(data) > 0
+        and isinstance(data[0], dict)
+        and "roles" in data[0]
+        and "vars" in data[0]
+        and bool([prop for prop in data[0]["vars"] if "version" in prop])
+    )
+
+
+def is_dbt_sources(data) -> bool:
+    return (
+        isinstance(data, dict)
+        and "sources" in data
+        and isinstance(data["sources"], list)
+        and len(data["sources"]) > 0
+        and "schema" in data["sources"][0]
+        and "tables" in data["sources"][0]
+        and isinstance(data["sources"][0]["tables"], list)
+        and len(data["sources"][0]["tables"]) > 0
+    )
+
+
+BUILTIN_RULES = [
+    # only README.md at the root is mandatory to be managed
+    DiscoveryRule("root-readme", paths=["README.md"]),
+    # the manifests should be managed no matter where they are
+    DiscoveryRule("node-package", basenames=["package.json", "package-lock.json"]),
+    DiscoveryRule("python-project", basenames=["pyproject.toml"]),
+    DiscoveryRule("dbt-project", basenames=["dbt_project.yml"]),
+    DiscoveryRule(
+        "ansible-playbook",
+        globs=["**/*[Pp][Ll][Aa][Yy]*.yml", "**/*[Pp][Ll][Aa][Yy]*.yaml"],
+        content_check=is_ansible_playbook,
+        tokens=[b"roles", b"vars", b"version"],
+    ),
+    DiscoveryRule(
+        "dbt-sources",
+        globs=["**/*.yml", "**/*.yaml"],
+        content_check=is_dbt_sources,
+        tokens=[b"sources", b"schema", b"tables"],
+    ),
+]
+
+
+class RuleMatcher:
+    """
+    The rules compiled into a hash lookup for paths and basenames and a single regular expression for the globs.
+
+    A file matched by a rule without content check needs no further work. Otherwise, the rules with content checks
+    matching the file are candidates to be checked on its content.
+    """
+
+    def __init__(self, rules: Iterable[DiscoveryRule]):
+        self.rules: Dict[str, DiscoveryRule] = {}
+        self._paths: Dict[str, DiscoveryRule] = {}
+        self._basenames: Dict[str, DiscoveryRule] = {}
+        globs: List[str] = []
+        self._glob_rules: List[DiscoveryRule] = []
+        for rule in rules:
+            self.rules[rule.name] = rule
+            for path in rule.paths:
+                self._paths.setdefault(path, rule)
+            for basename in rule.basenames:
+                self._basenames.setdefault(basename, rule)
+            for glob in rule.globs:
+                globs.append(glob)
+                self._glob_rules.append(rule)
+        self._globs = GlobSet(globs)
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Identify the content checks, so that cached verdicts are only reused for the same checks.
+        """
+        return ",".join(
+            sorted(f"{rule.name}@{rule.version}" for rule in self.rules.values() if rule.content_check is not None)
+        )
+
+    def match(self, path: str) -> Tuple[Optional[DiscoveryRule], List[DiscoveryRule]]:
+        """
+        Return the rule without content check matching the path, or the candidate rules with content checks.
+        """
+        rule = self._paths.get(path) or self._basenames.get(path.rpartition("/")[2])
+        if rule is not None and rule.content_check is None:
+            return rule, []
+        candidates = [rule] if rule is not None else []
+        for index in self._globs.match(path):
+            rule = self._glob_rules[index]
+            if rule.content_check is None:
+                return rule, []
+            if rule not in candidates:
+                candidates.append(rule)
+        return None, candidates
+
+
+def load_plugin_rules() -> List[DiscoveryRule]:
+    """
+    Load the rules contributed by other packages as entry points, each of them a DiscoveryRule or a list of them.
+    """
+    # importing the package metadata machinery is costly, so it is only done when discovery actually runs
+    from importlib.metadata import entry_points
+
+    rules: List[DiscoveryRule] = []
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            loaded = entry_point.load()
+            loaded_rules = [loaded] if isinstance(loaded, DiscoveryRule) else list(loaded)
+            invalid = [rule for rule in loaded_rules if not isinstance(rule, DiscoveryRule)]
+            if invalid:
+                raise TypeError(f"{invalid[0]!r} is not a DiscoveryRule")
+        except Exception as exc:
+            logger.warning("Failed to load discovery rules from entry point '%s': %s", entry_point.name, exc)
+            continue
+        rules.extend(loaded_rules)
+    return rules
+
+
+@lru_cache(maxsize=None)
+def get_rule_matcher() -> RuleMatcher:
+    return RuleMatcher([*BUILTIN_RULES, *load_plugin_rules()])
@@ -0,0 +1,88 @@
+"""
+Typed events of a run, written as JSON lines to stdout with --output json-lines.
+"""
+
+import json
+import logging
+import sys
+import time
+from contextvars import ContextVar
+from typing import Optional, TextIO
+
+from bumpsemver.profiling import Profiler
+
+# the emitter of the current run, if --output json-lines is given, held per execution context so that the runs of a
+# long-lived process do not share it
+_active: ContextVar[Optional["EventEmitter"]] = ContextVar("bumpsemver_events", default=None)
+
+
+class _ErrorEventHandler(logging.Handler):
+    """
+    Turn the errors logged for humans into events, so that the reason of a non-zero exit code is part of the stream.
+    """
+
+    def __init__(self, emitter: "EventEmitter"):
+        super().__init__(logging.WARNING)
+        self.emitter = emitter
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # the handler is installed on the root logger, only the records of the run of its emitter are its own
+        if _active.get() is self.emitter:
+            self.emitter.emit("error", level=record.levelname.lower(), message=record.getMessage())
+
+
+class EventEmitter:
+    """
+    The event stream of a run, owned by the run which starts and closes it.
+    """
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.started = time.perf_counter()
+        self._handler = _ErrorEventHandler(self)
+
+    def emit(self, event: str, **fields) -> None:
+        """
+        Write an event as a single line of JSON.
+        """
+        self.stream.write(json.dumps({"event": event, **fields}, default=str) + "\n")
+        self.stream.flush()
+
+    def close(self, exit_code: Optional[int], profiler: Optional[Profiler] = None) -> None:
+        """
+        Emit the final event with the exit code, the time of the run and the time of its phases if it was profiled.
+        """
+        logging.getLogger().removeHandler(self._handler)
+        if _active.get() is self:
+            _active.set(None)
+        timings = {"seconds": round(time.perf_counter() - self.started, 6)}
+        if profiler is not None:
+            phases = [stats for stats in profiler.stats.values() if stats.kind == "phase"]
+            timings["phases"] = {stats.name: round(stats.wall, 6) for stats in phases}
+        self.emit("finished", exit_code=exit_code or 0, **timings)
+
+    def __repr__(self):
+        return f"<bumpsemver.EventEmitter:{getattr(self.stream, 'name', type(self.stream).__name__)}>"
+
+
+def enabled() -> bool:
+    return _active.get() is not None
+
+
+def start(stream: Optional[TextIO] = None) -> EventEmitter:
+    """
+    Start the event stream of the run in the current context, and return its emitter.
+    """
+    emitter = EventEmitter(stream or sys.stdout)
+    logging.getLogger().addHandler(emitter._handler)
+    _active.set(emitter)
+    return emitter
+
+
+def emit(event: str, **fields) -> None:
+    """
+    Write an event as a single line of JSON, if the event stream of the run is started.
+    """
+    emitter = _active.get()
+    if emitter is not None:
+        emitter.emit(event, **fields)
@@ -1,4 +1,4 @@
-from typing import List, Tuple, Union
+from typing import List, Optional, Tuple, Union
 
 
 class BumpVersionError(Exception):
@@ -19,8 +19,11 @@ class WorkingDirectoryIsDirtyError(BumpVersionError):
 
 
 class CannotParseVersionError(BumpVersionError):
-    def __init__(self):
-        message = "The specific version could not be parsed with semver scheme. Please double check the config file"
+    def __init__(self, version: Optional[str] = None):
+        if version is None:
+            message = "The specific version could not be parsed with semver scheme. Please double check the config file"
+        else:
+            message = f"The version '{version}' could not be parsed with semver scheme"
         super().__init__(message)
         self.message = message
 
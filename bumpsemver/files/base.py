@@ -1,10 +1,11 @@
 import io
+import logging
 from abc import ABCMeta, abstractmethod
 from datetime import datetime
 from difflib import unified_diff
-from logging import Logger
-from typing import Dict, Optional, Union
+from typing import Dict, Optional, Tuple, Union
 
+from bumpsemver import events
 from bumpsemver.exceptions import MixedNewLineError
 from bumpsemver.version_part import Version, VersionConfig
 
@@ -18,7 +19,7 @@ class FileTypeBase:
         version_config: VersionConfig,
         file_type: Optional[str] = None,
         xpath: Optional[str] = None,
-        logger: Optional[Logger] = None,
+        logger: Optional[logging.Logger] = None,
     ):
         self.filename = filename
         self._version_config = version_config
@@ -48,53 +49,94 @@ class FileTypeBase:
         """
 
     @abstractmethod
+    def render(
+        self,
+        current_version: Version,
+        new_version: Version,
+        context: Dict[str, Union[str, datetime]],
+        content: Optional[str] = None,
+    ) -> Tuple[str, str]:
+        """
+        Return the content of the file before and after updating the version, without changing the file.
+
+        The content before is read from the file, unless it is given, as the pending edits of a file make it.
+        """
+
     def replace(
         self, current_version: Version, new_version: Version, context: Dict[str, Union[str, datetime]], dry_run: bool
     ) -> None:
         """
         Update the version if it is not a dry run.
         """
+        file_content_before, file_content_after = self.render(current_version, new_version, context)
+        self.update_file(file_content_before, file_content_after, dry_run)
 
     def update_file(self, file_content_before: str, file_content_after: str, dry_run: bool) -> None:
         """
         Write changes to the file if it is not a dry run.
         """
-        with open(self.filename, "rt", encoding="utf-8") as orig_fp:
-            _dummy = orig_fp.read()
-            file_new_lines = orig_fp.newlines
+        write_file(self.filename, self.file_type, file_content_before, file_content_after, dry_run, self.logger)
+
+    def __str__(self):
+        return self.filename
+
+
+def write_file(
+    filename: str,
+    file_type: Optional[str],
+    file_content_before: str,
+    file_content_after: str,
+    dry_run: bool,
+    logger: logging.Logger,
+) -> None:
+    """
+    Write the content after to the file if it differs from the content before and it is not a dry run.
+
+    The original newline separator of the file is kept, and MixedNewLineError is raised if the file mixes several.
+    """
+    with open(filename, "rt", encoding="utf-8") as orig_fp:
+        _dummy = orig_fp.read()
+        file_new_lines = orig_fp.newlines
 
-        need_update = True
+    need_update = True
 
-        if file_content_before != file_content_after:
-            # reassemble the file to retain the original os-specific newline separator
-            self.logger.info(f"{'Would change' if dry_run else 'Changing'} {self.file_type} file {self.filename}:")
-            self.logger.info(
+    if file_content_before != file_content_after:
+        # reassemble the file to retain the original os-specific newline separator
+        logger.info("%s %s file %s:", "Would change" if dry_run else "Changing", file_type, filename)
+        # the diff is costly on large files, so it is only computed if it is logged
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
                 "\n".join(
                     list(
                         unified_diff(
                             file_content_before.splitlines(),
                             file_content_after.splitlines(),
                             lineterm="",
-                            fromfile=f"a/{self.filename}",
-                            tofile=f"b/{self.filename}",
+                            fromfile=f"a/{filename}",
+                            tofile=f"b/{filename}",
                         )
                     )
                 )
             )
-        else:
-            self.logger.info(
-                f"{'Would not change' if dry_run else 'Not changing'} {self.file_type} file {self.filename}"
-            )
-            need_update = False
+    else:
+        logger.info("%s %s file %s", "Would not change" if dry_run else "Not changing", file_type, filename)
+        need_update = False
 
-        new_line = file_new_lines if isinstance(file_new_lines, str) else ""
+    new_line = file_new_lines if isinstance(file_new_lines, str) else ""
 
-        if need_update and not dry_run:
-            with io.open(self.filename, "wt", encoding="utf-8", newline=new_line) as orig_fp:
-                orig_fp.write(file_content_after)
+    if events.enabled():
+        events.emit(
+            "file_changed" if need_update else "file_unchanged",
+            file=filename,
+            file_type=file_type,
+            bytes_before=len(file_content_before.encode("utf-8")),
+            bytes_after=len(file_content_after.encode("utf-8")),
+            dry_run=dry_run,
+        )
 
-        if type(file_new_lines) is tuple:
-            raise MixedNewLineError(self.filename, file_new_lines)
+    if need_update and not dry_run:
+        with io.open(filename, "wt", encoding="utf-8", newline=new_line) as orig_fp:
+            orig_fp.write(file_content_after)
 
-    def __str__(self):
-        return self.filename
+    if type(file_new_lines) is tuple:
+        raise MixedNewLineError(filename, file_new_lines)
@@ -2,7 +2,7 @@ import io
 import json
 import logging
 from datetime import datetime
-from typing import Dict, Union
+from typing import Dict, Optional, Tuple, Union
 
 from jsonpath_ng import parse
 from jsonpath_ng.lexer import JsonPathLexerError
@@ -57,15 +57,21 @@ class ConfiguredJSONFile(FileTypeBase):
         except json.JSONDecodeError as exc:
             raise InvalidFileError(self.filename, "json") from exc
 
-    def replace(
-        self, current_version: Version, new_version: Version, context: Dict[str, Union[str, datetime]], dry_run: bool
-    ) -> None:
-        with io.open(self.filename, "rt", encoding="utf-8") as orig_fp:
-            file_content_before = orig_fp.read()
-            # the object_pairs_hook allows us to load the json in a way that key order
-            # is preserved and will keep the file diff to a minimum
-            #
-            data = json.loads(file_content_before)
+    def render(
+        self,
+        current_version: Version,
+        new_version: Version,
+        context: Dict[str, Union[str, datetime]],
+        content: Optional[str] = None,
+    ) -> Tuple[str, str]:
+        if content is None:
+            with io.open(self.filename, "rt", encoding="utf-8") as orig_fp:
+                content = orig_fp.read()
+        file_content_before = content
+        # the object_pairs_hook allows us to load the json in a way that key order
+        # is preserved and will keep the file diff to a minimum
+        #
+        data = json.loads(file_content_before)
 
         current_version_str = self._version_config.serialize(current_version)
         context["current_version"] = current_version_str
@@ -82,7 +88,7 @@ class ConfiguredJSONFile(FileTypeBase):
             json.dumps(data, ensure_ascii=False, allow_nan=False, indent=2, separators=(",", ": ")) + "\n"
         )
 
-        self.update_file(file_content_before, file_content_after, dry_run)
+        return file_content_before, file_content_after
 
     def __repr__(self):
         return f"<bumpsemver.files.ConfiguredJSONFile:{self.filename}>"
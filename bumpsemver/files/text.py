@@ -1,6 +1,6 @@
 import logging
 from datetime import datetime
-from typing import Dict, Union
+from typing import Dict, Optional, Tuple, Union
 
 from bumpsemver.exceptions import VersionNotFoundError
 from bumpsemver.files.base import FileTypeBase
@@ -21,7 +21,7 @@ class ConfiguredPlainTextFile(FileTypeBase):
         Return normally if the version number is in fact present.
         """
         context["current_version"] = self._version_config.serialize(version)
-        search_expression = self._version_config.search.format(**context)
+        search_expression = self._version_config.search_template.render(context)
 
         if self.contains(search_expression):
             return
@@ -59,27 +59,36 @@ class ConfiguredPlainTextFile(FileTypeBase):
                     and search_lines[1:-1] == lookbehind[1:-1]
                 ):
                     logger.info(
-                        f"Found '{search}' in {self.filename} at line {lineno - (len(lookbehind) - 1)}: {line.rstrip()}"
+                        "Found '%s' in %s at line %s: %s",
+                        search,
+                        self.filename,
+                        lineno - (len(lookbehind) - 1),
+                        line.rstrip(),
                     )
                     return True
         return False
 
-    def replace(
-        self, current_version: Version, new_version: Version, context: Dict[str, Union[str, datetime]], dry_run: bool
-    ) -> None:
-
-        with open(self.filename, "rt", encoding="utf-8") as orig_fp:
-            file_content_before = orig_fp.read()
+    def render(
+        self,
+        current_version: Version,
+        new_version: Version,
+        context: Dict[str, Union[str, datetime]],
+        content: Optional[str] = None,
+    ) -> Tuple[str, str]:
+        if content is None:
+            with open(self.filename, "rt", encoding="utf-8") as orig_fp:
+                content = orig_fp.read()
+        file_content_before = content
 
         context["current_version"] = self._version_config.serialize(current_version)
         context["new_version"] = self._version_config.serialize(new_version)
 
-        search_for = self._version_config.search.format(**context)
-        replace_with = self._version_config.replace.format(**context)
+        search_for = self._version_config.search_template.render(context)
+        replace_with = self._version_config.replace_template.render(context)
 
         file_content_after = file_content_before.replace(search_for, replace_with)
 
-        self.update_file(file_content_before, file_content_after, dry_run)
+        return file_content_before, file_content_after
 
     def __repr__(self):
         return f"<bumpsemver.files.ConfiguredPlainTextFile:{self.filename}>"
@@ -1,6 +1,6 @@
 import logging
 from datetime import datetime
-from typing import Dict, Union
+from typing import Dict, Optional, Tuple, Union
 
 from tomlkit.exceptions import EmptyKeyError, KeyAlreadyPresent, NonExistentKey, ParseError, UnexpectedCharError
 
@@ -52,18 +52,22 @@ class ConfiguredTOMLFile(FileTypeBase):
         except (IndexError, NonExistentKey) as exc:
             raise PathNotFoundError(self.xpath, "toml", self.filename) from exc
 
-    def replace(
-        self, current_version: Version, new_version: Version, context: Dict[str, Union[str, datetime]], dry_run: bool
-    ) -> None:
+    def render(
+        self,
+        current_version: Version,
+        new_version: Version,
+        context: Dict[str, Union[str, datetime]],
+        content: Optional[str] = None,
+    ) -> Tuple[str, str]:
         current_version_str = self._version_config.serialize(current_version)
         context["current_version"] = current_version_str
         new_version_str = self._version_config.serialize(new_version)
         context["new_version"] = new_version_str
 
-        with open(self.filename, "rt") as fin:
-            content = fin.read()
-            value = TomlPath.update(content, self.xpath, new_version_str)
-            self.update_file(content, value, dry_run)
+        if content is None:
+            with open(self.filename, "rt") as fin:
+                content = fin.read()
+        return content, TomlPath.update(content, self.xpath, new_version_str)
 
     def __repr__(self):
         return f"<bumpsemver.files.ConfiguredTOMLFile:{self.filename}>"
@@ -2,7 +2,7 @@ import logging
 import pathlib
 from datetime import datetime
 from types import SimpleNamespace
-from typing import Dict, Union
+from typing import Dict, Optional, Tuple, Union
 
 from ruamel.yaml import YAML
 from ruamel.yaml.compat import StringIO
@@ -74,19 +74,24 @@ class ConfiguredYAMLFile(FileTypeBase):
         self.yaml.dump(data, stream)
         return stream.getvalue()
 
-    def __get_processor(self):
-        with open(self.filename, "rb") as fin:
-            content = fin.read().decode("utf-8")
-            (yaml_data, doc_loaded) = Parsers.get_yaml_data(self.yaml, self.yaml_log, content, literal=True)
-            if not doc_loaded:
-                raise InvalidYAMLError(f"Failed in reading YAML file '{self.filename}'")
-            processor = Processor(self.yaml_log, yaml_data)
-            return processor
-
-    def replace(
-        self, current_version: Version, new_version: Version, context: Dict[str, Union[str, datetime]], dry_run: bool
-    ) -> None:
-        processor = self.__get_processor()
+    def __get_processor(self, content: Optional[str] = None):
+        if content is None:
+            with open(self.filename, "rb") as fin:
+                content = fin.read().decode("utf-8")
+        (yaml_data, doc_loaded) = Parsers.get_yaml_data(self.yaml, self.yaml_log, content, literal=True)
+        if not doc_loaded:
+            raise InvalidYAMLError(f"Failed in reading YAML file '{self.filename}'")
+        processor = Processor(self.yaml_log, yaml_data)
+        return processor
+
+    def render(
+        self,
+        current_version: Version,
+        new_version: Version,
+        context: Dict[str, Union[str, datetime]],
+        content: Optional[str] = None,
+    ) -> Tuple[str, str]:
+        processor = self.__get_processor(content)
         file_content_before = self.__dump(processor.data)
 
         current_version_str = self._version_config.serialize(current_version)
@@ -101,7 +106,7 @@ class ConfiguredYAMLFile(FileTypeBase):
 
         file_content_after = self.__dump(processor.data)
 
-        self.update_file(file_content_before, file_content_after, dry_run)
+        return file_content_before, file_content_after
 
     def __repr__(self):
         return f"<bumpsemver.files.ConfiguredYAMLFile:{self.filename}>"
@@ -26,7 +26,29 @@ class NumericFunction:
         self.first_value = str(first_value)
 
     def bump(self, value):
+        if value.isdecimal():
+            return str(int(value) + 1)
         part_prefix, part_numeric, part_suffix = self.FIRST_NUMERIC.search(value).groups()
         bumped_numeric = int(part_numeric) + 1
 
         return "".join([part_prefix, str(bumped_numeric), part_suffix])
+
+
+class PrereleaseFunction:
+    """
+    This is a class that provides a function for the prerelease part of a SemVer version.
+    It starts with the provided first_value ("rc.1" by default), and increases the last numeric identifier
+    (e.g. 'rc.1' --> 'rc.2', 'beta.2.x' --> 'beta.3.x'). A numeric identifier is appended if there is none
+    (e.g. 'alpha' --> 'alpha.1').
+    """
+
+    def __init__(self, first_value=None):
+        self.first_value = "rc.1" if first_value is None else str(first_value)
+
+    def bump(self, value):
+        identifiers = value.split(".")
+        for index in range(len(identifiers) - 1, -1, -1):
+            if identifiers[index].isdigit():
+                identifiers[index] = str(int(identifiers[index]) + 1)
+                return ".".join(identifiers)
+        return f"{value}.1"
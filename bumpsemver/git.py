@@ -4,12 +4,18 @@ import os
 import subprocess
 from pathlib import Path
 from tempfile import NamedTemporaryFile
-from typing import List, Optional, Union
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
 
 from bumpsemver.exceptions import WorkingDirectoryIsDirtyError
 
 logger = logging.getLogger(__name__)
 
+LISTING_CHUNK_SIZE = 64 * 1024
+
+
+class _GitListingUnavailableError(Exception):
+    """Raised internally when a git command cannot be used to list the files."""
+
 
 class Git:
 
@@ -20,7 +26,8 @@ class Git:
             temp_fp.write(message.encode("utf-8"))
         env = os.environ.copy()
         for key in ("current_version", "new_version"):
-            env[str("BUMPSEMVER_" + key.upper())] = str(context[key])
+            if key in context:
+                env[str("BUMPSEMVER_" + key.upper())] = str(context[key])
         try:
             subprocess.check_output(["git", "commit", "-F", temp_fp.name, *extra_args], env=env)
         except subprocess.CalledProcessError as exc:
@@ -30,6 +37,10 @@ class Git:
         finally:
             os.unlink(temp_fp.name)
 
+    @classmethod
+    def head_sha(cls) -> str:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"]).decode().strip()
+
     @classmethod
     def is_usable(cls):
         try:
@@ -90,6 +101,27 @@ class Git:
 
         return info
 
+    @classmethod
+    def latest_tag(cls, pattern: str) -> Optional[str]:
+        """
+        Return the name of the latest tag matching the glob `pattern` reachable from HEAD, or None if there is none.
+        """
+        try:
+            output = subprocess.check_output(
+                ["git", "describe", "--tags", "--abbrev=0", f"--match={pattern}"], stderr=subprocess.DEVNULL
+            )
+        except (subprocess.CalledProcessError, OSError):
+            return None
+        return output.decode().strip()
+
+    @classmethod
+    def git_dir(cls) -> Optional[Path]:
+        try:
+            output = subprocess.check_output(["git", "rev-parse", "--git-dir"], stderr=subprocess.DEVNULL)
+        except (subprocess.CalledProcessError, OSError):
+            return None
+        return Path(output.decode().strip())
+
     @classmethod
     def add_path(cls, path: Union[str, Path]):
         subprocess.check_output(["git", "add", "--update", str(path)])
@@ -111,13 +143,116 @@ class Git:
 
     @classmethod
     def list_files(cls) -> List[str]:
+        return list(cls.iter_files())
+
+    @classmethod
+    def list_tracked_files(cls) -> List[Tuple[str, Optional[str]]]:
+        """
+        List `(path, blob_id)` tuples of the files tracked by git, or of all the files with a None blob id without git.
+        """
+        files = list(cls.iter_blobs())
+        if files or cls.git_dir() is not None:
+            return files
+        return [(file, None) for file in cls.iter_files()]
+
+    @classmethod
+    def iter_files(cls, pathspec: Optional[Sequence[str]] = None) -> Iterator[str]:
+        """
+        Stream the paths tracked by git, one at a time.
+
+        `git ls-files -z` is read incrementally, so the consumer can start working on the first paths while git is still
+        listing the rest, and paths with special characters are taken verbatim instead of being quoted by git.
+        """
+        try:
+            yield from cls._iter_ls_files([], pathspec)
+        except _GitListingUnavailableError:
+            yield from _walk_files(os.getcwd())
+
+    @classmethod
+    def iter_blobs(cls, pathspec: Optional[Sequence[str]] = None) -> Iterator[Tuple[str, str]]:
+        """
+        Stream `(path, blob_id)` tuples of the files tracked by git, as recorded in the index.
+
+        Yields nothing if git is not usable, because blob ids only exist in a git repository.
+        """
         try:
-            return [line.decode().strip() for line in subprocess.check_output(["git", "ls-files"]).splitlines()]
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            logger.warning("'git ls-files' failed. Listing files without respecting '.gitignore'")
-            path = os.getcwd()
-            return [
-                os.path.relpath(str(os.path.join(dir_path, f)))
-                for (dir_path, dirs, filenames) in os.walk(path)
-                for f in filenames
-            ]
+            for record in cls._iter_ls_files(["--stage"], pathspec):
+                # <mode> SP <object> SP <stage> TAB <file>
+                meta, _, path = record.partition("\t")
+                yield path, meta.split(" ")[1]
+        except _GitListingUnavailableError:
+            return
+
+    @classmethod
+    def iter_modified_files(cls) -> Iterator[str]:
+        """
+        Stream the tracked paths whose working tree content differs from the index.
+        """
+        try:
+            yield from cls._iter_ls_files(["--modified"], None)
+        except _GitListingUnavailableError:
+            return
+
+    @classmethod
+    def iter_added_files(cls, since: str, pathspec: Optional[Sequence[str]] = None) -> Iterator[str]:
+        """
+        Stream the paths added or renamed in the working tree since the commit `since`.
+
+        Raises _GitListingUnavailableError if git cannot list them, e.g. because `since` is not in a shallow clone, so
+        that the caller does not take an unknown list of files for an empty one.
+        """
+        # --relative lists the paths relative to the current directory, just like `git ls-files` does
+        command = ["git", "diff", "-z", "--name-only", "--relative", "--diff-filter=AR", "-M", since]
+        command += ["--", *(pathspec or [])]
+        return cls._iter_records(command)
+
+    @classmethod
+    def _iter_ls_files(cls, options: List[str], pathspec: Optional[Sequence[str]]) -> Iterator[str]:
+        command = ["git", "ls-files", "-z", *options]
+        if pathspec:
+            command += ["--", *pathspec]
+        return cls._iter_records(command)
+
+    @classmethod
+    def _iter_records(cls, command: List[str]) -> Iterator[str]:
+        try:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        except OSError as exc:
+            raise _GitListingUnavailableError() from exc
+
+        staged = "--stage" in command
+        yielded = False
+        last_path = None
+        remainder = b""
+        try:
+            for chunk in iter(lambda: process.stdout.read1(LISTING_CHUNK_SIZE), b""):
+                records = (remainder + chunk).split(b"\0")
+                remainder = records.pop()
+                for record in records:
+                    decoded = os.fsdecode(record)
+                    # unmerged paths are listed once per conflict stage, report them only once
+                    path = decoded.partition("\t")[2] if staged else decoded
+                    if path == last_path:
+                        continue
+                    last_path = path
+                    yielded = True
+                    yield decoded
+        except GeneratorExit:
+            # the consumer stopped early, there is no need to let git finish listing
+            process.kill()
+            raise
+        finally:
+            process.stdout.close()
+            return_code = process.wait()
+
+        if return_code != 0:
+            if yielded:
+                raise subprocess.CalledProcessError(return_code, command)
+            raise _GitListingUnavailableError()
+
+
+def _walk_files(path: str) -> Iterator[str]:
+    logger.warning("'git ls-files' failed. Listing files without respecting '.gitignore'")
+    for dir_path, _, filenames in os.walk(path):
+        for filename in filenames:
+            yield os.path.relpath(str(os.path.join(dir_path, filename)))
@@ -0,0 +1,216 @@
+"""
+Timing of the phases of a run, switched on with --profile.
+"""
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# the profiler of the current run, if --profile is given, held per execution context so that the runs of a
+# long-lived process, e.g. the library API or the batch workers, do not share it
+_active: ContextVar[Optional["Profiler"]] = ContextVar("bumpsemver_profiler", default=None)
+
+
+class _SubprocessCounter:
+    """
+    Count the subprocesses spawned while the registered profilers run, through a single audit hook.
+
+    Audit hooks cannot be removed, so the hook is installed with the first profiler and serves every later one.
+    """
+
+    def __init__(self):
+        self.installed = False
+        self.running: List["Profiler"] = []
+
+    def __call__(self, event: str, _args) -> None:
+        if event == "subprocess.Popen":
+            for profiler in self.running:
+                profiler.subprocesses += 1
+
+    def register(self, profiler: "Profiler") -> None:
+        if not self.installed:
+            sys.addaudithook(self)
+            self.installed = True
+        self.running.append(profiler)
+
+    def unregister(self, profiler: "Profiler") -> None:
+        self.running.remove(profiler)
+
+
+_subprocess_counter = _SubprocessCounter()
+
+
+def _io_counters() -> Tuple[Optional[int], Optional[int]]:
+    """
+    Return the bytes read and written by this process so far, or None where the platform does not tell.
+    """
+    try:
+        with open("/proc/self/io", "rb") as io_fp:
+            counters = dict(line.split(b":", 1) for line in io_fp.read().splitlines())
+        return int(counters[b"rchar"]), int(counters[b"wchar"])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def _children_cpu() -> float:
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+class PhaseStats:
+    def __init__(self, kind: str, name: str):
+        self.kind = kind
+        self.name = name
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.subprocess_cpu = 0.0
+        self.subprocesses = 0
+        self.bytes_read: Optional[int] = None
+        self.bytes_written: Optional[int] = None
+
+    def as_dict(self) -> Dict:
+        return {
+            "kind": self.kind,
+            "name": self.name,
+            "calls": self.calls,
+            "wall": round(self.wall, 6),
+            "cpu": round(self.cpu, 6),
+            "subprocess_cpu": round(self.subprocess_cpu, 6),
+            "subprocesses": self.subprocesses,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+        }
+
+
+class Profiler:
+    """
+    Accumulate wall and CPU time, spawned subprocesses and I/O of every phase of a run, and of every file handler.
+
+    The subprocesses are counted by an audit hook, the I/O is taken from /proc/self/io and is not available on every
+    platform. If `dump_file` is given, the whole run is also profiled with cProfile, and the stats are dumped into it.
+    """
+
+    def __init__(self, report_format: Optional[str] = "table", dump_file: Optional[str] = None):
+        self.report_format = report_format
+        self.stats: Dict[Tuple[str, str], PhaseStats] = {}
+        self.subprocesses = 0
+        self.dump_file = dump_file
+        self.total = PhaseStats("run", "total")
+        self._started: Optional[tuple] = None
+        self._profile = None
+
+    def _snapshot(self) -> tuple:
+        return (time.perf_counter(), time.process_time(), _children_cpu(), self.subprocesses, *_io_counters())
+
+    def _accumulate(self, stats: PhaseStats, before: tuple) -> None:
+        after = self._snapshot()
+        stats.calls += 1
+        stats.wall += after[0] - before[0]
+        stats.cpu += after[1] - before[1]
+        stats.subprocess_cpu += after[2] - before[2]
+        stats.subprocesses += after[3] - before[3]
+        if before[4] is not None and after[4] is not None:
+            stats.bytes_read = (stats.bytes_read or 0) + after[4] - before[4]
+            stats.bytes_written = (stats.bytes_written or 0) + after[5] - before[5]
+
+    def start(self) -> None:
+        _subprocess_counter.register(self)
+        if self.dump_file:
+            import cProfile
+
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        self._started = self._snapshot()
+
+    def stop(self) -> None:
+        if self._started is None:
+            return
+        self._accumulate(self.total, self._started)
+        self._started = None
+        _subprocess_counter.unregister(self)
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.dump_stats(self.dump_file)
+            self._profile = None
+
+    @contextmanager
+    def phase(self, name: str, kind: str = "phase") -> Iterator[None]:
+        stats = self.stats.get((kind, name))
+        if stats is None:
+            stats = self.stats[(kind, name)] = PhaseStats(kind, name)
+        before = self._snapshot()
+        try:
+            yield
+        finally:
+            self._accumulate(stats, before)
+
+    def sorted_stats(self) -> List[PhaseStats]:
+        """
+        Return the phases and then the file handlers, each of them the slowest first, followed by the whole run.
+        """
+        phases = sorted(self.stats.values(), key=lambda stats: (stats.kind != "phase", -stats.wall))
+        return [*phases, self.total]
+
+    def as_json(self) -> str:
+        return json.dumps([stats.as_dict() for stats in self.sorted_stats()], indent=2)
+
+    def as_table(self) -> str:
+        lines = [
+            f"{'kind':<8}{'name':<40}{'calls':>6}{'wall s':>10}{'cpu s':>10}{'sub cpu s':>10}"
+            f"{'subprocs':>9}{'read B':>12}{'written B':>12}"
+        ]
+        for stats in self.sorted_stats():
+            name = stats.name if len(stats.name) <= 38 else f"…{stats.name[-37:]}"
+            read = "n/a" if stats.bytes_read is None else stats.bytes_read
+            written = "n/a" if stats.bytes_written is None else stats.bytes_written
+            lines.append(
+                f"{stats.kind:<8}{name:<40}{stats.calls:>6}{stats.wall:>10.4f}{stats.cpu:>10.4f}"
+                f"{stats.subprocess_cpu:>10.4f}{stats.subprocesses:>9}{read:>12}{written:>12}"
+            )
+        return "\n".join(lines)
+
+    def report(self) -> str:
+        return self.as_json() if self.report_format == "json" else self.as_table()
+
+
+def start(profile_format: Optional[str] = "table", dump_file: Optional[str] = None) -> Profiler:
+    """
+    Start profiling the run in the current context, and return the profiler.
+    """
+    profiler = Profiler(profile_format, dump_file)
+    profiler.start()
+    _active.set(profiler)
+    return profiler
+
+
+def active() -> Optional[Profiler]:
+    return _active.get()
+
+
+def stop() -> Optional[Profiler]:
+    """
+    Stop profiling the run, write the report to stderr unless its format is None, and return the profiler.
+    """
+    profiler = _active.get()
+    if profiler is None:
+        return None
+    _active.set(None)
+    profiler.stop()
+    if profiler.report_format is not None:
+        sys.stderr.write(profiler.report() + "\n")
+    return profiler
+
+
+def phase(name: str, kind: str = "phase"):
+    """
+    Time a phase of the run if profiling is active, otherwise do nothing.
+    """
+    profiler = _active.get()
+    if profiler is None:
+        return nullcontext()
+    return profiler.phase(name, kind)
@@ -0,0 +1,513 @@
+"""
+Propagation of the bumps of a workspace to the projects depending on the bumped ones, for `bumpsemver workspace
+--propagate`.
+
+The dependency graph is built once from the package.json and pyproject.toml files managed by the projects. Bumping a
+project updates the ranges of the dependencies on its packages which the new version does not satisfy anymore, and
+bumps the projects with an updated range in turn, in the topological order of the graph.
+"""
+
+import io
+import json
+import logging
+import posixpath
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import tomlkit
+from tomlkit.exceptions import ParseError
+
+from bumpsemver.api import FileEdit, _plan_files, _resolve_versions, time_context
+from bumpsemver.exceptions import InvalidArgumentsError, InvalidFileError
+from bumpsemver.version_part import Version, VersionConfig
+from bumpsemver.workspace import (
+    Workspace,
+    WorkspacePlan,
+    _check_tag_names,
+    _check_workspace,
+    _select_projects,
+)
+
+logger = logging.getLogger(__name__)
+
+NPM_DEPENDENCY_SECTIONS = ("dependencies", "devDependencies", "peerDependencies", "optionalDependencies")
+WORKSPACE_PROTOCOL = "workspace:"
+
+# a comparator of a range, in the syntax of npm, PEP 440 and Poetry, e.g. ^1.2.0, >= 1.2, ~=1.2, 1.x or ==1.2.*
+RE_COMPARATOR = re.compile(
+    r"(?P<operator>\^|~=|~|==|=|>=|<=|>|<|!=)?\s*v?"
+    r"(?P<version>(?:\d+|[xX*])(?:\.(?:\d+|[xX*])){0,2}(?:-(?P<prerelease>[0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?)"
+)
+# a PEP 508 requirement, of which only the version specifier matters, e.g. b[extra] >=1.0,<2 ; python_version>'3.8'
+RE_REQUIREMENT = re.compile(
+    r"^\s*(?P<name>[A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?)\s*(?:\[[^\]]*\])?\s*\(?\s*"
+    r"(?P<specifier>[^;()@]*?)\s*\)?\s*(?:;.*)?$"
+)
+
+
+def normalize_name(name: str) -> str:
+    """
+    Return the name of a package as PEP 503 normalizes it, which leaves the npm names as they are.
+    """
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+class Comparator:
+    """
+    A comparator of a range, whose version may be partial, or have wildcards, e.g. the 1.2 of ^1.2 or of 1.2.x.
+    """
+
+    def __init__(self, operator: str, version: str, prerelease: Optional[str], start: int, end: int):
+        self.operator = operator
+        self.version = version
+        self.prerelease = prerelease
+        # the position of the version in the range
+        self.start = start
+        self.end = end
+        numbers = []
+        for component in version.split("+")[0].split("-")[0].split("."):
+            if not component.isdigit():
+                break
+            numbers.append(int(component))
+        self.numbers = numbers
+
+    def _bound(self, index: int) -> Version:
+        """
+        Return the lowest version whose component `index` is the next one, e.g. 2.0.0 for 1.2 and index 0.
+        """
+        numbers = [*self.numbers[:index], self.numbers[index] + 1]
+        return _parse(".".join(str(number) for number in numbers + [0] * (3 - len(numbers))))
+
+    def _lowest(self) -> Version:
+        if self.prerelease is not None and len(self.numbers) == 3:
+            return _parse(self.version.split("+")[0])
+        return _parse(".".join(str(number) for number in self.numbers + [0] * (3 - len(self.numbers))))
+
+    def _in_partial(self, version: Version) -> bool:
+        """
+        Tell whether the version is the version of the comparator, or one of the versions its wildcards match.
+        """
+        if not self.numbers:
+            return True
+        if len(self.numbers) == 3:
+            return version == self._lowest()
+        return self._lowest() <= version < self._bound(len(self.numbers) - 1)
+
+    def satisfied_by(self, version: Version) -> bool:
+        operator = self.operator
+        if operator in ("", "=", "=="):
+            return self._in_partial(version)
+        if operator == "!=":
+            return not self._in_partial(version)
+        if operator == ">=":
+            return version >= self._lowest()
+        if operator == "<":
+            return version < self._lowest()
+        if operator == ">":
+            if len(self.numbers) == 3:
+                return version > self._lowest()
+            return not self.numbers or version >= self._bound(len(self.numbers) - 1)
+        if operator == "<=":
+            if len(self.numbers) == 3:
+                return version <= self._lowest()
+            return bool(self.numbers) and version < self._bound(len(self.numbers) - 1)
+        if not self.numbers:
+            return True
+        if operator == "^":
+            # the first non-zero component is kept, or the last given one if all of them are zero
+            index = next((i for i, number in enumerate(self.numbers) if number), len(self.numbers) - 1)
+        elif operator == "~":
+            index = min(1, len(self.numbers) - 1)
+        else:
+            # ~=, which needs at least two components
+            index = max(0, len(self.numbers) - 2)
+        return self._lowest() <= version < self._bound(index)
+
+    def __repr__(self):
+        return f"<bumpsemver.Comparator:{self.operator}{self.version}>"
+
+
+def _parse(version_string: str) -> Version:
+    return VersionConfig.interned().parse(version_string)
+
+
+def parse_range(spec: str) -> Optional[List[List[Comparator]]]:
+    """
+    Parse a range into its sets of comparators, the sets separated by ||, and the comparators of a set by spaces or
+    commas. Return None if it is not a range, e.g. a path, a URL or a tag.
+    """
+    comparator_sets = []
+    offset = 0
+    for part in spec.split("||"):
+        comparators = []
+        position = 0
+        while True:
+            while position < len(part) and part[position] in " \t,":
+                position += 1
+            if position == len(part):
+                break
+            match = RE_COMPARATOR.match(part, position)
+            if match is None:
+                return None
+            comparators.append(
+                Comparator(
+                    match.group("operator") or "",
+                    match.group("version"),
+                    match.group("prerelease"),
+                    offset + match.start("version"),
+                    offset + match.end("version"),
+                )
+            )
+            position = match.end()
+        comparator_sets.append(comparators)
+        offset += len(part) + 2
+    return comparator_sets
+
+
+def range_satisfied_by(comparator_sets: List[List[Comparator]], version: Version) -> bool:
+    """
+    Tell whether any set of comparators is satisfied by the version.
+
+    As npm and PEP 440 do, a prerelease only satisfies a set with a prerelease of the same major, minor and patch.
+    """
+    release = [int(version[label].value) for label in ("major", "minor", "patch")]
+    prerelease = "prerelease" in version
+    for comparators in comparator_sets:
+        if prerelease and not any(
+            comparator.prerelease is not None and comparator.numbers == release for comparator in comparators
+        ):
+            continue
+        if all(comparator.satisfied_by(version) for comparator in comparators):
+            return True
+    return False
+
+
+def _like(template: str, version: Version) -> str:
+    """
+    Write the version with the components and the wildcards of the version of a comparator, e.g. 2.x for 1.x.
+    """
+    if "prerelease" in version or "-" in template:
+        return f"{version['major'].value}.{version['minor'].value}.{version['patch'].value}" + (
+            f"-{version['prerelease'].value}" if "prerelease" in version else ""
+        )
+    components = template.split(".")
+    values = [version[label].value for label in ("major", "minor", "patch")]
+    return ".".join(values[index] if component.isdigit() else component for index, component in enumerate(components))
+
+
+def rewrite_range(spec: str, version: Version) -> Optional[str]:
+    """
+    Return the range updated to allow the version, keeping its operators, or None if it cannot be updated.
+
+    A single comparator gets the version, e.g. ^2.0.0 for ^1.2.0, and a range between a lower and an upper bound gets
+    the version and the next major version, e.g. >=2.0,<3 for >=1.0,<2.
+    """
+    comparator_sets = parse_range(spec)
+    if not comparator_sets or len(comparator_sets) != 1:
+        return None
+    comparators = comparator_sets[0]
+    replacements: List[Tuple[Comparator, str]] = []
+    if len(comparators) == 1 and comparators[0].operator in ("", "=", "==", "^", "~", "~=", ">="):
+        replacements.append((comparators[0], _like(comparators[0].version, version)))
+    elif len(comparators) == 2 and comparators[0].operator == ">=" and comparators[1].operator == "<":
+        upper = comparators[1]
+        major = _parse(f"{int(version['major'].value) + 1}.0.0")
+        replacements.append((comparators[0], _like(comparators[0].version, version)))
+        replacements.append((upper, _like(upper.version if upper.prerelease is None else "0.0.0", major)))
+    else:
+        return None
+
+    for comparator, replacement in reversed(replacements):
+        spec = spec[: comparator.start] + replacement + spec[comparator.end :]
+    new_range = parse_range(spec)
+    return spec if new_range and range_satisfied_by(new_range, version) else None
+
+
+class Dependency:
+    """
+    A dependency of a manifest on a package of the workspace, with its range at `path` in the manifest.
+
+    The range is the part `span` of the value at `path`, the whole string but for PEP 508 requirements and the
+    workspace: protocol.
+    """
+
+    def __init__(
+        self,
+        project: str,
+        filename: str,
+        name: str,
+        path: Tuple[Any, ...],
+        value: str,
+        span: Tuple[int, int],
+    ):
+        self.project = project
+        self.filename = filename
+        self.name = name
+        self.path = path
+        self.value = value
+        self.span = span
+
+    @property
+    def spec(self) -> str:
+        return self.value[self.span[0] : self.span[1]]
+
+    def __repr__(self):
+        return f"<bumpsemver.Dependency:{self.filename}:{self.name}@{self.spec}>"
+
+
+class DependencyEdit:
+    """
+    The range of a dependency on a bumped package, updated to allow its new version.
+    """
+
+    def __init__(self, project: str, filename: str, name: str, before: str, after: str):
+        self.project = project
+        self.filename = filename
+        self.name = name
+        self.before = before
+        self.after = after
+
+    def __repr__(self):
+        return f"<bumpsemver.DependencyEdit:{self.filename}:{self.name}:{self.before}->{self.after}>"
+
+
+def _npm_manifest(project: str, filename: str, content: str) -> Tuple[List[str], List[Dependency]]:
+    data = json.loads(content)
+    names = [data["name"]] if isinstance(data.get("name"), str) else []
+    dependencies = []
+    for section in NPM_DEPENDENCY_SECTIONS:
+        for name, value in (data.get(section) or {}).items():
+            if not isinstance(value, str):
+                continue
+            start = len(WORKSPACE_PROTOCOL) if value.startswith(WORKSPACE_PROTOCOL) else 0
+            dependencies.append(Dependency(project, filename, name, (section, name), value, (start, len(value))))
+    return names, dependencies
+
+
+def _requirement(project: str, filename: str, path: Tuple[Any, ...], value: Any) -> Optional[Dependency]:
+    match = RE_REQUIREMENT.match(value) if isinstance(value, str) else None
+    if match is None:
+        return None
+    return Dependency(project, filename, match.group("name"), path, str(value), match.span("specifier"))
+
+
+def _python_manifest(project: str, filename: str, content: str) -> Tuple[List[str], List[Dependency]]:
+    document = tomlkit.parse(content).unwrap()
+    names = []
+    dependencies = []
+
+    pep621 = document.get("project") or {}
+    if isinstance(pep621.get("name"), str):
+        names.append(pep621["name"])
+    requirements = [(("project", "dependencies"), pep621.get("dependencies") or [])]
+    for extra, extra_requirements in (pep621.get("optional-dependencies") or {}).items():
+        requirements.append((("project", "optional-dependencies", extra), extra_requirements))
+    for path, values in requirements:
+        for index, value in enumerate(values):
+            dependency = _requirement(project, filename, (*path, index), value)
+            if dependency is not None:
+                dependencies.append(dependency)
+
+    poetry = (document.get("tool") or {}).get("poetry") or {}
+    if isinstance(poetry.get("name"), str):
+        names.append(poetry["name"])
+    tables = [(("tool", "poetry", "dependencies"), poetry.get("dependencies") or {})]
+    tables.append((("tool", "poetry", "dev-dependencies"), poetry.get("dev-dependencies") or {}))
+    for group, group_table in (poetry.get("group") or {}).items():
+        tables.append((("tool", "poetry", "group", group, "dependencies"), group_table.get("dependencies") or {}))
+    for path, table in tables:
+        for name, value in table.items():
+            if isinstance(value, dict):
+                path_to_value: Tuple[Any, ...] = (*path, name, "version")
+                version_value = value.get("version")
+            else:
+                path_to_value = (*path, name)
+                version_value = value
+            if isinstance(version_value, str) and name != "python":
+                dependencies.append(
+                    Dependency(project, filename, name, path_to_value, version_value, (0, len(version_value)))
+                )
+    return names, dependencies
+
+
+MANIFEST_PARSERS = {
+    "package.json": ("npm", _npm_manifest),
+    "pyproject.toml": ("python", _python_manifest),
+}
+
+
+class DependencyGraph:
+    """
+    The dependencies between the projects of a workspace, through the packages their manifests declare.
+    """
+
+    def __init__(self, workspace: Workspace, packages: Dict[Tuple[str, str], str], dependents: Dict[str, List]):
+        self.workspace = workspace
+        # the project of every package of the workspace, by its ecosystem and normalized name
+        self.packages = packages
+        # the dependencies on the packages of every project
+        self.dependents = dependents
+
+    @classmethod
+    def build(cls, workspace: Workspace) -> "DependencyGraph":
+        """
+        Read the manifests managed by the projects, each of them once, even if several projects manage it.
+        """
+        packages: Dict[Tuple[str, str], str] = {}
+        dependencies: List[Tuple[str, Dependency]] = []
+        seen = set()
+        for project, config in workspace.projects.items():
+            for file in config.files:
+                manifest = MANIFEST_PARSERS.get(posixpath.basename(file.filename))
+                if manifest is None or file.filename in seen:
+                    continue
+                seen.add(file.filename)
+                ecosystem, parse_manifest = manifest
+                with io.open(file.filename, "rt", encoding="utf-8") as fin:
+                    content = fin.read()
+                try:
+                    names, manifest_dependencies = parse_manifest(project, file.filename, content)
+                except (ValueError, ParseError) as exc:
+                    raise InvalidFileError(file.filename, "json" if ecosystem == "npm" else "toml") from exc
+                for name in names:
+                    owner = packages.setdefault((ecosystem, normalize_name(name)), project)
+                    if owner != project:
+                        raise InvalidArgumentsError(f"Package '{name}' is declared by both '{owner}' and '{project}'")
+                dependencies.extend((ecosystem, dependency) for dependency in manifest_dependencies)
+
+        dependents: Dict[str, List[Dependency]] = {project: [] for project in workspace.projects}
+        for ecosystem, dependency in dependencies:
+            owner = packages.get((ecosystem, normalize_name(dependency.name)))
+            if owner is not None and owner != dependency.project:
+                dependents[owner].append(dependency)
+        return cls(workspace, packages, dependents)
+
+    def topological_order(self) -> List[str]:
+        """
+        Return the projects, every one of them after the projects it depends on, otherwise in the workspace order.
+        """
+        depends_on: Dict[str, set] = {project: set() for project in self.workspace.projects}
+        for project, dependencies in self.dependents.items():
+            for dependency in dependencies:
+                depends_on[dependency.project].add(project)
+        order: List[str] = []
+        remaining = list(self.workspace.projects)
+        while remaining:
+            ready = next((project for project in remaining if not depends_on[project] - set(order)), None)
+            if ready is None:
+                # the projects no remaining project depends on are not part of a cycle
+                while True:
+                    required = set().union(*(depends_on[project] for project in remaining))
+                    if required.issuperset(remaining):
+                        break
+                    remaining = [project for project in remaining if project in required]
+                raise InvalidArgumentsError(
+                    f"Projects {remaining} depend on each other, the bumps cannot be propagated"
+                )
+            order.append(ready)
+            remaining.remove(ready)
+        return order
+
+    def __repr__(self):
+        return f"<bumpsemver.DependencyGraph:{len(self.packages)} packages>"
+
+
+def _set_value(data: Any, path: Tuple[Any, ...], value: str) -> None:
+    for key in path[:-1]:
+        data = data[key]
+    data[path[-1]] = value
+
+
+def _edit_dependency(dependency: Dependency, spec: str, content: str) -> str:
+    """
+    Return the content of the manifest with the range of the dependency replaced.
+    """
+    value = dependency.value[: dependency.span[0]] + spec + dependency.value[dependency.span[1] :]
+    if dependency.filename.endswith(".json"):
+        data = json.loads(content)
+        _set_value(data, dependency.path, value)
+        # formatted as ConfiguredJSONFile does
+        return json.dumps(data, ensure_ascii=False, allow_nan=False, indent=2, separators=(",", ": ")) + "\n"
+    document = tomlkit.parse(content)
+    _set_value(document, dependency.path, value)
+    return document.as_string()
+
+
+def plan_propagation(
+    workspace: Workspace,
+    part: Optional[str] = None,
+    new_version: Optional[str] = None,
+    projects: Optional[Sequence[str]] = None,
+    dependents_part: Optional[str] = "patch",
+    allow_dirty: bool = False,
+) -> WorkspacePlan:
+    """
+    Check the bump of the selected projects, and of the projects whose dependencies on them need an updated range.
+
+    The projects are visited in topological order. A bumped project updates the ranges of the dependencies on its
+    packages which its new version does not satisfy, and the projects owning them are bumped by `dependents_part`,
+    unless it is None, which only updates the ranges. A dependency whose value is not a range, e.g. a path or a URL, is
+    left alone with a warning. Raise InvalidArgumentsError if the projects depend on each other or if a range cannot be
+    updated, e.g. a range with ||.
+    """
+    selected = _select_projects(workspace, projects)
+    graph = DependencyGraph.build(workspace)
+    order = graph.topological_order()
+    vcs = _check_workspace(workspace, allow_dirty)
+
+    context = time_context()
+    pending: Dict[str, str] = {}
+    edits: List[FileEdit] = []
+    dependency_edits: List[DependencyEdit] = []
+    skipped_dependencies: List[Dependency] = []
+    bumps: Dict[str, Tuple[Optional[str], Optional[str]]] = {project: (part, new_version) for project in selected}
+    plans = {}
+    for project in order:
+        if project not in bumps:
+            continue
+        config = workspace.projects[project]
+        versions = _resolve_versions(config, *bumps[project], None)
+        bump_plan = _plan_files(config, *versions, {**context, **config.vcs_info}, vcs, pending)
+        plans[project] = bump_plan
+        edits.extend(bump_plan.edits)
+
+        for dependency in graph.dependents[project]:
+            comparator_sets = parse_range(dependency.spec)
+            if comparator_sets is None:
+                logger.warning(
+                    "Cannot check dependency %s of %s against %s, '%s' is not a version range",
+                    dependency.name,
+                    dependency.filename,
+                    bump_plan.new_version,
+                    dependency.spec,
+                )
+                skipped_dependencies.append(dependency)
+                continue
+            if range_satisfied_by(comparator_sets, bump_plan.new):
+                continue
+            spec = rewrite_range(dependency.spec, bump_plan.new)
+            if spec is None:
+                raise InvalidArgumentsError(
+                    f"Cannot update the range '{dependency.spec}' of the dependency {dependency.name} in "
+                    f"{dependency.filename} to allow {bump_plan.new_version}"
+                )
+            logger.info(
+                "Updating dependency %s of %s: %s → %s", dependency.name, dependency.filename, dependency.spec, spec
+            )
+            if dependency.filename in pending:
+                before = pending[dependency.filename]
+            else:
+                with io.open(dependency.filename, "rt", encoding="utf-8") as fin:
+                    before = fin.read()
+            after = _edit_dependency(dependency, spec, before)
+            pending[dependency.filename] = after
+            file_type = "json" if dependency.filename.endswith(".json") else "toml"
+            edits.append(FileEdit(dependency.filename, file_type, before, after))
+            dependency_edits.append(
+                DependencyEdit(dependency.project, dependency.filename, dependency.name, dependency.spec, spec)
+            )
+            if dependents_part is not None:
+                bumps.setdefault(dependency.project, (dependents_part, None))
+
+    _check_tag_names(plans)
+    return WorkspacePlan(workspace, plans, vcs, dependency_edits, edits, skipped_dependencies)
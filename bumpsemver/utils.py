@@ -2,9 +2,220 @@
 Commonly used utilities.
 """
 
+import re
+import string
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Pattern, Tuple
+
+RE_GLOB_CHARS = re.compile(r"[*?\[]")
+# the literal end of a glob pattern, after its last wildcard or character class
+RE_GLOB_SUFFIX = re.compile(r"[^*?\[\]]*\Z")
+
 
 def key_value_string(obj: dict) -> str:
     """
     Dump a dict object into a string representation of key-value pairs.
     """
     return ", ".join(f"{k}={v}" for k, v in sorted(obj.items()))
+
+
+class Template:
+    """
+    A `str.format` template parsed once, so that rendering it is a join of its literals and the formatted fields.
+
+    Only fields referring to a name of the context are rendered this way, the templates using positional fields,
+    attribute or item access, conversions or nested fields in a format spec fall back to `str.format`.
+    """
+
+    def __init__(self, template: str):
+        self.template = template
+        self._parts = self._compile(template)
+
+    @staticmethod
+    def _compile(template: str) -> Optional[List[Tuple[str, Optional[str], str]]]:
+        """
+        Return the literals and the fields of the template, or None if it has to be rendered by `str.format`.
+        """
+        try:
+            parsed = list(string.Formatter().parse(template))
+        except ValueError:
+            # a malformed template only fails when it is rendered, as it would with `str.format`
+            return None
+        parts = []
+        for literal, field, format_spec, conversion in parsed:
+            if field is not None and (conversion or not field.isidentifier() or "{" in (format_spec or "")):
+                return None
+            parts.append((literal, field, format_spec or ""))
+        return parts
+
+    def render(self, context: Mapping[str, Any]) -> str:
+        if self._parts is None:
+            return self.template.format(**context)
+        rendered = []
+        for literal, field, format_spec in self._parts:
+            rendered.append(literal)
+            if field is not None:
+                rendered.append(format(context[field], format_spec))
+        return "".join(rendered)
+
+    def __repr__(self):
+        return f"<bumpsemver.Template:{self.template}>"
+
+
+def translate_glob(pattern: str) -> str:
+    """
+    Translate a glob pattern for a path relative to the repository root into a regular expression.
+
+    `*` and `?` do not match across directories, `**/` matches zero or more directories, a trailing `**` matches
+    everything below, and `[...]` (or `[!...]`) is a character class. The regular expression has no capturing groups.
+    """
+    parts = []
+    index, length = 0, len(pattern)
+    while index < length:
+        char = pattern[index]
+        if pattern.startswith("**/", index):
+            parts.append("(?:.*/)?")
+            index += 3
+            continue
+        if pattern.startswith("**", index):
+            parts.append(".*")
+            index += 2
+            continue
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = index + 1
+            if end < length and pattern[end] == "!":
+                end += 1
+            if end < length and pattern[end] == "]":
+                end += 1
+            end = pattern.find("]", end)
+            if end >= 0:
+                body = pattern[index + 1 : end].replace("\\", "\\\\")
+                parts.append(f"[^{body[1:]}]" if body.startswith("!") else f"[{body}]")
+                index = end + 1
+                continue
+            parts.append(re.escape(char))
+        else:
+            parts.append(re.escape(char))
+        index += 1
+    return "".join(parts)
+
+
+class GlobSet:
+    """
+    Glob patterns bucketed by their literal suffix, e.g. `.yml` for `**/*.yml`, so that a path is only checked against
+    the patterns whose suffix it ends with. The patterns ending with a wildcard are compiled into a single regular
+    expression, which finds all of them a path matches in one pass.
+    """
+
+    # the longest suffix the patterns are bucketed by, so that finding the bucket of a path costs a few dict lookups
+    SUFFIX_LENGTH = 4
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = list(patterns)
+        # the patterns by the length of their bucket suffix, then by the suffix
+        self._buckets: Dict[int, Dict[str, List[Tuple[int, Pattern]]]] = {}
+        unbucketed = []
+        for index, pattern in enumerate(self.patterns):
+            suffix = RE_GLOB_SUFFIX.search(pattern).group()[-self.SUFFIX_LENGTH :]
+            if suffix:
+                regex = re.compile(f"{translate_glob(pattern)}\\Z")
+                self._buckets.setdefault(len(suffix), {}).setdefault(suffix, []).append((index, regex))
+            else:
+                unbucketed.append(index)
+        self._unbucketed = unbucketed
+        # every pattern is an optional lookahead with one capturing group, set only if the pattern matches
+        self._regex = (
+            re.compile("".join(f"(?:(?=({translate_glob(self.patterns[index])})\\Z)|)" for index in unbucketed))
+            if unbucketed
+            else None
+        )
+
+    def __bool__(self):
+        return bool(self.patterns)
+
+    def match(self, path: str) -> List[int]:
+        """
+        Return the indexes of the patterns matching the path, in ascending order.
+        """
+        indexes = []
+        for length, buckets in self._buckets.items():
+            for index, regex in buckets.get(path[-length:], ()):
+                if regex.match(path):
+                    indexes.append(index)
+        if self._regex is not None:
+            groups = self._regex.match(path).groups()
+            indexes.extend(index for index, group in zip(self._unbucketed, groups) if group is not None)
+        return sorted(indexes)
+
+
+class PathMatcher:
+    """
+    Gitignore-style patterns compiled into a set of exact paths, a prefix trie of whole directories, and a single
+    regular expression for the remaining glob patterns.
+
+    A pattern without wildcards matches exactly that path. A pattern ending with `/` or `/**` matches everything in that
+    directory. A glob pattern without `/` matches the basename at any depth, any other one the whole path.
+    Checking a path costs the same, no matter how many patterns there are.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.paths = set()
+        self._trie: dict = {}
+        globs = []
+        for pattern in patterns:
+            relative = pattern.lstrip("/")
+            if relative.endswith("/**"):
+                directory = relative[:-3]
+            elif relative.endswith("/"):
+                directory = relative[:-1]
+            else:
+                directory = None
+            if directory is not None and not RE_GLOB_CHARS.search(directory):
+                self._add_directory(directory)
+            elif directory is None and not RE_GLOB_CHARS.search(relative):
+                self.paths.add(relative)
+            else:
+                glob = relative if "/" in relative.rstrip("/") else f"**/{relative}"
+                globs.append(translate_glob(f"{glob}**" if glob.endswith("/") else glob))
+        self._regex = re.compile(f"(?:{'|'.join(globs)})\\Z") if globs else None
+
+    def _add_directory(self, directory: str) -> None:
+        node = self._trie
+        for part in directory.split("/"):
+            node = node.setdefault(part, {})
+        # None marks the end of a directory to be matched as a whole
+        node[None] = True
+
+    @property
+    def directories(self) -> List[str]:
+        """
+        The directories matched as a whole, without those nested in another one.
+        """
+        directories = []
+        nodes = [("", self._trie)]
+        while nodes:
+            prefix, node = nodes.pop()
+            for part, child in node.items():
+                if part is None:
+                    continue
+                path = f"{prefix}{part}"
+                if None in child:
+                    directories.append(path)
+                else:
+                    nodes.append((f"{path}/", child))
+        return sorted(directories)
+
+    def match(self, path: str) -> bool:
+        if path in self.paths:
+            return True
+        node = self._trie
+        for part in path.split("/")[:-1]:
+            node = node.get(part)
+            if node is None:
+                break
+            if None in node:
+                return True
+        return self._regex is not None and self._regex.match(path) is not None
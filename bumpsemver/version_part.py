@@ -1,16 +1,38 @@
 import logging
 import re
 import string
-from typing import Dict, List, Optional
+from functools import lru_cache, total_ordering
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional, Tuple
 
 from bumpsemver.exceptions import (
     CannotParseVersionError,
 )
-from bumpsemver.functions import NumericFunction
-from bumpsemver.utils import key_value_string
+from bumpsemver.functions import NumericFunction, PrereleaseFunction
+from bumpsemver.utils import Template, key_value_string
 
 logger = logging.getLogger(__name__)
 
+# the regular expression suggested by the SemVer 2.0 specification, limited to ASCII digits
+RE_SEMVER = re.compile(
+    r"""
+    (?P<major>0|[1-9][0-9]*)\.(?P<minor>0|[1-9][0-9]*)\.(?P<patch>0|[1-9][0-9]*)
+    (?:-(?P<prerelease>
+        (?:0|[1-9][0-9]*|[0-9]*[a-zA-Z-][0-9a-zA-Z-]*)
+        (?:\.(?:0|[1-9][0-9]*|[0-9]*[a-zA-Z-][0-9a-zA-Z-]*))*
+    ))?
+    (?:\+(?P<build>[0-9a-zA-Z-]+(?:\.[0-9a-zA-Z-]+)*))?
+    """,
+    re.VERBOSE,
+)
+
+# the version configs kept by VersionConfig.interned(), far more than the distinct templates of a config file
+MAX_INTERNED_VERSION_CONFIGS = 256
+
+# the parts every version has, and the parts it does not need to have, which are left out of its labels if it has not
+PLAIN_LABELS = ("major", "minor", "patch")
+OPTIONAL_PARTS = ("prerelease", "build")
+
 
 class NumericVersionPartConfiguration:
     function_cls = NumericFunction
@@ -26,79 +48,244 @@ class NumericVersionPartConfiguration:
         return self.function.bump(value)
 
 
+class PrereleaseVersionPartConfiguration(NumericVersionPartConfiguration):
+    function_cls = PrereleaseFunction
+
+
+# the parts parsed from a version string share one configuration per kind of part, as it holds no state
+DEFAULT_PART_CONFIGURATION = NumericVersionPartConfiguration()
+PRERELEASE_PART_CONFIGURATION = PrereleaseVersionPartConfiguration()
+
+
 class VersionPart:
     """
     This class represents part of a version number. It contains a self.config
     object that rules how the part behaves when increased or reset.
+
+    A version part is immutable and hashable. A numeric value is also kept as an int, which is how it is compared.
     """
 
-    def __init__(self, value: str, config=None):
-        self._value = value
+    __slots__ = ("_value", "_number", "_config")
 
+    def __init__(self, value: str, config=None):
         if config is None:
-            config = NumericVersionPartConfiguration()
+            config = DEFAULT_PART_CONFIGURATION
 
-        self.config = config
+        self._value = value
+        self._number = int(value) if isinstance(value, str) and value.isdecimal() else None
+        self._config = config
 
     @property
-    def value(self):
+    def value(self) -> str:
         return self._value
 
+    @property
+    def config(self):
+        return self._config
+
+    @property
+    def sort_key(self) -> Tuple[int, int, str]:
+        """
+        Numeric values sort by their number, before the alphanumeric values, which sort lexicographically.
+        """
+        if self._number is not None:
+            return 0, self._number, ""
+        return 1, 0, self._value
+
     def copy(self):
-        return VersionPart(self._value)
+        return VersionPart(self._value, self._config)
 
     def bump(self):
-        return VersionPart(self.config.bump(self.value), self.config)
+        return VersionPart(self._config.bump(self._value), self._config)
 
     def __format__(self, format_spec):
-        return self.value
+        return self._value
+
+    def __str__(self):
+        return self._value
 
     def __repr__(self):
-        return f"<bumpsemver.VersionPart:{self.config.__class__.__name__}:{self.value}>"
+        return f"<bumpsemver.VersionPart:{self.config.__class__.__name__}:{self._value}>"
 
     def __eq__(self, other):
-        return self.value == other.value
+        if not isinstance(other, VersionPart):
+            return NotImplemented
+        # compared as the versions holding them are, e.g. 01 equals 1
+        return self.sort_key == other.sort_key
+
+    def __hash__(self):
+        return hash(self.sort_key)
 
     def null(self):
-        return VersionPart(self.config.first_value, self.config)
+        return VersionPart(self._config.first_value, self._config)
+
+
+def _prerelease_key(prerelease: str) -> Tuple[Tuple[int, int, str], ...]:
+    """
+    Numeric identifiers sort by their number, before the alphanumeric identifiers, which sort lexicographically.
+    """
+    return tuple((0, int(item), "") if item.isdigit() else (1, 0, item) for item in prerelease.split("."))
 
 
+@total_ordering
 class Version:
+    """
+    An immutable version, holding its part labels and parts in two tuples.
+
+    Versions with the same labels, apart from the optional prerelease and build, compare by the SemVer 2.0
+    precedence: part by part, in the order of the labels, then a prerelease before the release, while the build
+    metadata is ignored. They hash accordingly. The string form is computed once.
+    """
+
+    __slots__ = ("_labels", "_parts", "_original", "_values", "_string", "_key")
+
     def __init__(self, values: Dict[str, VersionPart], original=None):
-        self.values = dict(values)
-        self.original = original
+        self._labels = tuple(values)
+        self._parts = tuple(values.values())
+        self._original = original
+        self._values = None
+        self._string = None
+        self._key = None
+
+    @classmethod
+    def _from_parts(
+        cls, labels: Tuple[str, ...], parts: Tuple[VersionPart, ...], original: Optional[str] = None
+    ) -> "Version":
+        """
+        Create a version without copying its parts. An original string is given only if it is the string form.
+        """
+        version = cls.__new__(cls)
+        version._labels = labels
+        version._parts = parts
+        version._original = original
+        version._values = None
+        version._string = original
+        version._key = None
+        return version
+
+    @property
+    def original(self) -> Optional[str]:
+        return self._original
+
+    @property
+    def values(self) -> Mapping[str, VersionPart]:
+        if self._values is None:
+            self._values = MappingProxyType(dict(zip(self._labels, self._parts)))
+        return self._values
 
     def __getitem__(self, key):
         return self.values[key]
 
     def __len__(self):
-        return len(self.values)
+        return len(self._parts)
 
     def __iter__(self):
-        return iter(self.values)
+        return iter(self._labels)
+
+    def __contains__(self, label):
+        return label in self._labels
+
+    def __str__(self):
+        if self._string is None:
+            values = self.values
+            core = ".".join(part.value for label, part in zip(self._labels, self._parts) if label not in OPTIONAL_PARTS)
+            prerelease = f"-{values['prerelease'].value}" if "prerelease" in values else ""
+            build = f"+{values['build'].value}" if "build" in values else ""
+            self._string = f"{core}{prerelease}{build}"
+        return self._string
 
     def __repr__(self):
         return f"<bumpsemver.Version:{key_value_string(self.values)}>"
 
-    def bump(self, part_name: str, order: List[str]):
+    def _sort_key(self) -> tuple:
+        if self._key is None:
+            labels = []
+            key = []
+            prerelease_key: tuple = (1,)
+            for label, part in zip(self._labels, self._parts):
+                if label == "prerelease":
+                    prerelease_key = (0, _prerelease_key(part.value))
+                elif label != "build":
+                    labels.append(label)
+                    key.append(part.sort_key)
+            self._key = (tuple(labels), (*key, prerelease_key))
+        return self._key
+
+    def __eq__(self, other):
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self._sort_key() == other._sort_key()
+
+    def __lt__(self, other):
+        if not isinstance(other, Version) or self._sort_key()[0] != other._sort_key()[0]:
+            return NotImplemented
+        return self._sort_key()[1] < other._sort_key()[1]
+
+    def __hash__(self):
+        return hash(self._sort_key())
+
+    def bump(self, part_name: str, order: Iterable[str]):
+        """
+        Bump a part and reset the parts after it, dropping the prerelease and build.
+
+        Bumping a part of a prerelease whose following parts are reset already releases it instead, e.g. a patch
+        bump of 1.3.0-rc.2 gives 1.3.0, as does a minor bump. Bumping the prerelease of a release starts the
+        prerelease of the next patch, e.g. 1.2.3 gives 1.2.4-rc.1.
+        """
+        order = list(order)
+        values = self.values
+
+        if part_name == "prerelease" and "prerelease" not in values and "patch" in values:
+            patched = self.bump("patch", order)
+            part = VersionPart(PRERELEASE_PART_CONFIGURATION.first_value, PRERELEASE_PART_CONFIGURATION)
+            return Version._from_parts((*patched._labels, "prerelease"), (*patched._parts, part))
+
+        release = False
+        if "prerelease" in values and part_name in values and part_name != "prerelease":
+            later = order[order.index(part_name) + 1 :] if part_name in order else []
+            release = all(
+                values[label].value == values[label].config.first_value
+                for label in later
+                if label in values and label not in OPTIONAL_PARTS
+            )
+
         bumped = False
 
-        new_values = {}
+        labels = []
+        parts = []
 
         for label in order:
-            if label not in self.values:
+            part = values.get(label)
+            if part is None or (label in OPTIONAL_PARTS and label != part_name):
                 continue
             if label == part_name:
-                new_values[label] = self.values[label].bump()
+                if not release:
+                    part = part.bump()
                 bumped = True
             elif bumped:
-                new_values[label] = self.values[label].null()
-            else:
-                new_values[label] = self.values[label].copy()
+                part = part.null()
+            # otherwise the part is immutable, so it is shared with the new version
+            labels.append(label)
+            parts.append(part)
+
+        return Version._from_parts(tuple(labels), tuple(parts))
 
-        new_version = Version(new_values)
 
-        return new_version
+def split_plain_version(version_string: str) -> Optional[Tuple[str, str, str]]:
+    """
+    Split a SemVer version without prerelease and build metadata into its major, minor and patch, or return None.
+    """
+    parts = version_string.split(".")
+    if len(parts) != 3 or not version_string.isascii():
+        return None
+    major, minor, patch = parts
+    # SemVer only allows digits, and no leading zeros
+    if not (major.isdigit() and minor.isdigit() and patch.isdigit()):
+        return None
+    for part in parts:
+        if part[0] == "0" and len(part) > 1:
+            return None
+    return major, minor, patch
 
 
 def labels_for_format(serialize_format):
@@ -108,69 +295,109 @@ def labels_for_format(serialize_format):
 class VersionConfig:
     """
     Holds a complete representation of a version string.
+
+    Versions are SemVer 2.0 versions, with an optional prerelease and build metadata. The format is the same for every
+    section, so its regex and serialization template are compiled once for the class. Use `VersionConfig.interned()`
+    to share one instance between the sections with the same search and replace templates, which are compiled once
+    per instance.
     """
 
+    parse_regex = RE_SEMVER
+    serialize_format = "{major}.{minor}.{patch}"
+    _serialize_template = Template(serialize_format)
+    # currently, order depends on the first given serialization format this seems like enough
+    # because this should be the most complete format
+    _order = (*labels_for_format(serialize_format), "prerelease")
+
     def __init__(
         self,
         search: str = None,
         replace: str = None,
     ):
-        self.parse_regex = re.compile(r"(?P<major>\d+)\.(?P<minor>\d+)\.(?P<patch>\d+)", re.VERBOSE)
-        self.serialize_format = "{major}.{minor}.{patch}"
-
         self.search = search
         self.replace = replace
+        self.search_template = Template(search) if search is not None else None
+        self.replace_template = Template(replace) if replace is not None else None
 
-    def order(self):
-        # currently, order depends on the first given serialization format this seems like enough
-        # because this should be the most complete format
-        return labels_for_format(self.serialize_format)
+    @classmethod
+    @lru_cache(maxsize=MAX_INTERNED_VERSION_CONFIGS)
+    def interned(cls, search: str = None, replace: str = None) -> "VersionConfig":
+        """
+        Return the shared version config for these parameters, which must therefore never be modified.
+
+        The least recently used configs are dropped beyond MAX_INTERNED_VERSION_CONFIGS, so that a long-lived process
+        bumping many repositories does not keep the configs of all of them.
+        """
+        return cls(search, replace)
+
+    def order(self) -> Tuple[str, ...]:
+        return self._order
 
     def parse(self, version_string: str = None) -> Optional[Version]:
         if not version_string:
             return None
 
-        regexp_one_line = "".join([line.split("#")[0].strip() for line in self.parse_regex.pattern.splitlines()])
-
-        logger.info(f"Parsing version '{version_string}' using regexp '{regexp_one_line}'")
+        logger.info("Parsing version '%s' as SemVer 2.0", version_string)
 
-        match = self.parse_regex.search(version_string)
+        version = self._parse_plain(version_string)
+        if version is None:
+            match = self.parse_regex.fullmatch(version_string)
+            if not match:
+                logger.warning("'%s' is not a valid SemVer 2.0 version", version_string)
+                return None
 
-        _parsed = {}
-        if not match:
-            logger.warning(
-                f"Evaluating 'parse' option: '{self.parse_regex.pattern}' "
-                f"does not parse current version '{version_string}'"
-            )
-            return None
+            labels = []
+            parts = []
+            for key, value in match.groupdict().items():
+                if value is not None:
+                    labels.append(key)
+                    parts.append(VersionPart(value, PRERELEASE_PART_CONFIGURATION if key == "prerelease" else None))
+            # a valid SemVer version string is the string form of its version
+            version = Version._from_parts(tuple(labels), tuple(parts), version_string)
 
-        for key, value in match.groupdict().items():
-            _parsed[key] = VersionPart(value, None)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Parsed the following values: %s", key_value_string(version.values))
 
-        version = Version(_parsed, version_string)
+        return version
 
-        logger.info(f"Parsed the following values: {key_value_string(version.values)}")
+    @staticmethod
+    def _parse_plain(version_string: str) -> Optional[Version]:
+        """
+        Parse a version without prerelease and build metadata, by far the most common one, without the regex.
 
-        return version
+        Return None if the version string is anything else.
+        """
+        parts = split_plain_version(version_string)
+        if parts is None:
+            return None
+        major, minor, patch = parts
+        return Version._from_parts(
+            PLAIN_LABELS, (VersionPart(major), VersionPart(minor), VersionPart(patch)), version_string
+        )
 
     # noinspection PyMethodMayBeStatic
-    def _serialize(self, version: Version, serialize_format: str) -> str:
+    def _serialize(self, version: Version) -> str:
         """
-        Attempts to serialize a version with the given serialization format.
+        Attempts to serialize a version with the serialization format, followed by its prerelease and build metadata.
         """
-        values: Dict[str, VersionPart] = {}
-        for key in version:
-            values[key] = version[key]
-
+        if version._labels[:3] == PLAIN_LABELS and all(label in OPTIONAL_PARTS for label in version._labels[3:]):
+            # the serialization format is the string form of the version, which is kept by the version
+            return str(version)
         # test whether all parts required in the format have values
-        serialized = serialize_format.format(**values)
-
+        serialized = self._serialize_template.render(version)
+        if "prerelease" in version:
+            serialized = f"{serialized}-{version['prerelease']}"
+        if "build" in version:
+            serialized = f"{serialized}+{version['build']}"
         return serialized
 
-    def serialize(self, version: Version) -> str:
+    def serialize(self, version: Optional[Version]) -> str:
+        if version is None:
+            # the version string did not parse
+            raise CannotParseVersionError()
         try:
-            serialized = self._serialize(version, self.serialize_format)
-            logger.debug(f"Serialized to '{serialized}'")
+            serialized = self._serialize(version)
+            logger.debug("Serialized to '%s'", serialized)
             return serialized
         except TypeError as exc:
             raise CannotParseVersionError() from exc
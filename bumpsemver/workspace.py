@@ -0,0 +1,257 @@
+"""
+Workspace mode, bumping independently versioned projects of a repository in one run, for `bumpsemver workspace`.
+
+Every config file of the repository is a project, whose paths are relative to the directory of its config file. The
+projects share one listing of the tracked files, one dirty check, one discovery pass and one commit, and each of them
+gets its own tag.
+"""
+
+import logging
+import posixpath
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+from bumpsemver import events, profiling
+from bumpsemver.api import (
+    DEFAULT_TAG_NAME,
+    ApplyResult,
+    BumpPlan,
+    CommitResult,
+    FileEdit,
+    LoadedConfig,
+    TagResult,
+    _commit_files,
+    _determine_vcs,
+    _plan_files,
+    _require_vcs,
+    _resolve_versions,
+    probe_vcs,
+    tag,
+    time_context,
+)
+from bumpsemver.config import _load_configuration, _update_config_file
+from bumpsemver.discovery import discover_unmanaged_files
+from bumpsemver.exceptions import InvalidArgumentsError
+from bumpsemver.files.base import write_file
+from bumpsemver.git import Git
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILE_NAME = ".bumpsemver.cfg"
+DEFAULT_WORKSPACE_MESSAGE = "build(repo): bumped versions\n\n{changes}"
+
+
+class Workspace:
+    """
+    The projects of a repository, by the directory of their config file, "." for the root of the repository.
+    """
+
+    def __init__(self, projects: Dict[str, LoadedConfig], tracked_files: List):
+        self.projects = projects
+        self.tracked_files = tracked_files
+
+    def __repr__(self):
+        return f"<bumpsemver.Workspace:{', '.join(self.projects)}>"
+
+
+def load_workspace(config_name: str = CONFIG_FILE_NAME) -> Workspace:
+    """
+    Load every config file named `config_name` tracked in the repository, from its root as the working directory.
+
+    The tracked files are listed once, to find the config files, to expand their glob sections and for discovery.
+    """
+    vcs_info = probe_vcs()
+    with profiling.phase("list_files"):
+        tracked_files = Git.list_tracked_files()
+    config_files = sorted(path for path, _ in tracked_files if posixpath.basename(path) == config_name)
+    if not config_files:
+        raise InvalidArgumentsError(f"No {config_name} is found in the workspace")
+
+    projects: Dict[str, LoadedConfig] = {}
+    with profiling.phase("config_load"):
+        for config_file in config_files:
+            directory = posixpath.dirname(config_file)
+            options: Dict = {}
+            _, files, discovery_config = _load_configuration(config_file, True, options, directory, tracked_files)
+            projects[directory or "."] = LoadedConfig(config_file, files, discovery_config, options, vcs_info)
+    return Workspace(projects, tracked_files)
+
+
+def project_tag_name(project: str, config: LoadedConfig) -> str:
+    """
+    Return the tag name template of a project, by default its directory followed by the default tag name.
+    """
+    if "tag_name" in config.options:
+        return config.options["tag_name"]
+    return DEFAULT_TAG_NAME if project == "." else f"{project}/{DEFAULT_TAG_NAME}"
+
+
+class WorkspacePlan:
+    """
+    The bump plans of the selected projects of a workspace, by their directory, checked with a single Git session.
+
+    `edits` are the edits of all the files in the order they are rendered, a file edited several times has each of
+    them rendered on top of the previous one. `dependency_edits` are the dependency ranges updated by a propagation,
+    and `skipped_dependencies` the dependencies on a bumped package left alone because their value is not a range.
+    """
+
+    def __init__(
+        self,
+        workspace: Workspace,
+        plans: Dict[str, BumpPlan],
+        vcs: Optional[Type[Git]],
+        dependency_edits: Optional[List[Any]] = None,
+        edits: Optional[List[FileEdit]] = None,
+        skipped_dependencies: Optional[List[Any]] = None,
+    ):
+        self.workspace = workspace
+        self.plans = plans
+        self.vcs = vcs
+        self.dependency_edits = dependency_edits or []
+        self.skipped_dependencies = skipped_dependencies or []
+        self.edits = edits if edits is not None else [edit for bump_plan in plans.values() for edit in bump_plan.edits]
+
+    @property
+    def changes(self) -> str:
+        return "\n".join(
+            f"- {project}: {bump_plan.current_version} → {bump_plan.new_version}"
+            for project, bump_plan in self.plans.items()
+        )
+
+    def __repr__(self):
+        return f"<bumpsemver.WorkspacePlan:{', '.join(self.plans)}>"
+
+
+def _select_projects(workspace: Workspace, projects: Optional[Sequence[str]]) -> List[str]:
+    selected = list(workspace.projects) if not projects else [posixpath.normpath(project) for project in projects]
+    unknown = [project for project in selected if project not in workspace.projects]
+    if unknown:
+        raise InvalidArgumentsError(f"Unknown projects {unknown}, the projects are {list(workspace.projects)}")
+    return selected
+
+
+def _check_workspace(workspace: Workspace, allow_dirty: bool) -> Optional[Type[Git]]:
+    """
+    Check the working tree once, and run discovery once over the whole repository.
+    """
+    with profiling.phase("git_probe"):
+        vcs = _determine_vcs(allow_dirty)
+
+    with profiling.phase("discovery"):
+        configs = list(workspace.projects.values())
+        discover_unmanaged_files(
+            [file.filename for config in configs for file in config.files],
+            [pattern for config in configs for pattern in config.discovery_config.ignore],
+            None,
+            workspace.tracked_files,
+        )
+    return vcs
+
+
+def _check_tag_names(plans: Dict[str, BumpPlan]) -> None:
+    tag_names: Dict[str, str] = {}
+    for project, bump_plan in plans.items():
+        tag_name = project_tag_name(project, bump_plan.config).format(**bump_plan.release_context)
+        if tag_name in tag_names:
+            raise InvalidArgumentsError(
+                f"Projects '{tag_names[tag_name]}' and '{project}' would both be tagged '{tag_name}', "
+                "set their tag_name to tell them apart"
+            )
+        tag_names[tag_name] = project
+
+
+def plan_workspace(
+    workspace: Workspace,
+    part: Optional[str] = None,
+    new_version: Optional[str] = None,
+    projects: Optional[Sequence[str]] = None,
+    allow_dirty: bool = False,
+) -> WorkspacePlan:
+    """
+    Check the bump of the selected projects, all of them by default, and render the edits of their files.
+
+    Discovery runs once over the whole repository, any file managed by any project counts as managed. A file managed by
+    several projects gets the edits of all of them, in the order of the projects.
+    """
+    selected = _select_projects(workspace, projects)
+    vcs = _check_workspace(workspace, allow_dirty)
+
+    context = time_context()
+    pending: Dict[str, str] = {}
+    plans: Dict[str, BumpPlan] = {}
+    for project in selected:
+        config = workspace.projects[project]
+        versions = _resolve_versions(config, part, new_version, None)
+        plans[project] = _plan_files(config, *versions, {**context, **config.vcs_info}, vcs, pending)
+
+    _check_tag_names(plans)
+    return WorkspacePlan(workspace, plans, vcs)
+
+
+def apply_workspace(workspace_plan: WorkspacePlan, dry_run: bool = False) -> List[ApplyResult]:
+    """
+    Write every edited file once, with the content of its last edit, then the new versions to the config files.
+    """
+    first: Dict[str, FileEdit] = {}
+    last: Dict[str, FileEdit] = {}
+    for edit in workspace_plan.edits:
+        first.setdefault(edit.filename, edit)
+        last[edit.filename] = edit
+    with profiling.phase("replace"):
+        for filename, edit in first.items():
+            with profiling.phase(f"replace {edit.file_type}:{filename}", "file"):
+                write_file(filename, edit.file_type, edit.before, last[filename].after, dry_run, logger)
+
+    results = []
+    with profiling.phase("config_rewrite"):
+        for bump_plan in workspace_plan.plans.values():
+            config_file = bump_plan.config.config_file
+            _update_config_file(config_file, bump_plan.new_version, dry_run)
+            events.emit("config_updated", config_file=config_file, dry_run=dry_run)
+            results.append(
+                ApplyResult([edit.filename for edit in bump_plan.edits if edit.changed], config_file, dry_run)
+            )
+    return results
+
+
+def commit_workspace(
+    workspace_plan: WorkspacePlan, message: Optional[str] = None, dry_run: bool = False
+) -> CommitResult:
+    """
+    Commit the files and the config files of all the bumped projects at once, with the manifests whose dependencies
+    are updated.
+
+    The message template has the placeholders {changes}, the list of the bumped projects with their versions, and the
+    time placeholders. If a single project is bumped, the placeholders of its versions are available as well.
+    """
+    vcs = _require_vcs(workspace_plan.vcs)
+    plans = list(workspace_plan.plans.values())
+    if len(plans) == 1:
+        context: Dict[str, Any] = plans[0].release_context
+    else:
+        context = {"now": plans[0].context["now"], "utcnow": plans[0].context["utcnow"]}
+    context["changes"] = workspace_plan.changes
+    commit_files = []
+    paths = [
+        path
+        for bump_plan in plans
+        for path in [*(file.filename for file in bump_plan.config.files), bump_plan.config.config_file]
+    ]
+    paths.extend(dependency_edit.filename for dependency_edit in workspace_plan.dependency_edits)
+    for path in paths:
+        # a file managed by several projects, or with updated dependencies, is only added once
+        if path not in commit_files:
+            commit_files.append(path)
+    return _commit_files(vcs, commit_files, (message or DEFAULT_WORKSPACE_MESSAGE).format(**context), context, dry_run)
+
+
+def tag_workspace(
+    workspace_plan: WorkspacePlan, projects: Optional[Sequence[str]] = None, dry_run: bool = False
+) -> List[TagResult]:
+    """
+    Tag the new version of the bumped projects, or only of the given ones, each of them with its own tag templates.
+    """
+    return [
+        tag(bump_plan, project_tag_name(project, bump_plan.config), dry_run=dry_run)
+        for project, bump_plan in workspace_plan.plans.items()
+        if projects is None or project in projects
+    ]
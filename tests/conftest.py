@@ -0,0 +1,66 @@
+import json
+import subprocess
+
+import pytest
+
+
+def _write_package(path, version, options=None, **dependencies):
+    content = {"name": path.dirpath().basename, "version": version}
+    if dependencies:
+        content["dependencies"] = dependencies
+    path.write(json.dumps(content, indent=2) + "\n", ensure=True)
+    if options is not None:
+        path.dirpath().join(".bumpsemver.cfg").write(
+            f"[bumpsemver]\ncurrent_version = {version}\n{options}\n"
+            "[bumpsemver:json:package.json]\njsonpath = version\n"
+        )
+
+
+def _run_git(*args, cwd=None) -> str:
+    return subprocess.check_output(["git", *args], cwd=cwd).decode().strip()
+
+
+@pytest.fixture
+def git():
+    """
+    Run a git command, in the current directory unless cwd is given, and return its stripped output.
+    """
+    return _run_git
+
+
+@pytest.fixture
+def git_repo():
+    """
+    Write the given files into a directory and commit them as the initial commit of a new git repository.
+    """
+
+    def init(path, files=None):
+        path.ensure(dir=True)
+        for name, content in (files or {}).items():
+            path.join(name).write(content, ensure=True)
+        _run_git("init", cwd=path)
+        _run_git("add", ".", cwd=path)
+        _run_git("commit", "-m", "initial commit", cwd=path)
+        return path
+
+    return init
+
+
+@pytest.fixture
+def write_package():
+    """
+    Write the package.json of an npm package named after its directory, with the given version and dependencies. With
+    `options`, write a config file of the package too, with the options, managing the version in package.json.
+    """
+    return _write_package
+
+
+@pytest.fixture
+def workspace_repo(tmpdir, git_repo, workspace_layout):
+    """
+    The workspace written by the `workspace_layout` fixture of the test module, committed as a new git repository, and
+    the current directory of the test.
+    """
+    git_repo(tmpdir)
+    tmpdir.chdir()
+    return tmpdir
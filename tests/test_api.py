@@ -0,0 +1,189 @@
+import json
+import logging
+import subprocess
+
+import pytest
+
+from bumpsemver.api import (
+    FileEdit,
+    apply,
+    bump_version,
+    bump_versions,
+    commit,
+    exit_code,
+    load_config,
+    plan,
+    plan_file_edits,
+    tag,
+)
+from bumpsemver.exceptions import (
+    CannotParseVersionError,
+    DiscoveryError,
+    InvalidArgumentsError,
+    VersionNotFoundError,
+    WorkingDirectoryIsDirtyError,
+)
+from bumpsemver.files.json import ConfiguredJSONFile
+from bumpsemver.files.text import ConfiguredPlainTextFile
+from bumpsemver.version_part import VersionConfig
+
+VERSIONS = ["0.0.0", "1.2.3", "10.20.30", "1.2.4-rc.1", "1.3.0-beta.2+build.7", "2.0.0-rc.1", "1.2.3+build.5"]
+
+
+@pytest.mark.parametrize("part", ["major", "minor", "patch", "prerelease"])
+def test_bump_versions_as_version_bump(part):
+    vc = VersionConfig()
+    expected = [vc.serialize(vc.parse(version).bump(part, vc.order())) for version in VERSIONS]
+    assert bump_versions(VERSIONS, part) == expected
+
+
+def test_bump_versions_by_part():
+    assert bump_versions(["1.2.3", "1.2.3", "1.2.4-rc.1"], ["minor", "prerelease", "patch"]) == [
+        "1.3.0",
+        "1.2.4-rc.1",
+        "1.2.4",
+    ]
+    assert bump_version("1.2.3", "major") == "2.0.0"
+    assert bump_versions([], "patch") == []
+
+
+def test_bump_versions_invalid_arguments():
+    with pytest.raises(InvalidArgumentsError):
+        bump_versions(["1.2.3", "1.2.4"], ["patch"])
+    with pytest.raises(InvalidArgumentsError) as exc:
+        bump_versions(["1.2.3"], "build")
+    assert exc.value.message == "Unknown parts ['build'], the valid parts are ['major', 'minor', 'patch', 'prerelease']"
+    with pytest.raises(CannotParseVersionError) as exc:
+        bump_versions(["1.2.3", "v1.2.3"], "patch")
+    assert exc.value.message == "The version 'v1.2.3' could not be parsed with semver scheme"
+
+
+def test_plan_file_edits(tmpdir):
+    tmpdir.chdir()
+    tmpdir.join("VERSION").write("Version: 1.2.3\nDepends: 1.2.3\n")
+    tmpdir.join("package.json").write(json.dumps({"name": "a", "version": "1.2.3"}, indent=2) + "\n")
+    files = [
+        ConfiguredPlainTextFile("VERSION", VersionConfig("Version: {current_version}", "Version: {new_version}")),
+        ConfiguredJSONFile("package.json", VersionConfig(), jsonpath="version"),
+    ]
+
+    edits = plan_file_edits(files, "1.2.3", "1.3.0-rc.1")
+
+    assert [(edit.filename, edit.file_type, edit.changed) for edit in edits] == [
+        ("VERSION", "plaintext", True),
+        ("package.json", "json", True),
+    ]
+    assert edits[0].after == "Version: 1.3.0-rc.1\nDepends: 1.2.3\n"
+    assert json.loads(edits[1].after) == {"name": "a", "version": "1.3.0-rc.1"}
+    assert edits[0].diff().splitlines()[2:] == [
+        "@@ -1,2 +1,2 @@",
+        "-Version: 1.2.3",
+        "+Version: 1.3.0-rc.1",
+        " Depends: 1.2.3",
+    ]
+    # the files are left untouched
+    assert tmpdir.join("VERSION").read() == "Version: 1.2.3\nDepends: 1.2.3\n"
+    assert '"version": "1.2.3"' in tmpdir.join("package.json").read()
+
+    with pytest.raises(CannotParseVersionError):
+        plan_file_edits(files, "1.2", "1.3.0")
+
+
+def test_file_edit_unchanged():
+    edit = FileEdit("VERSION", "plaintext", "1.2.3", "1.2.3")
+    assert not edit.changed
+    assert edit.diff() == ""
+    assert repr(edit) == "<bumpsemver.FileEdit:VERSION:unchanged>"
+
+
+REPO_FILES = {
+    "VERSION": "1.2.3\n",
+    ".bumpsemver.cfg": "[bumpsemver]\ncurrent_version = 1.2.3\n\n[bumpsemver:plaintext:VERSION]\n",
+}
+
+
+def test_bump_in_process_repeatedly(tmpdir, git, git_repo):
+    git_repo(tmpdir, REPO_FILES)
+    tmpdir.chdir()
+    root_handlers = list(logging.getLogger().handlers)
+
+    for current_version, new_version in [("1.2.3", "1.2.4"), ("1.2.4", "1.2.5")]:
+        config = load_config()
+        assert config.current_version == current_version
+        bump_plan = plan(config, "patch")
+        assert (bump_plan.current_version, bump_plan.new_version) == (current_version, new_version)
+        assert [edit.after for edit in bump_plan.edits] == [f"{new_version}\n"]
+        assert tmpdir.join("VERSION").read() == f"{current_version}\n"
+
+        result = apply(bump_plan)
+        assert result.changed_files == ["VERSION"]
+        assert tmpdir.join("VERSION").read() == f"{new_version}\n"
+
+        commit_result = commit(bump_plan)
+        assert commit_result.committed
+        assert commit_result.files == ["VERSION", ".bumpsemver.cfg"]
+        assert commit_result.sha == git("rev-parse", "HEAD")
+        tag_result = tag(bump_plan)
+        assert (tag_result.name, tag_result.tagged) == (f"v{new_version}", True)
+
+    assert git("tag").split() == ["v1.2.4", "v1.2.5"]
+    assert "current_version = 1.2.5" in tmpdir.join(".bumpsemver.cfg").read()
+    # the logging of the embedding process is left alone
+    assert logging.getLogger().handlers == root_handlers
+
+
+def test_plan_new_version_and_dry_run(tmpdir, git, git_repo):
+    git_repo(tmpdir, REPO_FILES)
+    tmpdir.chdir()
+    config = load_config(".bumpsemver.cfg")
+
+    bump_plan = plan(config, new_version="2.0.0-rc.1")
+    assert bump_plan.release_context["new_major"] == "2"
+    assert apply(bump_plan, dry_run=True).dry_run
+    assert not commit(bump_plan, "release {new_version}", dry_run=True).committed
+    tag_result = tag(bump_plan, "release-{new_version}", dry_run=True)
+    assert (tag_result.name, tag_result.tagged) == ("release-2.0.0-rc.1", False)
+    assert tmpdir.join("VERSION").read() == "1.2.3\n"
+    assert git("tag") == ""
+
+
+def test_api_errors(tmpdir, git_repo):
+    tmpdir.chdir()
+    with pytest.raises(InvalidArgumentsError) as exc:
+        load_config()
+    assert exc.value.message == "No valid config file is specified and the default .bumpsemver.cfg is not found"
+    with pytest.raises(InvalidArgumentsError) as exc:
+        load_config("other.cfg")
+    assert exc.value.message == "Could not read config file at other.cfg"
+
+    git_repo(tmpdir, REPO_FILES)
+    tmpdir.chdir()
+    config = load_config()
+    with pytest.raises(InvalidArgumentsError):
+        plan(config)
+    with pytest.raises(InvalidArgumentsError):
+        plan(config, "patch", "1.2.4")
+    with pytest.raises(CannotParseVersionError):
+        plan(config, new_version="v1.2.4")
+
+    tmpdir.join("VERSION").write("1.2.4\n")
+    with pytest.raises(WorkingDirectoryIsDirtyError):
+        plan(config, "patch")
+    with pytest.raises(VersionNotFoundError):
+        plan(config, "patch", allow_dirty=True)
+
+    tmpdir.join("VERSION").write("1.2.3\nchanged\n")
+    bump_plan = plan(config, "minor", allow_dirty=True)
+    assert bump_plan.vcs is None
+    with pytest.raises(InvalidArgumentsError):
+        commit(bump_plan)
+
+
+def test_exit_code():
+    assert exit_code(InvalidArgumentsError("bad")) == 1
+    assert exit_code(FileNotFoundError()) == 2
+    assert exit_code(VersionNotFoundError("1.0.0", "VERSION")) == 4
+    assert exit_code(WorkingDirectoryIsDirtyError([b"M VERSION"])) == 5
+    assert exit_code(subprocess.CalledProcessError(1, ["git"])) == 10
+    assert exit_code(DiscoveryError(["File Chart.yaml is not managed"])) == 32
+    assert exit_code(RuntimeError()) == 128
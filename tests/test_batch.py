@@ -0,0 +1,110 @@
+import json
+import os
+
+import pytest
+
+from bumpsemver.batch import ManifestEntry, bump_repository, parse_manifest, run_batch
+from bumpsemver.cli import main
+from bumpsemver.exceptions import InvalidArgumentsError
+
+
+def _repo_files(version="1.0.0", commit=True):
+    return {
+        "VERSION": version,
+        ".bumpsemver.cfg": f"[bumpsemver]\ncurrent_version = {version}\ncommit = {commit}\ntag = {commit}\n\n"
+        "[bumpsemver:plaintext:VERSION]\n",
+    }
+
+
+def test_parse_manifest(tmpdir):
+    entries = parse_manifest("# the train\n\nrepo-a patch\n  /abs/repo-b   2.0.0-rc.1\nrepo-c prerelease\n", "/base")
+
+    assert [(entry.path, entry.part, entry.new_version) for entry in entries] == [
+        ("/base/repo-a", "patch", None),
+        ("/abs/repo-b", None, "2.0.0-rc.1"),
+        ("/base/repo-c", "prerelease", None),
+    ]
+
+    with pytest.raises(InvalidArgumentsError) as exc:
+        parse_manifest("repo-a\n", "/base")
+    assert exc.value.message.startswith("Invalid manifest line 1: 'repo-a', expected a repository path")
+    with pytest.raises(InvalidArgumentsError) as exc:
+        parse_manifest("repo-a patch\n./repo-a minor\n", "/base")
+    assert exc.value.message == "Repository './repo-a' is listed on both line 1 and 2"
+
+
+def test_bump_repository(tmpdir, git, git_repo):
+    git_repo(tmpdir.join("repo"), _repo_files())
+    cwd = os.getcwd()
+
+    result = bump_repository(ManifestEntry(str(tmpdir.join("repo")), part="minor"))
+
+    assert os.getcwd() == cwd
+    assert result.exit_code == 0
+    assert (result.current_version, result.new_version, result.tag) == ("1.0.0", "1.1.0", "v1.1.0")
+    assert result.commit_sha == git("rev-parse", "HEAD", cwd=tmpdir.join("repo"))
+    assert {"discovery", "verify", "render", "replace", "commit", "tag"} <= set(result.phases)
+    assert tmpdir.join("repo", "VERSION").read() == "1.1.0"
+
+    result = bump_repository(ManifestEntry(str(tmpdir.join("missing")), part="minor"))
+    assert result.exit_code == 2
+    assert "No such file or directory" in result.error
+
+
+def test_run_batch(tmpdir, git, git_repo):
+    for name in ("repo-a", "repo-b", "repo-c"):
+        git_repo(tmpdir.join(name), _repo_files())
+    git_repo(tmpdir.join("repo-d"), _repo_files(commit=False))
+    tmpdir.join("repo-c", "VERSION").write("0.9.0")
+    entries = [
+        ManifestEntry(str(tmpdir.join("repo-a")), part="patch"),
+        ManifestEntry(str(tmpdir.join("repo-b")), new_version="2.0.0-rc.1"),
+        ManifestEntry(str(tmpdir.join("repo-c")), part="patch"),
+        ManifestEntry(str(tmpdir.join("repo-d")), part="major"),
+    ]
+
+    results = run_batch(entries, jobs=2)
+
+    assert [(result.exit_code, result.new_version, result.tag) for result in results] == [
+        (0, "1.0.1", "v1.0.1"),
+        (0, "2.0.0-rc.1", "v2.0.0-rc.1"),
+        (5, None, None),
+        (0, "2.0.0", None),
+    ]
+    assert "Git working directory is not clean" in results[2].error
+    assert tmpdir.join("repo-a", "VERSION").read() == "1.0.1"
+    assert tmpdir.join("repo-b", "VERSION").read() == "2.0.0-rc.1"
+    assert tmpdir.join("repo-c", "VERSION").read() == "0.9.0"
+    assert tmpdir.join("repo-d", "VERSION").read() == "2.0.0"
+    assert results[3].commit_sha is None
+    assert git("tag", cwd=tmpdir.join("repo-b")).split() == ["v2.0.0-rc.1"]
+
+
+def test_cli_batch(tmpdir, capsys, git_repo):
+    git_repo(tmpdir.join("repo-a"), _repo_files())
+    git_repo(tmpdir.join("repo-b"), _repo_files())
+    tmpdir.join("manifest.txt").write("repo-a minor\nrepo-b 1.0.1\n")
+    tmpdir.chdir()
+    capsys.readouterr()
+
+    with pytest.raises(SystemExit) as exc:
+        main(["batch", "manifest.txt", "--jobs", "2", "--dry-run"])
+    assert exc.value.code == 0
+
+    report = json.loads(capsys.readouterr().out)
+    assert report["failed"] == 0
+    assert [(result["path"], result["new_version"]) for result in report["results"]] == [
+        (str(tmpdir.join("repo-a")), "1.1.0"),
+        (str(tmpdir.join("repo-b")), "1.0.1"),
+    ]
+    assert tmpdir.join("repo-a", "VERSION").read() == "1.0.0"
+
+    tmpdir.join("manifest.txt").write("repo-a minor\nrepo-c patch\n")
+    with pytest.raises(SystemExit) as exc:
+        main(["batch", "manifest.txt", "--jobs", "1"])
+    assert exc.value.code == 2
+
+    report = json.loads(capsys.readouterr().out)
+    assert report["failed"] == 1
+    assert [result["exit_code"] for result in report["results"]] == [0, 2]
+    assert tmpdir.join("repo-a", "VERSION").read() == "1.1.0"
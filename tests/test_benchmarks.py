@@ -0,0 +1,66 @@
+import subprocess
+from pathlib import Path
+from textwrap import dedent
+
+from benchmarks.common import GIT_ENV
+from benchmarks.generator import MonorepoSpec, generate_monorepo
+from benchmarks.parsing import SHAPES, legacy_parse
+from benchmarks.parsing import run_benchmarks as run_parsing_benchmarks
+from benchmarks.scaling import PHASES, time_bump
+from benchmarks.startup import check_budgets, parse_importtime
+
+
+def test_parse_importtime():
+    output = dedent(
+        """
+        import time: self [us] | cumulative | imported package
+        import time:       186 |        186 |     yamlpath.wrappers
+        import time:      4587 |     123664 |   bumpsemver.config
+        import time:      7050 |     211705 | bumpsemver.cli
+        """
+    )
+    assert parse_importtime(output) == {
+        "yamlpath.wrappers": (186, 186),
+        "bumpsemver.config": (4587, 123664),
+        "bumpsemver.cli": (7050, 211705),
+    }
+
+
+def test_check_budgets():
+    results = [
+        {"benchmark": "import bumpsemver.cli", "size": None, "seconds": 0.1, "eager_lazy_modules": ["ruamel"]},
+        {"benchmark": "dry-run", "size": 1000, "seconds": 1.5},
+        {"benchmark": "commit", "size": 1000, "seconds": 7.0},
+    ]
+    assert check_budgets(results, 1.0) == [
+        "import bumpsemver.cli imports 'ruamel' eagerly",
+        "commit (1000 files) took 7.000s, over the budget of 6.000s",
+    ]
+    assert results[1]["budget"] == 2.0
+    assert check_budgets(results[2:], 2.0) == []
+
+
+def test_generate_monorepo(tmpdir, monkeypatch):
+    for name, value in GIT_ENV.items():
+        monkeypatch.setenv(name, value)
+    spec = MonorepoSpec(files=30, sections=8, yaml_ratio=0.5, lockfile_mb=0.01, tags=3)
+    repo = generate_monorepo(Path(tmpdir) / "repo", spec)
+
+    tracked = subprocess.check_output(["git", "ls-files"], cwd=repo).decode().split()
+    # the filler files, the managed packages, the lockfile, the changelog, the readme and the config file
+    assert len(tracked) == 30 + 4
+    assert subprocess.check_output(["git", "tag"], cwd=repo).decode().split() == ["v1.0.0", "v1.1.0", "v1.2.0"]
+
+    result = time_bump(repo, dry_run=False)
+    assert list(result["phases"]) == list(PHASES)
+    assert "current_version = 1.2.1" in (repo / ".bumpsemver.cfg").read_text()
+    assert '"version": "1.2.1"' in (repo / "package-lock.json").read_text()
+    assert "v1.2.1" in subprocess.check_output(["git", "tag"], cwd=repo).decode().split()
+
+
+def test_parsing_benchmarks():
+    results = run_parsing_benchmarks(count=20, repeat=1)
+    assert [result["shape"] for result in results] == list(SHAPES)
+    assert all(result["legacy_us"] > 0 and result["semver_us"] > 0 for result in results)
+    # the former regex dropped the prerelease and build metadata
+    assert str(legacy_parse("1.2.3-rc.1+build.5")) == "1.2.3"
@@ -1,6 +1,7 @@
 import logging
 import os
 import subprocess
+import sys
 from configparser import RawConfigParser
 from functools import partial
 from shlex import split as shlex_split
@@ -49,6 +50,10 @@ EXPECTED_OPTIONS = """
 [--verbose]
 [--allow-dirty]
 [-v]
+[--output FORMAT]
+[--profile]
+[--profile-format FORMAT]
+[--profile-dump FILE]
 [--current-version VERSION]
 [--dry-run]
 --new-version VERSION
@@ -58,7 +63,7 @@ EXPECTED_OPTIONS = """
 [--tag-name TAG_NAME]
 [--tag-message TAG_MESSAGE]
 [--message COMMIT_MSG]
-{major,minor,patch}
+{major,minor,patch,prerelease}
 """.strip().splitlines()
 
 EXPECTED_USAGE = (
@@ -67,7 +72,8 @@ EXPECTED_USAGE = (
 %s
 
 positional arguments:
-  {major,minor,patch}   Part of the version to be bumped
+  {major,minor,patch,prerelease}
+                        Part of the version to be bumped
 
 options:
   -h, --help            show this help message and exit
@@ -78,6 +84,16 @@ options:
   --allow-dirty         Don't abort if working directory is dirty (default:
                         False)
   -v, --version         Print version and exit
+  --output FORMAT       Use json-lines to report the progress as typed events
+                        on stdout, the logs always go to stderr (default:
+                        text)
+  --profile             Print the time spent in each phase and file handler to
+                        stderr at exit (default: False)
+  --profile-format FORMAT
+                        Format of the profile report, table or json (default:
+                        table)
+  --profile-dump FILE   Profile the run with cProfile and dump the pstats into
+                        FILE, implies --profile (default: None)
   --current-version VERSION
                         Version that needs to be updated (default: None)
   --dry-run             Don't write any files, just pretend. (default: False)
@@ -275,37 +291,15 @@ def test_log_parse_doesnt_parse_current_version(tmpdir):
         main(["--verbose", "--current-version", "12", "--new-version", "13", "patch"])
 
     log_capture.check_present(
-        (
-            "bumpsemver.version_part",
-            "INFO",
-            "Parsing version '12' using regexp '(?P<major>\\d+)\\.(?P<minor>\\d+)\\.(?P<patch>\\d+)'",
-        ),
-        (
-            "bumpsemver.version_part",
-            "WARNING",
-            (
-                "Evaluating 'parse' option: '(?P<major>\\d+)\\.(?P<minor>\\d+)\\.(?P<patch>\\d+)' "
-                "does not parse current version '12'"
-            ),
-        ),
-        (
-            "bumpsemver.version_part",
-            "INFO",
-            "Parsing version '13' using regexp '(?P<major>\\d+)\\.(?P<minor>\\d+)\\.(?P<patch>\\d+)'",
-        ),
-        (
-            "bumpsemver.version_part",
-            "WARNING",
-            (
-                "Evaluating 'parse' option: '(?P<major>\\d+)\\.(?P<minor>\\d+)\\.(?P<patch>\\d+)' "
-                "does not parse current version '13'"
-            ),
-        ),
+        ("bumpsemver.version_part", "INFO", "Parsing version '12' as SemVer 2.0"),
+        ("bumpsemver.version_part", "WARNING", "'12' is not a valid SemVer 2.0 version"),
+        ("bumpsemver.version_part", "INFO", "Parsing version '13' as SemVer 2.0"),
+        ("bumpsemver.version_part", "WARNING", "'13' is not a valid SemVer 2.0 version"),
         ("bumpsemver.cli", "INFO", "New version will be '13'"),
         ("bumpsemver.git", "WARNING", "'git ls-files' failed. Listing files without respecting '.gitignore'"),
-        ("bumpsemver.cli", "INFO", "Asserting files  contain the version string..."),
+        ("bumpsemver.api", "INFO", "Asserting files  contain the version string..."),
         ("bumpsemver.config", "INFO", "Writing to config file .bumpsemver.cfg:"),
-        ("bumpsemver.config", "INFO", "[bumpsemver]\ncurrent_version = 13\n\n"),
+        ("bumpsemver.config", "INFO", "[bumpsemver]\ncurrent_version = 13\n"),
     )
     assert exc.value.code == 0
 
@@ -332,28 +326,20 @@ def test_complex_info_logging(tmpdir):
         ("bumpsemver.config", "INFO", "Reading config file .bumpsemver.cfg:"),
         ("bumpsemver.config", "INFO", "[bumpsemver]\ncurrent_version = 0.4.0\n\n[bumpsemver:file:fileE]"),
         ("bumpsemver.config", "WARNING", "File type 'file' is deprecated, please use 'plaintext' instead."),
-        (
-            "bumpsemver.version_part",
-            "INFO",
-            "Parsing version '0.4.0' using regexp '(?P<major>\\d+)\\.(?P<minor>\\d+)\\.(?P<patch>\\d+)'",
-        ),
+        ("bumpsemver.version_part", "INFO", "Parsing version '0.4.0' as SemVer 2.0"),
         ("bumpsemver.version_part", "INFO", "Parsed the following values: major=0, minor=4, patch=0"),
         ("bumpsemver.cli", "INFO", "Attempting to increment part 'patch'"),
         ("bumpsemver.cli", "INFO", "Values are now: major=0, minor=4, patch=1"),
-        (
-            "bumpsemver.version_part",
-            "INFO",
-            "Parsing version '0.4.1' using regexp '(?P<major>\\d+)\\.(?P<minor>\\d+)\\.(?P<patch>\\d+)'",
-        ),
+        ("bumpsemver.version_part", "INFO", "Parsing version '0.4.1' as SemVer 2.0"),
         ("bumpsemver.version_part", "INFO", "Parsed the following values: major=0, minor=4, patch=1"),
         ("bumpsemver.cli", "INFO", "New version will be '0.4.1'"),
         ("bumpsemver.git", "WARNING", "'git ls-files' failed. Listing files without respecting '.gitignore'"),
-        ("bumpsemver.cli", "INFO", "Asserting files fileE contain the version string..."),
+        ("bumpsemver.api", "INFO", "Asserting files fileE contain the version string..."),
         ("bumpsemver.files.text", "INFO", "Found '0.4.0' in fileE at line 0: 0.4.0"),
         ("bumpsemver.files.text", "INFO", "Changing plaintext file fileE:"),
         ("bumpsemver.files.text", "INFO", "--- a/fileE\n+++ b/fileE\n@@ -1 +1 @@\n-0.4.0\n+0.4.1"),
         ("bumpsemver.config", "INFO", "Writing to config file .bumpsemver.cfg:"),
-        ("bumpsemver.config", "INFO", "[bumpsemver]\ncurrent_version = 0.4.1\n\n[bumpsemver:file:fileE]\n\n"),
+        ("bumpsemver.config", "INFO", "[bumpsemver]\ncurrent_version = 0.4.1\n\n[bumpsemver:file:fileE]"),
     )
     assert exc.value.code == 0
 
@@ -378,28 +364,20 @@ def test_complex_info_logging_plaintext(tmpdir):
     log_capture.check(
         ("bumpsemver.config", "INFO", "Reading config file .bumpsemver.cfg:"),
         ("bumpsemver.config", "INFO", "[bumpsemver]\ncurrent_version = 0.4.0\n[bumpsemver:plaintext:fileM]"),
-        (
-            "bumpsemver.version_part",
-            "INFO",
-            "Parsing version '0.4.0' using regexp '(?P<major>\\d+)\\.(?P<minor>\\d+)\\.(?P<patch>\\d+)'",
-        ),
+        ("bumpsemver.version_part", "INFO", "Parsing version '0.4.0' as SemVer 2.0"),
         ("bumpsemver.version_part", "INFO", "Parsed the following values: major=0, minor=4, patch=0"),
         ("bumpsemver.cli", "INFO", "Attempting to increment part 'patch'"),
         ("bumpsemver.cli", "INFO", "Values are now: major=0, minor=4, patch=1"),
-        (
-            "bumpsemver.version_part",
-            "INFO",
-            "Parsing version '0.4.1' using regexp '(?P<major>\\d+)\\.(?P<minor>\\d+)\\.(?P<patch>\\d+)'",
-        ),
+        ("bumpsemver.version_part", "INFO", "Parsing version '0.4.1' as SemVer 2.0"),
         ("bumpsemver.version_part", "INFO", "Parsed the following values: major=0, minor=4, patch=1"),
         ("bumpsemver.cli", "INFO", "New version will be '0.4.1'"),
         ("bumpsemver.git", "WARNING", "'git ls-files' failed. Listing files without respecting '.gitignore'"),
-        ("bumpsemver.cli", "INFO", "Asserting files fileM contain the version string..."),
+        ("bumpsemver.api", "INFO", "Asserting files fileM contain the version string..."),
         ("bumpsemver.files.text", "INFO", "Found '0.4.0' in fileM at line 0: 0.4.0"),
         ("bumpsemver.files.text", "INFO", "Changing plaintext file fileM:"),
         ("bumpsemver.files.text", "INFO", "--- a/fileM\n+++ b/fileM\n@@ -1 +1 @@\n-0.4.0\n+0.4.1"),
         ("bumpsemver.config", "INFO", "Writing to config file .bumpsemver.cfg:"),
-        ("bumpsemver.config", "INFO", "[bumpsemver]\ncurrent_version = 0.4.1\n\n[bumpsemver:plaintext:fileM]\n\n"),
+        ("bumpsemver.config", "INFO", "[bumpsemver]\ncurrent_version = 0.4.1\n[bumpsemver:plaintext:fileM]"),
     )
     assert exc.value.code == 0
 
@@ -564,11 +542,9 @@ def test_config_file_explicit_precedence(tmpdir):
             """
         [bumpsemver]
         current_version = 0.10.35
-
         [bumpsemver:plaintext:file1]
         """
         ).strip()
-        + "\n"
     )
 
 
@@ -593,6 +569,19 @@ def test_config_file_default(tmpdir):
     assert exc.value.code == 0
 
 
+def test_prerelease_bumps_and_release(tmpdir):
+    tmpdir.join("VERSION").write("2.3.4")
+    tmpdir.join(".bumpsemver.cfg").write("[bumpsemver]\ncurrent_version = 2.3.4\n[bumpsemver:plaintext:VERSION]\n")
+    tmpdir.chdir()
+
+    for part, expected in [("prerelease", "2.3.5-rc.1"), ("prerelease", "2.3.5-rc.2"), ("patch", "2.3.5")]:
+        with pytest.raises(SystemExit) as exc:
+            main([part])
+        assert exc.value.code == 0
+        assert tmpdir.join("VERSION").read() == expected
+        assert f"current_version = {expected}\n" in tmpdir.join(".bumpsemver.cfg").read()
+
+
 def test_config_file_both_missing(tmpdir):
     tmpdir.chdir()
 
@@ -726,3 +715,90 @@ def test_section_config_unknown_arguments(tmpdir, invalid_section_args):
     )
     assert "131.10.2" == tmpdir.join("file132").read()
     assert exc.value.code == 4
+
+
+def test_glob_section(tmpdir):
+    tmpdir.chdir()
+    subprocess.check_call(["git", "init"])
+    packages = tmpdir.mkdir("packages")
+    for name in ["foo", "bar", "baz"]:
+        packages.mkdir(name)
+        tmpdir.join(f"packages/{name}/package.json").write('{\n  "name": "%s",\n  "version": "2.0.1"\n}\n' % name)
+    tmpdir.join("packages/foo/VERSION").write("2.0.1")
+    tmpdir.join(".bumpsemver.cfg").write(
+        dedent(
+            """
+            [bumpsemver]
+            current_version = 2.0.1
+            [bumpsemver:json:packages/*/package.json]
+            jsonpath = version
+            [bumpsemver:plaintext:packages/**/VERSION]
+            """
+        ).strip()
+    )
+    subprocess.check_call(["git", "add", "--all"])
+    subprocess.check_call(["git", "commit", "-m", "initial commit"])
+
+    with LogCapture() as log_capture, pytest.raises(SystemExit) as exc:
+        main(["patch", "--verbose"])
+
+    assert exc.value.code == 0
+    for name in ["foo", "bar", "baz"]:
+        assert '"version": "2.0.2"' in tmpdir.join(f"packages/{name}/package.json").read()
+    assert tmpdir.join("packages/foo/VERSION").read() == "2.0.2"
+    log_capture.check_present(
+        ("bumpsemver.config", "INFO", "Section [bumpsemver:json:packages/*/package.json] matches 3 files"),
+        ("bumpsemver.config", "INFO", "Section [bumpsemver:plaintext:packages/**/VERSION] matches 1 files"),
+    )
+
+
+def test_glob_section_without_match(tmpdir):
+    tmpdir.chdir()
+    subprocess.check_call(["git", "init"])
+    tmpdir.join(".bumpsemver.cfg").write(
+        dedent(
+            """
+            [bumpsemver]
+            current_version = 2.0.1
+            [bumpsemver:json:packages/*/package.json]
+            jsonpath = version
+            """
+        ).strip()
+    )
+
+    with LogCapture() as log_capture, pytest.raises(SystemExit) as exc:
+        main(["patch"])
+
+    assert exc.value.code == 4
+    log_capture.check_present(
+        (
+            "bumpsemver.cli",
+            "ERROR",
+            (
+                "Invalid config file. Pattern 'packages/*/package.json' "
+                "in section 'bumpsemver:json:packages/*/package.json' matches no files"
+            ),
+        ),
+    )
+
+
+def test_parsing_libraries_imported_lazily(tmpdir):
+    tmpdir.join("VERSION").write("1.0.0")
+    tmpdir.join(".bumpsemver.cfg").write("[bumpsemver]\ncurrent_version = 1.0.0\n\n[bumpsemver:plaintext:VERSION]\n")
+    script = dedent(
+        """
+        import sys
+        from bumpsemver.cli import main
+        try:
+            main(["--no-commit", "--no-tag", "patch"])
+        except SystemExit:
+            pass
+        print(",".join(sorted({name.split(".")[0] for name in sys.modules})))
+        """
+    )
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    with tmpdir.as_cwd():
+        modules = subprocess.check_output([sys.executable, "-c", script], env=env).decode().split()[-1].split(",")
+    assert tmpdir.join("VERSION").read() == "1.0.1"
+    for module in ["ruamel", "yamlpath", "tomlkit", "jsonpath_ng"]:
+        assert module not in modules
@@ -0,0 +1,156 @@
+import json
+import subprocess
+from textwrap import dedent
+
+import pytest
+from testfixtures import LogCapture
+
+from bumpsemver import config as config_module
+from bumpsemver.cli import main
+
+CONFIG = dedent(
+    """
+    [bumpsemver]
+    current_version = 1.0.0
+    commit = True
+
+    [bumpsemver:file:VERSION]
+
+    [bumpsemver:json:package.json]
+    jsonpath = version
+
+    [bumpsemver:discovery]
+    ignore =
+        docs/
+    """
+).lstrip()
+
+
+@pytest.fixture
+def repo(tmpdir, monkeypatch):
+    monkeypatch.setattr(config_module, "CONFIG_CACHE_MIN_SIZE", 0)
+    tmpdir.join("VERSION").write("1.0.0")
+    tmpdir.join("package.json").write('{"version": "1.0.0"}')
+    tmpdir.join(".bumpsemver.cfg").write(CONFIG)
+    tmpdir.chdir()
+    subprocess.check_call(["git", "init"])
+    subprocess.check_call(["git", "add", "."])
+    subprocess.check_call(["git", "commit", "-m", "initial commit"])
+    return tmpdir
+
+
+def _summary(files):
+    return [(type(file).__name__, file.filename, file.file_type, file.xpath) for file in files]
+
+
+@pytest.fixture
+def compilations(monkeypatch):
+    """
+    Count the config files actually parsed, i.e. the cache misses.
+    """
+    calls = []
+    compile_configuration = config_module._compile_configuration
+
+    def counting(config_content):
+        calls.append(config_content)
+        return compile_configuration(config_content)
+
+    monkeypatch.setattr(config_module, "_compile_configuration", counting)
+    return calls
+
+
+def test_config_cache_hit(repo, compilations):
+    defaults_parsed = {}
+    exists, files, discovery = config_module._load_configuration(".bumpsemver.cfg", None, defaults_parsed)
+    assert len(compilations) == 1
+    assert exists
+
+    cache = json.loads(repo.join(".git", "bumpsemver", "config-cache.json").read())
+    assert list(cache["configs"]) == [str(repo.join(".bumpsemver.cfg"))]
+
+    defaults_cached = {}
+    with LogCapture() as log_capture:
+        exists, cached_files, cached_discovery = config_module._load_configuration(
+            ".bumpsemver.cfg", None, defaults_cached
+        )
+    assert len(compilations) == 1
+    assert exists
+    assert defaults_cached == defaults_parsed
+    assert defaults_cached["commit"] is True
+    assert _summary(cached_files) == _summary(files)
+    assert cached_discovery.ignore == discovery.ignore == ["docs/"]
+    log_capture.check_present(
+        ("bumpsemver.config", "WARNING", "File type 'file' is deprecated, please use 'plaintext' instead.")
+    )
+
+
+def test_config_cache_miss_on_change(repo, compilations):
+    config_module._load_configuration(".bumpsemver.cfg", None, {})
+    repo.join(".bumpsemver.cfg").write(CONFIG.replace("commit = True", "commit = False"))
+
+    defaults = {}
+    config_module._load_configuration(".bumpsemver.cfg", None, defaults)
+    assert len(compilations) == 2
+    assert defaults["commit"] is False
+
+
+def test_config_cache_ignores_other_versions(repo, monkeypatch, compilations):
+    config_module._load_configuration(".bumpsemver.cfg", None, {})
+    monkeypatch.setattr(config_module, "__version__", "0.0.0")
+
+    config_module._load_configuration(".bumpsemver.cfg", None, {})
+    assert len(compilations) == 2
+
+
+def test_bump_with_cached_config(repo):
+    config_module._load_configuration(".bumpsemver.cfg", None, {})
+
+    with pytest.raises(SystemExit) as exc:
+        main(["patch"])
+    assert exc.value.code == 0
+
+    assert repo.join("VERSION").read() == "1.0.1"
+    assert "current_version = 1.0.1" in repo.join(".bumpsemver.cfg").read()
+    assert "[bumpsemver:json:package.json]" in repo.join(".bumpsemver.cfg").read()
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        (
+            "# release settings\n[bumpsemver]\ncurrent_version = 1.0.0  \ncommit = True\n\n[bumpsemver:file:VERSION]",
+            "# release settings\n[bumpsemver]\ncurrent_version = 1.0.1\ncommit = True\n\n[bumpsemver:file:VERSION]",
+        ),
+        (
+            "[bumpsemver]\r\ncurrent_version: 1.0.0\r\ntag = True",
+            "[bumpsemver]\r\ncurrent_version: 1.0.1\r\ntag = True",
+        ),
+        (
+            "[bumpsemver]\ncurrent_version = 1.0.0\nnew_version =\n  1.0.1\n; keep me\n[bumpsemver:file:VERSION]",
+            "[bumpsemver]\ncurrent_version = 1.0.1\n; keep me\n[bumpsemver:file:VERSION]",
+        ),
+        (
+            "[bumpsemver:file:VERSION]\ncurrent_version = 1.0.0\n[bumpsemver]\ncommit = True",
+            "[bumpsemver:file:VERSION]\ncurrent_version = 1.0.0\n[bumpsemver]\ncurrent_version = 1.0.1\ncommit = True",
+        ),
+        ("[bumpsemver]", "[bumpsemver]\ncurrent_version = 1.0.1\n"),
+        ("[bumpsemver:file:VERSION]\n", "[bumpsemver]\ncurrent_version = 1.0.1\n\n[bumpsemver:file:VERSION]\n"),
+    ],
+)
+def test_splice_current_version(content, expected):
+    assert config_module._splice_current_version(content, "1.0.1") == expected
+
+
+def test_bump_keeps_config_layout(repo):
+    repo.join(".bumpsemver.cfg").write(CONFIG.replace("commit = True", "# bumped by CI\ncommit = True"))
+    subprocess.check_call(["git", "commit", "-am", "comment the config"])
+
+    with pytest.raises(SystemExit) as exc:
+        main(["patch"])
+    assert exc.value.code == 0
+
+    diff = subprocess.check_output(["git", "diff", "HEAD~1", "--unified=0", "--", ".bumpsemver.cfg"], text=True)
+    assert [line for line in diff.splitlines() if line[:1] in "+-" and line[:3] not in ("+++", "---")] == [
+        "-current_version = 1.0.0",
+        "+current_version = 1.0.1",
+    ]
@@ -1,3 +1,4 @@
+import json
 import os
 import subprocess
 from functools import partial
@@ -8,7 +9,15 @@ import pytest
 from testfixtures import LogCapture
 
 from bumpsemver.cli import main
-from bumpsemver.discovery import check_package_lock_json
+from bumpsemver.discovery import check_package_lock_json, discover_unmanaged_files, prefilter_yaml, run_discovery
+from bumpsemver.discovery_rules import (
+    BUILTIN_RULES,
+    DiscoveryRule,
+    RuleMatcher,
+    get_rule_matcher,
+    load_plugin_rules,
+)
+from bumpsemver.exceptions import DiscoveryError
 from bumpsemver.git import Git
 
 check_call = partial(subprocess.check_call, env=os.environ.copy())
@@ -109,6 +118,62 @@ def test_list_files_with_git_with_gitignore_deep(tmpdir):
     assert actual == ["dir2/.gitignore", "file5"]
 
 
+def test_iter_files_with_special_characters(tmpdir):
+    tmpdir.chdir()
+    check_call(["git", "init"])
+    tmpdir.join("file with space").write("#")
+    tmpdir.mkdir("dïr").join('quo"te.yml').write("#")
+    tmpdir.join("tab\tname").write("#")
+    subprocess.run(["git", "add", "--all"], check=False)
+    actual = sorted(Git.iter_files())
+
+    assert actual == ['dïr/quo"te.yml', "file with space", "tab\tname"]
+
+
+def test_iter_files_with_pathspec(tmpdir):
+    tmpdir.chdir()
+    check_call(["git", "init"])
+    tmpdir.join("file1").write("#")
+    tmpdir.mkdir("dir1").join("file2").write("#")
+    tmpdir.mkdir("dir2").join("file3").write("#")
+    subprocess.run(["git", "add", "--all"], check=False)
+
+    assert list(Git.iter_files(["dir1", "dir2"])) == ["dir1/file2", "dir2/file3"]
+
+
+def test_iter_files_stops_early(tmpdir):
+    tmpdir.chdir()
+    check_call(["git", "init"])
+    for index in range(100):
+        tmpdir.join(f"file{index:03}").write("#")
+    subprocess.run(["git", "add", "--all"], check=False)
+    files = Git.iter_files()
+
+    assert next(files) == "file000"
+    files.close()
+
+
+def test_iter_blobs(tmpdir):
+    tmpdir.chdir()
+    check_call(["git", "init"])
+    tmpdir.join("file1").write("content 1")
+    tmpdir.mkdir("dir 2").join("file2").write("content 2")
+    subprocess.run(["git", "add", "--all"], check=False)
+    expected = [
+        (path, subprocess.check_output(["git", "hash-object", path]).decode().strip())
+        for path in ["dir 2/file2", "file1"]
+    ]
+
+    assert list(Git.iter_blobs()) == expected
+
+
+def test_iter_blobs_not_git(tmpdir):
+    tmpdir.chdir()
+    tmpdir.join("file1").write("#")
+
+    assert list(Git.iter_blobs()) == []
+
+
 def test_discovery_unknown_prop(tmpdir):
     tmpdir.chdir()
     tmpdir.join(".bumpsemver.cfg").write(
@@ -245,3 +310,394 @@ def test_all_in_one_negative(tmpdir, capsys):
             ),
         )
     )
+
+
+def test_discovery_cache(tmpdir, capsys):
+    data_path = os.path.abspath(os.path.dirname(os.path.realpath(__file__)) + "/fixtures/yolla")
+    _setup_test_folder(tmpdir, data_path, capsys)
+
+    for expected in ["Discovery cache: 0 hits, 3 misses", "Discovery cache: 3 hits, 0 misses"]:
+        with LogCapture() as log_capture, pytest.raises(SystemExit) as exc:
+            main(["--config-file", ".bumpsemver-min.cfg", "patch", "--allow-dirty", "--verbose"])
+
+        assert exc.value.code == 32
+        log_capture.check_present(("bumpsemver.discovery", "INFO", expected))
+
+    assert tmpdir.join(".git/bumpsemver/discovery-cache.json").check(file=1)
+
+
+def test_discovery_cache_ignores_modified_files(tmpdir, capsys):
+    data_path = os.path.abspath(os.path.dirname(os.path.realpath(__file__)) + "/fixtures/yolla")
+    _setup_test_folder(tmpdir, data_path, capsys)
+    ignore_all = dedent(
+        """
+        [bumpsemver:discovery]
+        ignore =
+            README.md
+            app/node-do-not-version/package-lock.json
+            app/node-do-not-version/package.json
+            app/node/package-lock.json
+            app/node/package.json
+            app/python/assets/sources.yml
+            app/python/dbt/dbt_project.yml
+            app/python/pyproject.toml
+        """
+    )
+    tmpdir.join(".bumpsemver-min.cfg").write(ignore_all, mode="a")
+    tmpdir.join("infrastructure/playbook.yml").write("- name: a harmless list\n")
+    subprocess.run(["git", "add", "*", "--all"], check=False)
+
+    with pytest.raises(SystemExit) as exc:
+        main(["--config-file", ".bumpsemver-min.cfg", "patch", "--allow-dirty", "--dry-run"])
+    assert exc.value.code == 0
+
+    # the staged content is a harmless list, but the working tree content is a playbook again
+    shutil.copy(data_path + "/infrastructure/playbook.yml", str(tmpdir.join("infrastructure/playbook.yml")))
+    with LogCapture() as log_capture, pytest.raises(SystemExit) as exc:
+        main(["--config-file", ".bumpsemver-min.cfg", "patch", "--allow-dirty", "--dry-run"])
+
+    assert exc.value.code == 32
+    log_capture.check(
+        (
+            "bumpsemver.cli",
+            "ERROR",
+            (
+                "Discovered unmanaged files. Please add them to the config file for versioning or to ignore:\n"
+                "  - File infrastructure/playbook.yml is not managed. Please add it to the config file"
+            ),
+        )
+    )
+
+
+def test_discovery_in_parallel(tmpdir, capsys, monkeypatch):
+    data_path = os.path.abspath(os.path.dirname(os.path.realpath(__file__)) + "/fixtures/yolla")
+    _setup_test_folder(tmpdir, data_path, capsys)
+    monkeypatch.setattr("bumpsemver.discovery.PARALLEL_THRESHOLD", 0)
+    monkeypatch.setattr("os.cpu_count", lambda: 2)
+
+    with LogCapture() as log_capture, pytest.raises(SystemExit) as exc:
+        main(["--config-file", ".bumpsemver-min.cfg", "patch", "--allow-dirty"])
+
+    assert exc.value.code == 32
+    assert log_capture.actual()[0][2].splitlines()[1:] == [
+        "  - File README.md is not managed. Please add it to the config file",
+        "  - File app/node-do-not-version/package-lock.json is not managed. Please add it to the config file",
+        "  - File app/node-do-not-version/package.json is not managed. Please add it to the config file",
+        "  - File app/node/package-lock.json is not managed. Please add it to the config file",
+        "  - File app/node/package.json is not managed. Please add it to the config file",
+        "  - File app/python/assets/sources.yml is not managed. Please add it to the config file",
+        "  - File app/python/dbt/dbt_project.yml is not managed. Please add it to the config file",
+        "  - File app/python/pyproject.toml is not managed. Please add it to the config file",
+        "  - File infrastructure/playbook.yml is not managed. Please add it to the config file",
+    ]
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        (b"", []),
+        (b"name: neither of them\n", []),
+        (b"- hosts: all\n  roles: []\n  vars:\n    project_version: 1.0.0\n", ["ansible-playbook"]),
+        (b"sources:\n  - name: raw\n    schema: raw\n    tables:\n      - name: t\n", ["dbt-sources"]),
+        ("- roles: []\n  vars: {version: 1}\n".encode("utf-16"), ["ansible-playbook", "dbt-sources"]),
+    ],
+)
+def test_prefilter_yaml(tmpdir, content, expected):
+    tmpdir.join("file.yml").write_binary(content)
+    rules = [get_rule_matcher().rules["ansible-playbook"], get_rule_matcher().rules["dbt-sources"]]
+
+    assert [rule.name for rule in prefilter_yaml(str(tmpdir.join("file.yml")), rules)] == expected
+
+
+@pytest.mark.parametrize(
+    "path, expected_rule, expected_candidates",
+    [
+        ("README.md", "root-readme", []),
+        ("docs/README.md", None, []),
+        ("app/node/package.json", "node-package", []),
+        ("package-lock.json", "node-package", []),
+        ("app/endswith-is-not-enough-package-lock.json", None, []),
+        ("app/dbt/dbt_project.yml", "dbt-project", []),
+        ("infrastructure/Playbook.yaml", None, ["ansible-playbook", "dbt-sources"]),
+        ("assets/sources.yml", None, ["dbt-sources"]),
+        ("assets/sources.json", None, []),
+    ],
+)
+def test_rule_matcher_builtin_rules(path, expected_rule, expected_candidates):
+    rule, candidates = get_rule_matcher().match(path)
+
+    assert (rule.name if rule else None) == expected_rule
+    assert [candidate.name for candidate in candidates] == expected_candidates
+
+
+def test_rule_matcher_custom_rules():
+    matcher = RuleMatcher(
+        [
+            *BUILTIN_RULES,
+            DiscoveryRule("helm-chart", basenames=["Chart.yaml"]),
+            DiscoveryRule("rust-crate", globs=["crates/*/Cargo.toml"]),
+        ]
+    )
+
+    assert matcher.match("charts/app/Chart.yaml")[0].name == "helm-chart"
+    assert matcher.match("crates/core/Cargo.toml")[0].name == "rust-crate"
+    assert matcher.match("Cargo.toml") == (None, [])
+    assert matcher.fingerprint == "ansible-playbook@1,dbt-sources@1"
+
+
+def test_plugin_rules(tmpdir, monkeypatch):
+    class FakeEntryPoint:
+        name = "fake"
+
+        @staticmethod
+        def load() -> list:
+            return [DiscoveryRule("helm-chart", basenames=["Chart.yaml"])]
+
+    monkeypatch.setattr("importlib.metadata.entry_points", lambda group: [FakeEntryPoint()])
+    get_rule_matcher.cache_clear()
+    try:
+        tmpdir.chdir()
+        check_call(["git", "init"])
+        tmpdir.mkdir("charts").join("Chart.yaml").write("version: 1.0.0\n")
+        check_call(["git", "add", "--all"])
+
+        with pytest.raises(DiscoveryError) as exc:
+            discover_unmanaged_files([], [])
+        assert exc.value.message.endswith("File charts/Chart.yaml is not managed. Please add it to the config file")
+    finally:
+        get_rule_matcher.cache_clear()
+
+
+def test_plugin_rules_invalid(monkeypatch):
+    class FakeEntryPoint:
+        def __init__(self, name, loaded):
+            self.name = name
+            self.loaded = loaded
+
+        def load(self) -> object:
+            return self.loaded
+
+    rule = DiscoveryRule("helm-chart", basenames=["Chart.yaml"])
+    entry_points = [FakeEntryPoint("number", 42), FakeEntryPoint("strings", ["Chart.yaml"]), FakeEntryPoint("ok", rule)]
+    monkeypatch.setattr("importlib.metadata.entry_points", lambda group: entry_points)
+
+    with LogCapture() as log_capture:
+        assert load_plugin_rules() == [rule]
+
+    log_capture.check(
+        (
+            "bumpsemver.discovery_rules",
+            "WARNING",
+            "Failed to load discovery rules from entry point 'number': 'int' object is not iterable",
+        ),
+        (
+            "bumpsemver.discovery_rules",
+            "WARNING",
+            "Failed to load discovery rules from entry point 'strings': 'Chart.yaml' is not a DiscoveryRule",
+        ),
+    )
+
+
+def _setup_incremental_repo(tmpdir):
+    tmpdir.chdir()
+    check_call(["git", "init"])
+    tmpdir.join("VERSION").write("1.0.0")
+    tmpdir.join("pyproject.toml").write("[tool.poetry]\nversion = '1.0.0'\n")
+    tmpdir.join(".bumpsemver.cfg").write(
+        dedent(
+            """
+            [bumpsemver]
+            current_version = 1.0.0
+            [bumpsemver:discovery]
+            incremental = True
+            ignore =
+                README.md
+            [bumpsemver:plaintext:VERSION]
+            """
+        ).strip()
+    )
+    check_call(["git", "add", "--all"])
+    check_call(["git", "commit", "-m", "initial commit"])
+
+
+def test_discovery_incremental(tmpdir):
+    _setup_incremental_repo(tmpdir)
+    check_call(["git", "tag", "v1.0.0"])
+    tmpdir.mkdir("app").join("package.json").write('{"version": "1.0.0"}')
+    check_call(["git", "add", "--all"])
+    check_call(["git", "commit", "-m", "add app"])
+
+    with LogCapture() as log_capture, pytest.raises(SystemExit) as exc:
+        main(["patch", "--dry-run", "--verbose"])
+
+    assert exc.value.code == 32
+    log_capture.check_present(
+        ("bumpsemver.api", "INFO", "Discovering unmanaged files added since release tag 'v1.0.0'"),
+        (
+            "bumpsemver.cli",
+            "ERROR",
+            (
+                "Discovered unmanaged files. Please add them to the config file for versioning or to ignore:\n"
+                "  - File app/package.json is not managed. Please add it to the config file"
+            ),
+        ),
+    )
+
+
+def test_discovery_incremental_unknown_since(tmpdir):
+    _setup_incremental_repo(tmpdir)
+
+    # e.g. the release tag was pruned, or is not in a shallow clone
+    with LogCapture() as log_capture:
+        report = run_discovery(["VERSION"], ["README.md"], since="v0.9.0")
+
+    log_capture.check_present(
+        (
+            "bumpsemver.discovery",
+            "WARNING",
+            "Cannot list the files added since 'v0.9.0', discovering unmanaged files in the whole tree",
+        ),
+    )
+    assert [(verdict.path, verdict.verdict) for verdict in report.verdicts] == [("pyproject.toml", "unmanaged")]
+    assert report.issues == ["File pyproject.toml is not managed. Please add it to the config file"]
+
+
+def test_discovery_incremental_without_tag(tmpdir):
+    _setup_incremental_repo(tmpdir)
+
+    with LogCapture() as log_capture, pytest.raises(SystemExit) as exc:
+        main(["patch", "--dry-run", "--verbose"])
+
+    assert exc.value.code == 32
+    log_capture.check_present(
+        ("bumpsemver.api", "INFO", "No release tag found, discovering unmanaged files in the whole tree"),
+        (
+            "bumpsemver.cli",
+            "ERROR",
+            (
+                "Discovered unmanaged files. Please add them to the config file for versioning or to ignore:\n"
+                "  - File pyproject.toml is not managed. Please add it to the config file"
+            ),
+        ),
+    )
+
+
+def test_discovery_incremental_invalid_value(tmpdir):
+    tmpdir.chdir()
+    tmpdir.join(".bumpsemver.cfg").write(
+        dedent(
+            """
+            [bumpsemver]
+            current_version = 75.0.1
+            [bumpsemver:discovery]
+            incremental = maybe
+            """
+        ).strip()
+    )
+    with LogCapture() as log_capture, pytest.raises(SystemExit) as exc:
+        main(["patch", "--dry-run"])
+
+    assert exc.value.code == 4
+    log_capture.check_present(
+        (
+            "bumpsemver.cli",
+            "ERROR",
+            "Invalid config file. Value of 'incremental' in section 'bumpsemver:discovery' is not a boolean",
+        )
+    )
+
+
+def test_discovery_ignore_patterns(tmpdir):
+    tmpdir.chdir()
+    check_call(["git", "init"])
+    tmpdir.mkdir("third_party").mkdir("lib").join("package.json").write("{}")
+    tmpdir.mkdir("tests").mkdir("fixtures").join("sources.yml").write(
+        "sources:\n  - name: raw\n    schema: raw\n    tables:\n      - name: t\n"
+    )
+    tmpdir.mkdir("app").join("package.json").write("{}")
+    check_call(["git", "add", "--all"])
+
+    discover_unmanaged_files([], ["third_party/**", "**/fixtures/*.yml", "app/package.json"])
+
+    with pytest.raises(DiscoveryError) as exc:
+        discover_unmanaged_files([], ["third_party/", "app/*.json"])
+    assert exc.value.message.endswith(
+        "File tests/fixtures/sources.yml is not managed. Please add it to the config file"
+    )
+
+
+def test_discovery_ignore_patterns_below_repo_root(tmpdir, monkeypatch):
+    tmpdir.chdir()
+    check_call(["git", "init"])
+    subdir = tmpdir.mkdir("subdir")
+    subdir.mkdir("third_party").join("package.json").write("{}")
+    subdir.join("package.json").write("{}")
+    tmpdir.join("package.json").write("{}")
+    check_call(["git", "add", "--all"])
+    monkeypatch.chdir(subdir)
+
+    with pytest.raises(DiscoveryError) as exc:
+        discover_unmanaged_files([], ["third_party/"])
+    assert exc.value.message.endswith(":\n  - File package.json is not managed. Please add it to the config file")
+
+
+def test_discover_subcommand(tmpdir, capsys):
+    data_path = os.path.abspath(os.path.dirname(os.path.realpath(__file__)) + "/fixtures/yolla")
+    _setup_test_folder(tmpdir, data_path, capsys)
+    capsys.readouterr()
+
+    with pytest.raises(SystemExit) as exc:
+        main(["discover", "--config-file", ".bumpsemver-max.cfg"])
+
+    assert exc.value.code == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["issues"] == []
+    verdicts = {item["path"]: (item["verdict"], item["rules"]) for item in report["files"]}
+    assert verdicts["README.md"] == ("managed", ["root-readme"])
+    assert verdicts["app/node-do-not-version/package.json"] == ("ignored", ["node-package"])
+    assert verdicts["infrastructure/playbook.yml"] == ("managed", ["ansible-playbook", "dbt-sources"])
+    assert verdicts["infrastructure/invalid-playbook.yaml"] == ("clean", ["ansible-playbook", "dbt-sources"])
+    assert report["files_scanned"] == len(Git.list_files())
+    assert {item["rule"] for item in report["rules"]} == {
+        "ansible-playbook",
+        "dbt-project",
+        "dbt-sources",
+        "node-package",
+        "python-project",
+        "root-readme",
+    }
+
+
+def test_discover_subcommand_with_issues(tmpdir, capsys):
+    data_path = os.path.abspath(os.path.dirname(os.path.realpath(__file__)) + "/fixtures/yolla")
+    _setup_test_folder(tmpdir, data_path, capsys)
+    capsys.readouterr()
+
+    with pytest.raises(SystemExit) as exc:
+        main(["discover", "--config-file", ".bumpsemver-min.cfg"])
+
+    assert exc.value.code == 32
+    report = json.loads(capsys.readouterr().out)
+    assert len(report["issues"]) == 9
+    assert {
+        "path": "infrastructure/playbook.yml",
+        "verdict": "unmanaged",
+        "rules": ["ansible-playbook"],
+        "reason": "content matches rule 'ansible-playbook'",
+    } in report["files"]
+
+
+def test_discover_subcommand_without_config(tmpdir):
+    tmpdir.chdir()
+
+    with LogCapture() as log_capture, pytest.raises(SystemExit) as exc:
+        main(["discover"])
+
+    assert exc.value.code == 1
+    log_capture.check(
+        (
+            "bumpsemver.cli",
+            "ERROR",
+            "No valid config file is specified and the default .bumpsemver.cfg is not found",
+        )
+    )
@@ -0,0 +1,118 @@
+import contextvars
+import io
+import json
+import logging
+
+import pytest
+
+from bumpsemver import events
+from bumpsemver.cli import main
+
+REPO_FILES = {
+    "VERSION": "1.0.0",
+    ".bumpsemver.cfg": "[bumpsemver]\ncurrent_version = 1.0.0\ncommit = True\ntag = True\n\n"
+    "[bumpsemver:plaintext:VERSION]\n",
+}
+
+
+def _events(out):
+    return [json.loads(line) for line in out.splitlines()]
+
+
+def test_emit_without_stream():
+    assert not events.enabled()
+    events.emit("anything", value=1)
+
+
+def test_error_logs_become_events():
+    stream = io.StringIO()
+    emitter = events.start(stream)
+    logging.getLogger("bumpsemver.test").error("Something went wrong")
+    logging.getLogger("bumpsemver.test").info("Nothing to see")
+    emitter.close(4)
+
+    emitted = _events(stream.getvalue())
+    assert emitted[0] == {"event": "error", "level": "error", "message": "Something went wrong"}
+    assert emitted[1]["event"] == "finished"
+    assert emitted[1]["exit_code"] == 4
+    assert not events.enabled()
+
+
+def test_emitters_of_separate_contexts():
+    def run(stream, event):
+        emitter = events.start(stream)
+        events.emit(event)
+        logging.getLogger("bumpsemver.test").warning("Only mine")
+        return emitter
+
+    first, second = io.StringIO(), io.StringIO()
+    first_emitter = contextvars.copy_context().run(run, first, "first")
+    second_emitter = contextvars.copy_context().run(run, second, "second")
+    events.emit("outside")
+    first_emitter.close(0)
+    second_emitter.close(1)
+
+    assert [event["event"] for event in _events(first.getvalue())] == ["first", "error", "finished"]
+    assert [event["event"] for event in _events(second.getvalue())] == ["second", "error", "finished"]
+    assert not events.enabled()
+
+
+def test_cli_json_lines(tmpdir, capsys, git, git_repo):
+    git_repo(tmpdir, REPO_FILES)
+    tmpdir.chdir()
+    capsys.readouterr()
+
+    with pytest.raises(SystemExit) as exc:
+        main(["--output", "json-lines", "patch"])
+    assert exc.value.code == 0
+
+    out, _err = capsys.readouterr()
+    emitted = _events(out)
+    assert [event["event"] for event in emitted] == [
+        "config_loaded",
+        "version_resolved",
+        "file_verified",
+        "file_changed",
+        "config_updated",
+        "commit",
+        "tag",
+        "finished",
+    ]
+    assert emitted[0]["files"] == [{"file": "VERSION", "file_type": "plaintext"}]
+    assert emitted[1] == {
+        "event": "version_resolved",
+        "current_version": "1.0.0",
+        "new_version": "1.0.1",
+        "dry_run": False,
+    }
+    assert emitted[3] == {
+        "event": "file_changed",
+        "file": "VERSION",
+        "file_type": "plaintext",
+        "bytes_before": 5,
+        "bytes_after": 5,
+        "dry_run": False,
+    }
+    assert emitted[5]["sha"] == git("rev-parse", "HEAD")
+    assert emitted[6]["name"] == "v1.0.1"
+    assert emitted[7]["exit_code"] == 0
+    assert "discovery" in emitted[7]["phases"]
+
+
+def test_cli_json_lines_error(tmpdir, capsys, git_repo):
+    git_repo(tmpdir, REPO_FILES)
+    tmpdir.chdir()
+    capsys.readouterr()
+
+    with pytest.raises(SystemExit) as exc:
+        main(["--output", "json-lines", "--current-version", "2.0.0", "patch"])
+    assert exc.value.code == 4
+
+    emitted = _events(capsys.readouterr().out)
+    assert emitted[-2] == {
+        "event": "error",
+        "level": "error",
+        "message": "Did not find '2.0.0' in plaintext file: 'VERSION'",
+    }
+    assert emitted[-1]["event"] == "finished"
+    assert emitted[-1]["exit_code"] == 4
@@ -157,15 +157,7 @@ def test_type_keyword_with_suffix_is_accepted(tmpdir, json_keyword):
     with pytest.raises(SystemExit) as exc:
         main(["patch"])
 
-    cfg_expected = dedent(
-        """[bumpsemver]
-current_version = 5.10.8
-
-[bumpsemver:%s:file2]
-jsonpath = version
-"""
-        % json_keyword
-    )
+    cfg_expected = "[bumpsemver]\ncurrent_version = 5.10.8\n[bumpsemver:%s:file2]\njsonpath: version" % json_keyword
 
     assert "5.10.8" in tmpdir.join("file2").read()
     assert tmpdir.join(".bumpsemver.cfg").read() == cfg_expected
@@ -248,23 +240,15 @@ def test_json_file_info_logging(tmpdir):
             "INFO",
             "[bumpsemver]\ncurrent_version = 0.4.0\n\n[bumpsemver:json:fileJ]\njsonpath = version",
         ),
-        (
-            "bumpsemver.version_part",
-            "INFO",
-            "Parsing version '0.4.0' using regexp '(?P<major>\\d+)\\.(?P<minor>\\d+)\\.(?P<patch>\\d+)'",
-        ),
+        ("bumpsemver.version_part", "INFO", "Parsing version '0.4.0' as SemVer 2.0"),
         ("bumpsemver.version_part", "INFO", "Parsed the following values: major=0, minor=4, patch=0"),
         ("bumpsemver.cli", "INFO", "Attempting to increment part 'patch'"),
         ("bumpsemver.cli", "INFO", "Values are now: major=0, minor=4, patch=1"),
-        (
-            "bumpsemver.version_part",
-            "INFO",
-            "Parsing version '0.4.1' using regexp '(?P<major>\\d+)\\.(?P<minor>\\d+)\\.(?P<patch>\\d+)'",
-        ),
+        ("bumpsemver.version_part", "INFO", "Parsing version '0.4.1' as SemVer 2.0"),
         ("bumpsemver.version_part", "INFO", "Parsed the following values: major=0, minor=4, patch=1"),
         ("bumpsemver.cli", "INFO", "New version will be '0.4.1'"),
         ("bumpsemver.git", "WARNING", "'git ls-files' failed. Listing files without respecting '.gitignore'"),
-        ("bumpsemver.cli", "INFO", "Asserting files fileJ contain the version string..."),
+        ("bumpsemver.api", "INFO", "Asserting files fileJ contain the version string..."),
         ("bumpsemver.files.json", "INFO", "Changing json file fileJ:"),
         (
             "bumpsemver.files.json",
@@ -275,7 +259,7 @@ def test_json_file_info_logging(tmpdir):
         (
             "bumpsemver.config",
             "INFO",
-            "[bumpsemver]\ncurrent_version = 0.4.1\n\n[bumpsemver:json:fileJ]\njsonpath = version\n\n",
+            "[bumpsemver]\ncurrent_version = 0.4.1\n\n[bumpsemver:json:fileJ]\njsonpath = version",
         ),
     )
     assert "current_version = 0.4.1" in tmpdir.join(".bumpsemver.cfg").read()
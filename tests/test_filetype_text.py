@@ -150,23 +150,15 @@ def test_search_replace_to_avoid_updating_unconcerned_lines(tmpdir):
             "search = MyProject=={current_version}\nreplace = MyProject=={new_version}",
         ),
         ("bumpsemver.config", "WARNING", "File type 'file' is deprecated, please use 'plaintext' instead."),
-        (
-            "bumpsemver.version_part",
-            "INFO",
-            "Parsing version '1.5.6' using regexp '(?P<major>\\d+)\\.(?P<minor>\\d+)\\.(?P<patch>\\d+)'",
-        ),
+        ("bumpsemver.version_part", "INFO", "Parsing version '1.5.6' as SemVer 2.0"),
         ("bumpsemver.version_part", "INFO", "Parsed the following values: major=1, minor=5, patch=6"),
         ("bumpsemver.cli", "INFO", "Attempting to increment part 'minor'"),
         ("bumpsemver.cli", "INFO", "Values are now: major=1, minor=6, patch=0"),
-        (
-            "bumpsemver.version_part",
-            "INFO",
-            "Parsing version '1.6.0' using regexp '(?P<major>\\d+)\\.(?P<minor>\\d+)\\.(?P<patch>\\d+)'",
-        ),
+        ("bumpsemver.version_part", "INFO", "Parsing version '1.6.0' as SemVer 2.0"),
         ("bumpsemver.version_part", "INFO", "Parsed the following values: major=1, minor=6, patch=0"),
         ("bumpsemver.cli", "INFO", "New version will be '1.6.0'"),
         ("bumpsemver.git", "WARNING", "'git ls-files' failed. Listing files without respecting '.gitignore'"),
-        ("bumpsemver.cli", "INFO", "Asserting files requirements.txt contain the version string..."),
+        ("bumpsemver.api", "INFO", "Asserting files requirements.txt contain the version string..."),
         (
             "bumpsemver.files.text",
             "INFO",
@@ -186,7 +178,7 @@ def test_search_replace_to_avoid_updating_unconcerned_lines(tmpdir):
             "bumpsemver.config",
             "INFO",
             "[bumpsemver]\ncurrent_version = 1.6.0\n\n[bumpsemver:file:requirements.txt]\n"
-            "search = MyProject=={current_version}\nreplace = MyProject=={new_version}\n\n",
+            "search = MyProject=={current_version}\nreplace = MyProject=={new_version}",
         ),
     )
 
@@ -616,14 +608,7 @@ def test_config_file_is_updated(tmpdir):
     with pytest.raises(SystemExit) as exc:
         main(["patch", "--verbose"])
 
-    assert (
-        """[bumpsemver]
-current_version = 0.0.14
-
-[bumpsemver:file:file3]
-"""
-        == tmpdir.join(".bumpsemver.cfg").read()
-    )
+    assert "[bumpsemver]\ncurrent_version = 0.0.14\n[bumpsemver:file:file3]" == tmpdir.join(".bumpsemver.cfg").read()
     assert exc.value.code == 0
 
 
@@ -664,8 +649,16 @@ def test_retain_newline(tmpdir, newline):
     new_config = tmpdir.join(".bumpsemver.cfg").read_binary()
     assert newline in new_config
 
-    # Ensure there is only a single newline (not two) at the end of the file and that it is of the right type
-    assert new_config.endswith(b"[bumpsemver:file:file.py]" + newline)
+    # Ensure only the current_version line changed, keeping its newline and the missing one at the end of the file
+    assert new_config == newline.join(
+        [
+            b"[bumpsemver]",
+            b"current_version = 1.0.0",
+            b"search = {current_version}",
+            b"replace = {new_version}",
+            b"[bumpsemver:file:file.py]",
+        ]
+    )
     assert exc.value.code == 0
 
 
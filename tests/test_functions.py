@@ -1,6 +1,6 @@
 import pytest
 
-from bumpsemver.functions import NumericFunction
+from bumpsemver.functions import NumericFunction, PrereleaseFunction
 
 
 def test_numeric_init_wo_first_value():
@@ -26,3 +26,16 @@ def test_numeric_bump_simple_number():
 def test_numeric_bump_prefix_and_suffix():
     func = NumericFunction()
     assert func.bump("v0b") == "v1b"
+
+
+def test_prerelease_init():
+    assert PrereleaseFunction().first_value == "rc.1"
+    assert PrereleaseFunction(first_value="alpha.0").first_value == "alpha.0"
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("rc.1", "rc.2"), ("0", "1"), ("beta.9.x", "beta.10.x"), ("alpha", "alpha.1"), ("x-1", "x-1.1")],
+)
+def test_prerelease_bump(value, expected):
+    assert PrereleaseFunction().bump(value) == expected
@@ -0,0 +1,90 @@
+import ast
+from pathlib import Path
+
+import pytest
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent / "bumpsemver"
+
+# the modules running on every bump, where a log message must cost nothing unless its level is enabled
+HOT_MODULES = [
+    "api.py",
+    "cli.py",
+    "config.py",
+    "discovery.py",
+    "discovery_rules.py",
+    "files/base.py",
+    "files/json.py",
+    "files/text.py",
+    "files/toml.py",
+    "files/yaml.py",
+    "version_part.py",
+]
+
+LOG_METHODS = {"debug", "info", "warning", "warn", "error", "exception", "critical", "log"}
+
+
+def _is_logger(node: ast.expr) -> bool:
+    if isinstance(node, ast.Name):
+        return node.id == "logger"
+    return isinstance(node, ast.Attribute) and node.attr == "logger"
+
+
+def _is_eager_message(node: ast.expr) -> bool:
+    """
+    Tell whether a log message is formatted before the logging call, whether the level is enabled or not.
+    """
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Mod, ast.Add)):
+        return True
+    return _is_formatted(node)
+
+
+def _is_formatted(node: ast.expr) -> bool:
+    if isinstance(node, ast.JoinedStr):
+        return any(isinstance(value, ast.FormattedValue) for value in ast.iter_child_nodes(node))
+    return isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "format"
+
+
+def _is_eager_argument(node: ast.expr) -> bool:
+    """
+    Tell whether an argument of a log message formats a string, e.g. with a conditional f-string.
+    """
+    return any(_is_formatted(child) for child in ast.walk(node))
+
+
+def find_eager_log_messages(source: str):
+    for node in ast.walk(ast.parse(source)):
+        if not (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Attribute)
+            and node.func.attr in LOG_METHODS
+            and _is_logger(node.func.value)
+        ):
+            continue
+        message_index = 1 if node.func.attr == "log" else 0
+        if len(node.args) > message_index and (
+            _is_eager_message(node.args[message_index])
+            or any(_is_eager_argument(arg) for arg in node.args[message_index + 1 :])
+        ):
+            yield node.lineno
+
+
+def test_find_eager_log_messages():
+    source = "\n".join(
+        [
+            'logger.info(f"Parsed {values}")',
+            'logger.info("Parsed %s", values)',
+            'self.logger.debug("Parsed {}".format(values))',
+            'logger.log(logging.INFO, "Parsed " + values)',
+            'logger.warning(f"Constant")',
+            'print(f"Parsed {values}")',
+            'logger.info("Parsed %s", f"with {values}" if values else "without")',
+            'logger.info("Parsed %s", "with" if values else "without")',
+        ]
+    )
+    assert list(find_eager_log_messages(source)) == [1, 3, 4, 7]
+
+
+@pytest.mark.parametrize("module", HOT_MODULES)
+def test_no_eager_log_messages_in_hot_modules(module):
+    lines = list(find_eager_log_messages((PACKAGE_DIR / module).read_text(encoding="utf-8")))
+    assert lines == [], f"Use lazy %-style arguments for the log messages of {module} at lines {lines}"
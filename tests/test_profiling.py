@@ -0,0 +1,93 @@
+import contextvars
+import json
+import pstats
+import subprocess
+
+import pytest
+
+from bumpsemver import profiling
+from bumpsemver.cli import main
+
+
+def test_phase_without_profiling():
+    assert profiling.stop() is None
+    with profiling.phase("anything"):
+        pass
+    assert profiling.stop() is None
+
+
+def test_profilers_of_separate_contexts():
+    def run(name):
+        profiler = profiling.start(None)
+        with profiling.phase(name):
+            pass
+        assert profiling.stop() is profiler
+        return profiler
+
+    first = contextvars.copy_context().run(run, "first")
+    outer = profiling.start(None)
+    second = contextvars.copy_context().run(run, "second")
+
+    assert profiling.stop() is outer
+    assert [stats.name for stats in first.stats.values()] == ["first"]
+    assert [stats.name for stats in second.stats.values()] == ["second"]
+    assert outer.stats == {}
+
+
+def test_profiler_accumulates_phases(tmpdir):
+    profiler = profiling.Profiler()
+    profiler.start()
+    with profiler.phase("probe"):
+        subprocess.check_output(["git", "--version"])
+    with profiler.phase("probe"):
+        tmpdir.join("file").write("x" * 1000)
+    with profiler.phase("write file:file", "file"):
+        pass
+    profiler.stop()
+
+    stats = {(stats.kind, stats.name): stats for stats in profiler.sorted_stats()}
+    assert list(stats) == [("phase", "probe"), ("file", "write file:file"), ("run", "total")]
+    assert stats[("phase", "probe")].calls == 2
+    assert stats[("phase", "probe")].subprocesses == 1
+    assert stats[("run", "total")].subprocesses == 1
+    assert stats[("run", "total")].wall >= stats[("phase", "probe")].wall
+    if stats[("phase", "probe")].bytes_written is not None:
+        assert stats[("phase", "probe")].bytes_written >= 1000
+
+
+def test_cli_profile_json(tmpdir, capsys):
+    tmpdir.join("VERSION").write("1.0.0")
+    tmpdir.join(".bumpsemver.cfg").write("[bumpsemver]\ncurrent_version = 1.0.0\n\n[bumpsemver:plaintext:VERSION]\n")
+    tmpdir.chdir()
+    subprocess.check_call(["git", "init"])
+    subprocess.check_call(["git", "add", "."])
+    subprocess.check_call(["git", "commit", "-m", "initial commit"])
+    capsys.readouterr()
+
+    with pytest.raises(SystemExit) as exc:
+        main(["--profile", "--profile-format", "json", "--profile-dump", "run.prof", "--commit", "patch"])
+    assert exc.value.code == 0
+
+    report = json.loads(capsys.readouterr().err)
+    phases = {entry["name"]: entry for entry in report if entry["kind"] == "phase"}
+    assert set(phases) == {
+        "git_probe",
+        "config_load",
+        "version_parse",
+        "discovery",
+        "verify",
+        "render",
+        "replace",
+        "config_rewrite",
+        "commit",
+        "tag",
+    }
+    assert phases["commit"]["subprocesses"] > 0
+    assert {entry["name"] for entry in report if entry["kind"] == "file"} == {
+        "verify plaintext:VERSION",
+        "render plaintext:VERSION",
+        "replace plaintext:VERSION",
+    }
+    assert report[-1]["kind"] == "run"
+    assert pstats.Stats(str(tmpdir.join("run.prof"))).total_calls > 0
+    assert tmpdir.join("VERSION").read() == "1.0.1"
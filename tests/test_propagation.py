@@ -0,0 +1,164 @@
+import json
+
+import pytest
+from testfixtures import LogCapture
+
+from bumpsemver.cli import main
+from bumpsemver.exceptions import InvalidArgumentsError
+from bumpsemver.propagation import DependencyGraph, parse_range, plan_propagation, range_satisfied_by, rewrite_range
+from bumpsemver.version_part import VersionConfig
+from bumpsemver.workspace import apply_workspace, load_workspace
+
+# the options of the config files of the npm packages
+PACKAGE_OPTIONS = "commit = True\ntag = True\n"
+
+
+def _write_pyproject(path, version, *dependencies):
+    requirements = "".join(f'    "{dependency}",\n' for dependency in dependencies)
+    path.write(
+        f'[project]\nname = "{path.dirpath().basename}"\nversion = "{version}"\n'
+        f"# the requirements of the project\ndependencies = [\n{requirements}]\n",
+        ensure=True,
+    )
+    path.dirpath().join(".bumpsemver.cfg").write(
+        f"[bumpsemver]\ncurrent_version = {version}\n\n[bumpsemver:toml:pyproject.toml]\ntomlpath = project.version\n"
+    )
+
+
+@pytest.fixture
+def workspace_layout(tmpdir, write_package):
+    """
+    npm and Python packages depending on each other.
+    """
+    write_package(tmpdir.join("packages", "core", "package.json"), "1.4.0", PACKAGE_OPTIONS)
+    write_package(
+        tmpdir.join("packages", "app", "package.json"), "0.3.0", PACKAGE_OPTIONS, core="^1.2.0", lodash="^4.17.0"
+    )
+    write_package(tmpdir.join("packages", "cli", "package.json"), "2.0.0", PACKAGE_OPTIONS, app="workspace:~0.3.0")
+    write_package(tmpdir.join("packages", "docs", "package.json"), "0.0.1", PACKAGE_OPTIONS, core=">=1.0.0")
+    _write_pyproject(tmpdir.join("python", "lib_core", "pyproject.toml"), "1.0.0")
+    _write_pyproject(
+        tmpdir.join("python", "service", "pyproject.toml"), "0.5.0", "lib-core[http] >=1.0,<2 ; python_version>'3.8'"
+    )
+
+
+@pytest.mark.parametrize(
+    "spec, version, satisfied, rewritten",
+    [
+        ("^1.2.0", "1.9.0", True, None),
+        ("^1.2.0", "2.0.0", False, "^2.0.0"),
+        ("^0.2.0", "0.3.0", False, "^0.3.0"),
+        ("~1.2", "1.3.0", False, "~1.3"),
+        ("1.x", "2.0.0", False, "2.x"),
+        ("==1.2.*", "1.2.7", True, None),
+        ("~=1.2", "2.0.0", False, "~=2.0"),
+        (">=1.0, <2", "2.1.0", False, ">=2.1, <3"),
+        (">= 1.0.0 < 2.0.0", "1.0.1", True, None),
+        ("^1.0.0 || ^2.0.0", "2.3.0", True, None),
+        ("^1.0.0", "2.0.0-rc.1", False, "^2.0.0-rc.1"),
+        ("^2.0.0-rc.1", "2.0.0-rc.2", True, None),
+        ("*", "3.0.0", True, None),
+        ("^1.0.0 || ^2.0.0", "3.0.0", False, None),
+        ("<2", "2.0.0", False, None),
+    ],
+)
+def test_ranges(spec, version, satisfied, rewritten):
+    parsed = VersionConfig().parse(version)
+    assert range_satisfied_by(parse_range(spec), parsed) is satisfied
+    if not satisfied:
+        assert rewrite_range(spec, parsed) == rewritten
+
+
+def test_dependency_graph(tmpdir, write_package, workspace_repo):
+    assert parse_range("file:../core") is None
+
+    graph = DependencyGraph.build(load_workspace())
+
+    assert graph.packages[("python", "lib-core")] == "python/lib_core"
+    assert ("npm", "lodash") not in graph.packages
+    assert [dependency.project for dependency in graph.dependents["packages/core"]] == ["packages/app", "packages/docs"]
+    assert [dependency.spec for dependency in graph.dependents["packages/app"]] == ["~0.3.0"]
+    assert [dependency.spec for dependency in graph.dependents["python/lib_core"]] == [">=1.0,<2"]
+    assert graph.topological_order() == [
+        "packages/core",
+        "packages/app",
+        "packages/cli",
+        "packages/docs",
+        "python/lib_core",
+        "python/service",
+    ]
+
+    write_package(tmpdir.join("packages", "core", "package.json"), "1.4.0", cli="^2.0.0")
+    with pytest.raises(InvalidArgumentsError) as exc:
+        DependencyGraph.build(load_workspace()).topological_order()
+    assert exc.value.message == (
+        "Projects ['packages/app', 'packages/cli', 'packages/core'] depend on each other, "
+        "the bumps cannot be propagated"
+    )
+
+
+def test_propagate_major_bump(tmpdir, git, workspace_repo):
+    with pytest.raises(SystemExit) as exc:
+        main(["workspace", "--project", "packages/core", "--propagate", "major"])
+    assert exc.value.code == 0
+
+    core = json.loads(tmpdir.join("packages", "core", "package.json").read())
+    app = json.loads(tmpdir.join("packages", "app", "package.json").read())
+    cli = json.loads(tmpdir.join("packages", "cli", "package.json").read())
+    assert core["version"] == "2.0.0"
+    assert (app["version"], app["dependencies"]) == ("0.3.1", {"core": "^2.0.0", "lodash": "^4.17.0"})
+    # the patch bump of app is still allowed by the range of cli
+    assert (cli["version"], cli["dependencies"]) == ("2.0.0", {"app": "workspace:~0.3.0"})
+    assert "current_version = 0.3.1" in tmpdir.join("packages", "app", ".bumpsemver.cfg").read()
+    assert git("log", "-1", "--format=%B") == (
+        "build(repo): bumped versions\n\n- packages/core: 1.4.0 → 2.0.0\n- packages/app: 0.3.0 → 0.3.1"
+    )
+    assert git("status", "--porcelain") == ""
+    assert git("tag").split() == ["packages/app/v0.3.1", "packages/core/v2.0.0"]
+
+
+def test_plan_propagation(tmpdir, git, write_package, workspace_repo):
+    workspace = load_workspace()
+
+    workspace_plan = plan_propagation(workspace, "major", projects=["python/lib_core"], dependents_part=None)
+
+    assert list(workspace_plan.plans) == ["python/lib_core"]
+    assert [(edit.project, edit.name, edit.before, edit.after) for edit in workspace_plan.dependency_edits] == [
+        ("python/service", "lib-core", ">=1.0,<2", ">=2.0,<3")
+    ]
+    apply_workspace(workspace_plan)
+    assert tmpdir.join("python", "service", "pyproject.toml").read() == (
+        '[project]\nname = "service"\nversion = "0.5.0"\n# the requirements of the project\ndependencies = [\n'
+        "    \"lib-core[http] >=2.0,<3 ; python_version>'3.8'\",\n]\n"
+    )
+    assert 'version = "2.0.0"' in tmpdir.join("python", "lib_core", "pyproject.toml").read()
+
+    git("checkout", "--", ".")
+    write_package(tmpdir.join("packages", "app", "package.json"), "0.3.0", core="^1.2.0 || ^0.9.0")
+    with pytest.raises(InvalidArgumentsError) as exc:
+        plan_propagation(workspace, "major", projects=["packages/core"], allow_dirty=True)
+    assert exc.value.message == (
+        "Cannot update the range '^1.2.0 || ^0.9.0' of the dependency core in packages/app/package.json to allow 2.0.0"
+    )
+    assert json.loads(tmpdir.join("packages", "core", "package.json").read())["version"] == "1.4.0"
+
+
+def test_plan_propagation_skips_non_ranges(tmpdir, write_package, workspace_repo):
+    write_package(tmpdir.join("packages", "app", "package.json"), "0.3.0", core="git+https://example.com/core.git")
+
+    with LogCapture() as log_capture:
+        workspace_plan = plan_propagation(load_workspace(), "major", projects=["packages/core"], allow_dirty=True)
+
+    log_capture.check_present(
+        (
+            "bumpsemver.propagation",
+            "WARNING",
+            "Cannot check dependency core of packages/app/package.json against 2.0.0, "
+            "'git+https://example.com/core.git' is not a version range",
+        ),
+    )
+    assert [(dependency.project, dependency.name) for dependency in workspace_plan.skipped_dependencies] == [
+        ("packages/app", "core")
+    ]
+    assert workspace_plan.dependency_edits == []
+    assert list(workspace_plan.plans) == ["packages/core"]
@@ -0,0 +1,112 @@
+import re
+from datetime import datetime
+
+import pytest
+
+from bumpsemver.utils import GlobSet, PathMatcher, Template, key_value_string, translate_glob
+
+
+def test_key_value_string():
+    assert key_value_string({"b": 2, "a": 1}) == "a=1, b=2"
+
+
+@pytest.mark.parametrize(
+    "template",
+    [
+        "{current_version}",
+        "MyProject=={current_version}",
+        "{{literal}} {current_version} -> {new_version}",
+        "Released {now:%Y-%m-%d}",
+        "{current_version!r}",
+        "{current_version:>{width}}",
+        "{now.year}",
+        "",
+    ],
+)
+def test_template_renders_as_str_format(template):
+    context = {"current_version": "1.2.3", "new_version": "1.3.0", "now": datetime(2024, 5, 6), "width": 8}
+    assert Template(template).render(context) == template.format(**context)
+
+
+def test_template_errors_as_str_format():
+    with pytest.raises(KeyError):
+        Template("{new_version}").render({})
+    template = Template("{current_version")
+    with pytest.raises(ValueError):
+        template.render({"current_version": "1.2.3"})
+
+
+@pytest.mark.parametrize(
+    "pattern, path, expected",
+    [
+        ("*.yml", "a.yml", True),
+        ("*.yml", "dir/a.yml", False),
+        ("**/*.yml", "a.yml", True),
+        ("**/*.yml", "dir/sub/a.yml", True),
+        ("third_party/**", "third_party/a/b/package.json", True),
+        ("third_party/**", "other/third_party/package.json", False),
+        ("**/fixtures/*.yml", "tests/fixtures/a.yml", True),
+        ("**/fixtures/*.yml", "tests/fixtures/deep/a.yml", False),
+        ("packages/*/package.json", "packages/foo/package.json", True),
+        ("file?.txt", "file1.txt", True),
+        ("file?.txt", "file/.txt", False),
+        ("file[0-9].txt", "file7.txt", True),
+        ("file[!0-9].txt", "file7.txt", False),
+        ("file[!0-9].txt", "fileA.txt", True),
+        ("file[.txt", "file[.txt", True),
+        ("a+b(c).txt", "a+b(c).txt", True),
+    ],
+)
+def test_translate_glob(pattern, path, expected):
+    assert bool(re.fullmatch(translate_glob(pattern), path)) == expected
+
+
+def test_glob_set():
+    globs = GlobSet(["**/*.yml", "**/*play*.yml", "docs/**"])
+
+    assert globs.match("infra/playbook.yml") == [0, 1]
+    assert globs.match("docs/sources.yml") == [0, 2]
+    assert globs.match("src/main.py") == []
+    # patterns are bucketed by literal suffixes of different lengths, and matched in the order they are given
+    globs = GlobSet(["**/*.c", "docs/*", "**/Dockerfile", "src/**/*.c", "**/x[ab]"])
+    assert globs.match("src/lib/main.c") == [0, 3]
+    assert globs.match("docs/main.c") == [0, 1]
+    assert globs.match("app/Dockerfile") == [2]
+    assert globs.match("xb") == [4]
+    assert globs.match("src/main.cc") == []
+    assert not GlobSet([])
+    assert GlobSet([]).match("any") == []
+
+
+def test_path_matcher():
+    matcher = PathMatcher(
+        [
+            "app/legacy/package.json",
+            "third_party/",
+            "vendor/**",
+            "vendor/nested/",
+            "**/fixtures/*.yml",
+            "*.lock.json",
+            "/docs/README.md",
+        ]
+    )
+
+    assert matcher.match("app/legacy/package.json")
+    assert not matcher.match("app/package.json")
+    assert matcher.match("third_party/lib/package.json")
+    assert not matcher.match("third_party")
+    assert not matcher.match("src/third_party/package.json")
+    assert matcher.match("vendor/a/b/c/pyproject.toml")
+    assert matcher.match("tests/fixtures/sources.yml")
+    assert not matcher.match("tests/fixtures/deep/sources.yml")
+    assert matcher.match("app/x.lock.json")
+    assert matcher.match("docs/README.md")
+    assert matcher.directories == ["third_party", "vendor"]
+
+
+def test_path_matcher_literal_without_slash_is_exact():
+    matcher = PathMatcher(["package.json"])
+
+    assert matcher.match("package.json")
+    assert not matcher.match("app/package.json")
+    assert matcher.directories == []
@@ -1,4 +1,12 @@
-from bumpsemver.version_part import NumericVersionPartConfiguration, VersionPart, Version, VersionConfig
+import pytest
+
+from bumpsemver.version_part import (
+    MAX_INTERNED_VERSION_CONFIGS,
+    NumericVersionPartConfiguration,
+    Version,
+    VersionConfig,
+    VersionPart,
+)
 
 vpc = NumericVersionPartConfiguration()
 
@@ -26,6 +34,11 @@ def test_version_part_format():
 
 def test_version_part_equality():
     assert VersionPart(vpc.first_value, vpc) == VersionPart(vpc.first_value, vpc)
+    # parts compare as the versions holding them do
+    assert VersionPart("01") == VersionPart("1")
+    assert hash(VersionPart("01")) == hash(VersionPart("1"))
+    assert VersionPart("rc") != VersionPart("1")
+    assert Version({"major": VersionPart("01")}) == Version({"major": VersionPart("1")})
 
 
 def test_version_part_null():
@@ -43,3 +56,125 @@ def test_version_repr():
     vc = VersionConfig()
     version = vc.parse("1.2.3")
     assert repr(version) == "<bumpsemver.Version:major=1, minor=2, patch=3>"
+
+
+def test_version_config_interned():
+    vc = VersionConfig.interned("Version: {current_version}", "Version: {new_version}")
+    assert VersionConfig.interned("Version: {current_version}", "Version: {new_version}") is vc
+    assert VersionConfig.interned("{current_version}", "{new_version}") is not vc
+    assert vc.parse_regex is VersionConfig().parse_regex
+
+    for index in range(MAX_INTERNED_VERSION_CONFIGS):
+        VersionConfig.interned(f"{{current_version}} {index}", "{new_version}")
+    assert VersionConfig.interned.cache_info().currsize == MAX_INTERNED_VERSION_CONFIGS
+    assert VersionConfig.interned("Version: {current_version}", "Version: {new_version}") is not vc
+
+
+def test_version_config_serialize():
+    vc = VersionConfig()
+    assert vc.serialize(vc.parse("1.2.3").bump("minor", vc.order())) == "1.3.0"
+
+
+def test_version_is_immutable():
+    version = VersionConfig().parse("1.2.3")
+    with pytest.raises(AttributeError):
+        version.original = "1.2.4"
+    with pytest.raises(AttributeError):
+        version["major"].config = None
+    with pytest.raises(TypeError):
+        version.values["major"] = VersionPart("2")  # noqa: PD011, the parts of a version, not a pandas frame
+
+
+def test_version_ordering_and_hashing():
+    vc = VersionConfig()
+    versions = [vc.parse(version) for version in ("1.10.0", "1.2.3", "0.9.12", "1.2.10", "1.2.3+build.5")]
+    assert [str(version) for version in sorted(versions)] == ["0.9.12", "1.2.3", "1.2.3+build.5", "1.2.10", "1.10.0"]
+    assert vc.parse("1.2.3") == vc.parse("1.2.3+build.5")
+    assert len({*versions, vc.parse("1.2.3")}) == 4
+    assert max(versions) == vc.parse("1.10.0")
+
+
+def test_version_semver_precedence():
+    # the example of the SemVer 2.0 specification
+    ordered = [
+        "1.0.0-alpha",
+        "1.0.0-alpha.1",
+        "1.0.0-alpha.beta",
+        "1.0.0-beta",
+        "1.0.0-beta.2",
+        "1.0.0-beta.11",
+        "1.0.0-rc.1",
+        "1.0.0",
+        "1.0.1-0",
+    ]
+    vc = VersionConfig()
+    versions = [vc.parse(version) for version in ordered]
+    shuffled = versions[1::2] + versions[::2]
+    assert [str(version) for version in sorted(shuffled)] == ordered
+    assert all(lower < higher for lower, higher in zip(versions, versions[1:]))
+
+
+def test_version_bump_shares_unchanged_parts():
+    vc = VersionConfig()
+    version = vc.parse("1.2.3")
+    bumped = version.bump("patch", vc.order())
+    assert bumped["major"] is version["major"]
+    assert str(bumped) == "1.2.4"
+    assert bumped > version
+
+
+@pytest.mark.parametrize(
+    "version_string, expected",
+    [
+        ("1.2.3", {"major": "1", "minor": "2", "patch": "3"}),
+        ("0.0.0", {"major": "0", "minor": "0", "patch": "0"}),
+        ("1.2.3-rc.1", {"major": "1", "minor": "2", "patch": "3", "prerelease": "rc.1"}),
+        ("1.2.3+build.5", {"major": "1", "minor": "2", "patch": "3", "build": "build.5"}),
+        (
+            "10.20.30-alpha-1.0.x-y+exp.sha.5114f85",
+            {"major": "10", "minor": "20", "patch": "30", "prerelease": "alpha-1.0.x-y", "build": "exp.sha.5114f85"},
+        ),
+        ("1.2", None),
+        ("1.2.3.4", None),
+        ("v1.2.3", None),
+        ("01.2.3", None),
+        ("1.00.3", None),
+        ("1.2.3-01", None),
+        ("1.2.3-", None),
+        ("1.2.3+", None),
+        ("1.2.3-rc..1", None),
+        ("1.2.\u0663", None),
+    ],
+)
+def test_version_config_parse(version_string, expected):
+    vc = VersionConfig()
+    version = vc.parse(version_string)
+    if expected is None:
+        assert version is None
+    else:
+        assert {label: version[label].value for label in version} == expected
+        assert vc.serialize(version) == str(version) == version_string
+
+
+@pytest.mark.parametrize(
+    "current, part, expected",
+    [
+        ("1.2.3", "prerelease", "1.2.4-rc.1"),
+        ("1.2.4-rc.1", "prerelease", "1.2.4-rc.2"),
+        ("1.2.4-beta.2.x", "prerelease", "1.2.4-beta.3.x"),
+        ("1.2.4-alpha", "prerelease", "1.2.4-alpha.1"),
+        ("1.2.4-rc.1+build.5", "prerelease", "1.2.4-rc.2"),
+        ("1.2.4-rc.1", "patch", "1.2.4"),
+        ("1.3.0-rc.1", "minor", "1.3.0"),
+        ("1.2.4-rc.1", "minor", "1.3.0"),
+        ("2.0.0-rc.1", "major", "2.0.0"),
+        ("1.2.4-rc.1", "major", "2.0.0"),
+        ("1.2.3+build.5", "patch", "1.2.4"),
+    ],
+)
+def test_version_bump_prerelease(current, part, expected):
+    vc = VersionConfig()
+    version = vc.parse(current)
+    bumped = version.bump(part, vc.order())
+    assert vc.serialize(bumped) == expected
+    assert bumped > version
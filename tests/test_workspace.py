@@ -0,0 +1,136 @@
+import json
+from textwrap import dedent
+
+import pytest
+
+from bumpsemver.cli import main
+from bumpsemver.exceptions import InvalidArgumentsError
+from bumpsemver.workspace import load_workspace, plan_workspace
+
+
+@pytest.fixture
+def workspace_layout(tmpdir, write_package):
+    """
+    A root project and two nested projects.
+    """
+    tmpdir.join(".bumpsemver.cfg").write(
+        dedent(
+            """
+            [bumpsemver]
+            current_version = 0.1.0
+            commit = True
+
+            [bumpsemver:plaintext:README.md]
+            search = v{current_version}
+            replace = v{new_version}
+            """
+        ).lstrip()
+    )
+    tmpdir.join("README.md").write("# monorepo v0.1.0\n")
+    write_package(tmpdir.join("packages", "a", "package.json"), "1.0.0", "tag = True\n")
+    tmpdir.join("packages", "b", "VERSION").write("2.0.0\n", ensure=True)
+    write_package(tmpdir.join("packages", "b", "legacy", "package.json"), "0.0.1")
+    tmpdir.join("packages", "b", ".bumpsemver.cfg").write(
+        dedent(
+            """
+            [bumpsemver]
+            current_version = 2.0.0
+            tag = True
+
+            [bumpsemver:plaintext:VERSION]
+
+            [bumpsemver:discovery]
+            ignore = legacy/package.json
+            """
+        ).lstrip()
+    )
+
+
+def test_load_workspace(tmpdir, workspace_repo):
+    workspace = load_workspace()
+
+    assert list(workspace.projects) == [".", "packages/a", "packages/b"]
+    assert [file.filename for file in workspace.projects["packages/a"].files] == ["packages/a/package.json"]
+    assert workspace.projects["packages/b"].current_version == "2.0.0"
+    assert workspace.projects["packages/b"].discovery_config.ignore == ["packages/b/legacy/package.json"]
+    assert workspace.projects["packages/b"].discovery_config.tracked_files is workspace.tracked_files
+
+
+def test_workspace_bump_one_commit_many_tags(tmpdir, git, workspace_repo):
+    with pytest.raises(SystemExit) as exc:
+        main(["workspace", "minor"])
+    assert exc.value.code == 0
+
+    assert tmpdir.join("README.md").read() == "# monorepo v0.2.0\n"
+    assert json.loads(tmpdir.join("packages", "a", "package.json").read())["version"] == "1.1.0"
+    assert tmpdir.join("packages", "b", "VERSION").read() == "2.1.0\n"
+    assert "current_version = 1.1.0" in tmpdir.join("packages", "a", ".bumpsemver.cfg").read()
+    assert git("rev-list", "--count", "HEAD") == "2"
+    assert git("log", "-1", "--format=%B") == (
+        "build(repo): bumped versions\n\n"
+        "- .: 0.1.0 → 0.2.0\n- packages/a: 1.0.0 → 1.1.0\n- packages/b: 2.0.0 → 2.1.0"
+    )
+    assert git("status", "--porcelain") == ""
+    # the root project does not tag, the others are tagged with their directory
+    assert git("tag").split() == ["packages/a/v1.1.0", "packages/b/v2.1.0"]
+
+
+def test_workspace_selected_projects(tmpdir, git, workspace_repo):
+    with pytest.raises(SystemExit) as exc:
+        main(["workspace", "--project", "packages/b", "--dry-run", "patch"])
+    assert exc.value.code == 0
+    assert tmpdir.join("packages", "b", "VERSION").read() == "2.0.0\n"
+
+    with pytest.raises(SystemExit) as exc:
+        main(["workspace", "--project", "packages/b/", "--new-version", "3.0.0-rc.1", "--no-tag"])
+    assert exc.value.code == 0
+    assert tmpdir.join("packages", "b", "VERSION").read() == "3.0.0-rc.1\n"
+    assert json.loads(tmpdir.join("packages", "a", "package.json").read())["version"] == "1.0.0"
+    # no project selected tells to commit
+    assert git("rev-list", "--count", "HEAD") == "1"
+    assert git("tag") == ""
+
+
+def test_workspace_errors(tmpdir, git, write_package, workspace_repo):
+    tmpdir.join("packages", "a", ".bumpsemver.cfg").write(
+        "[bumpsemver]\ncurrent_version = 1.0.0\ntag_name = v{new_version}\n\n[bumpsemver:json:package.json]\n"
+    )
+    workspace = load_workspace()
+
+    with pytest.raises(InvalidArgumentsError) as exc:
+        plan_workspace(workspace, "patch", projects=["packages/c"])
+    assert exc.value.message == "Unknown projects ['packages/c'], the projects are ['.', 'packages/a', 'packages/b']"
+
+    with pytest.raises(InvalidArgumentsError) as exc:
+        plan_workspace(workspace, new_version="1.0.0-rc.1", projects=[".", "packages/a"], allow_dirty=True)
+    assert exc.value.message == (
+        "Projects '.' and 'packages/a' would both be tagged 'v1.0.0-rc.1', set their tag_name to tell them apart"
+    )
+
+    # discovery runs over the whole repository
+    git("checkout", "--", ".")
+    write_package(tmpdir.join("packages", "c", "package.json"), "0.1.0")
+    git("add", ".")
+    git("commit", "-m", "add package c")
+    with pytest.raises(SystemExit) as exc:
+        main(["workspace", "patch"])
+    assert exc.value.code == 32
+    assert tmpdir.join("packages", "b", "VERSION").read() == "2.0.0\n"
+
+
+def test_workspace_anchored_ignore(tmpdir, git, write_package, workspace_repo):
+    tmpdir.join("packages", "a", ".bumpsemver.cfg").write(
+        "[bumpsemver]\ncurrent_version = 1.0.0\ntag = True\n\n[bumpsemver:json:package.json]\njsonpath = version\n\n"
+        "[bumpsemver:discovery]\nignore = /build/*\n"
+    )
+    write_package(tmpdir.join("packages", "a", "build", "package.json"), "1.0.0")
+    git("add", ".")
+    git("commit", "-m", "add the build of package a")
+
+    workspace = load_workspace()
+
+    # anchored at the project, not at the root of the workspace
+    assert workspace.projects["packages/a"].discovery_config.ignore == ["packages/a/build/*"]
+    with pytest.raises(SystemExit) as exc:
+        main(["workspace", "--dry-run", "patch"])
+    assert exc.value.code == 0